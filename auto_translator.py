@@ -0,0 +1,184 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+from deepl.translation import Translation
+import discord
+import asyncio
+import logging
+
+
+_logger = logging.getLogger(__name__)
+
+TranslateFunction = Callable[[List[str], str, discord.Message], Awaitable[List[Translation]]]
+SendFunction = Callable[[discord.Message, str], Awaitable[object]]
+
+
+class _ChannelQueue:
+
+    def __init__(self, max_size: int) -> None:
+        self.messages: Deque[discord.Message] = deque(maxlen=max_size)
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class AutoTranslator:
+    """
+    Translate all messages in auto-translated channels. Messages arriving within a debounce window are translated in one
+    batch and the translations are posted as one consolidated reply. Each channel has a bounded queue, and the oldest
+    queued messages are dropped if translations cannot keep up with the channel.
+    """
+
+    def __init__(self,
+                 translate: TranslateFunction,
+                 send: SendFunction,
+                 debounce: float = 1.5,
+                 max_batch_size: int = 50,
+                 max_queue_size: int = 200) -> None:
+        """
+        :param translate: Coroutine function translating a list of texts to a target language. The last message of the
+        batch is given for accounting.
+        :param send: Coroutine function posting the consolidated translations as a reply to a message.
+        :param debounce: Time in seconds to wait for more messages before translating the queued messages.
+        :param max_batch_size: Maximum number of messages translated in one batch.
+        :param max_queue_size: Maximum number of queued messages in a channel.
+        """
+        self._translate = translate
+        self._send = send
+        self.debounce = debounce
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self.channels: Dict[int, str] = {}
+        self._queues: Dict[int, _ChannelQueue] = {}
+        self.dropped_messages = 0
+
+    def enable(self, channel_id: int, target_language: str) -> None:
+        """
+        Translate all messages in a channel automatically.
+
+        :param channel_id: ID of the channel.
+        :param target_language: Target language of the translations.
+        """
+        self.channels[channel_id] = target_language
+
+    def disable(self, channel_id: int) -> None:
+        """
+        Stop translating messages in a channel automatically. Queued messages are discarded.
+
+        :param channel_id: ID of the channel.
+        """
+        self.channels.pop(channel_id, None)
+        queue = self._queues.pop(channel_id, None)
+        if queue and queue.timer:
+            queue.timer.cancel()
+
+    @property
+    def queued_messages(self) -> int:
+        return sum(len(queue.messages) for queue in self._queues.values())
+
+    def submit(self, message: discord.Message) -> bool:
+        """
+        Queue a message for translation if it was sent to an auto-translated channel.
+
+        :param message: Message to queue.
+        :return: True if the message was queued, False otherwise.
+        """
+        channel_id = message.channel.id
+        if channel_id not in self.channels or not message.content:
+            return False
+
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = _ChannelQueue(self.max_queue_size)
+
+        if len(queue.messages) == queue.messages.maxlen:
+            self.dropped_messages += 1
+        queue.messages.append(message)
+
+        # A batch in progress schedules the next one when it is done
+        if queue.task is None:
+            if len(queue.messages) >= self.max_batch_size:
+                self.__flush(channel_id)
+            elif queue.timer is None:
+                queue.timer = asyncio.get_running_loop().call_later(self.debounce, self.__flush, channel_id)
+
+        return True
+
+    def __flush(self, channel_id: int) -> None:
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            return
+
+        if queue.timer:
+            queue.timer.cancel()
+            queue.timer = None
+
+        batch = [queue.messages.popleft() for _ in range(min(self.max_batch_size, len(queue.messages)))]
+        if not batch:
+            # Forget idle channels so that memory is used only by active channels
+            del self._queues[channel_id]
+            return
+
+        queue.task = asyncio.create_task(self.__translate_batch(channel_id, batch))
+        queue.task.add_done_callback(lambda _: self.__batch_done(channel_id, queue))
+
+    def __batch_done(self, channel_id: int, queue: _ChannelQueue) -> None:
+        queue.task = None
+        if self._queues.get(channel_id) is not queue:
+            return
+
+        if len(queue.messages) >= self.max_batch_size:
+            self.__flush(channel_id)
+        elif queue.messages:
+            queue.timer = asyncio.get_running_loop().call_later(self.debounce, self.__flush, channel_id)
+        else:
+            del self._queues[channel_id]
+
+    async def __translate_batch(self, channel_id: int, batch: List[discord.Message]) -> None:
+        target_language = self.channels.get(channel_id)
+        if target_language is None:
+            return
+
+        try:
+            translations = await self._translate([message.content for message in batch], target_language, batch[-1])
+        except Exception:
+            # Any error, e.g. a broken DeepL API response, would otherwise be lost with the task and the batch
+            _logger.exception(f"Failed to auto-translate {len(batch)} messages in channel {channel_id}.")
+            return
+
+        lines = []
+        target_base = target_language.split("-")[0].upper()
+        for message, translation in zip(batch, translations):
+            # Messages already in the target language are not repeated
+            if translation.detected_source_language.upper() == target_base:
+                continue
+            lines.append(f"**{message.author.display_name}**: {discord.utils.escape_mentions(translation.text)}")
+
+        if lines:
+            try:
+                await self._send(batch[-1], "\n".join(lines))
+            except discord.HTTPException:
+                _logger.exception(f"Failed to post auto-translations to channel {channel_id}.")
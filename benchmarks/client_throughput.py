@@ -0,0 +1,144 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+Throughput benchmark of deepl.Client.translate against the local mock DeepL API. Translations are driven at a
+controlled concurrency and batch size, and latency percentiles and requests per second are reported. The benchmark
+exits with a non-zero status if the 95th percentile latency exceeds --max-p95, so it can be used to catch regressions.
+
+Run from the repository root with e.g.: python -m benchmarks.client_throughput --concurrency 50 --batch-size 1
+"""
+
+from typing import List
+from benchmarks.mock_deepl import MockDeepLServer
+import argparse
+import asyncio
+import aiohttp
+import deepl
+import itertools
+import statistics
+import sys
+import time
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    server = MockDeepLServer(latency=args.latency, character_latency=args.character_latency,
+                             throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                             character_limit=10 ** 12)
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async with server, aiohttp.ClientSession() as session:
+        rate_limiter = None
+        if args.unlimited:
+            rate_limiter = deepl.ratelimit.RateLimiter(deepl.ratelimit.TokenBucket(1e9, 10 ** 9),
+                                                       deepl.ratelimit.AdaptiveConcurrencyLimiter(maximum=10 ** 6))
+        client = deepl.Client("benchmark" if args.version == "pro" else "benchmark:fx", "benchmark", session,
+                              base_url=server.base_url, rate_limiter=rate_limiter)
+        await client.update_supported_languages()
+
+        def next_text() -> str:
+            # Texts are unique unless repeats are requested, so the cache does not hide the transport
+            number = next(counter)
+            if args.distinct_texts:
+                number %= args.distinct_texts
+            return f"Benchmark text number {number}"
+
+        async def worker(deadline: float) -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                texts = [next_text() for _ in range(args.batch_size)]
+                start = time.perf_counter()
+                try:
+                    await client.translate(texts, "EN-US")
+                except deepl.DeepLError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(start + args.duration) for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - start
+
+    if not latencies:
+        raise RuntimeError("No translations succeeded.")
+
+    return dict(
+        translations=len(latencies),
+        errors=errors,
+        http_requests=server.translate_request_count,
+        translations_per_second=len(latencies) / elapsed,
+        http_requests_per_second=server.translate_request_count / elapsed,
+        mean=statistics.mean(latencies),
+        p50=percentile(latencies, 0.50),
+        p95=percentile(latencies, 0.95),
+        p99=percentile(latencies, 0.99),
+        cache_hit_ratio=client.cache.hit_ratio
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark deepl.Client against a local mock DeepL API.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Number of concurrent callers.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Number of texts per translate() call.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Duration of the benchmark in seconds.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock API base latency in seconds.")
+    parser.add_argument("--character-latency", type=float, default=0.0,
+                        help="Mock API latency per character in seconds.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of 429 responses.")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After of 429 responses in seconds.")
+    parser.add_argument("--distinct-texts", type=int, default=0,
+                        help="Number of distinct texts to cycle through. If 0, every text is unique.")
+    parser.add_argument("--version", choices=("free", "pro"), default="pro",
+                        help="DeepL account version the client rate limits are tuned for.")
+    parser.add_argument("--unlimited", action="store_true", help="Disable client side rate limiting.")
+    parser.add_argument("--max-p95", type=float, default=None,
+                        help="Fail if the 95th percentile latency in seconds exceeds this.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"Translations:      {results['translations']} ({results['errors']} errors)")
+    print(f"HTTP requests:     {results['http_requests']}")
+    print(f"Translations/s:    {results['translations_per_second']:.1f}")
+    print(f"HTTP requests/s:   {results['http_requests_per_second']:.1f}")
+    print(f"Latency mean:      {results['mean'] * 1e3:.2f} ms")
+    print(f"Latency p50:       {results['p50'] * 1e3:.2f} ms")
+    print(f"Latency p95:       {results['p95'] * 1e3:.2f} ms")
+    print(f"Latency p99:       {results['p99'] * 1e3:.2f} ms")
+    print(f"Cache hit ratio:   {results['cache_hit_ratio']:.2f}")
+
+    if args.max_p95 is not None and results["p95"] > args.max_p95:
+        print(f"Regression: p95 latency exceeds {args.max_p95 * 1e3:.2f} ms.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+Synthetic load generator for the Discord event path. Fake messages are dispatched as message events to a real
+TranslatorBot wired to the local mock DeepL API, through EventListenerCog.on_message, bot.process_commands and
+TranslationCog. Messages are offered at increasing rates, and event loop lag, throughput and per-stage latencies are
+reported for each rate. Nothing is sent to Discord, and sent replies are only recorded.
+
+Run from the repository root with e.g.:
+
+    python -m benchmarks.event_path_load --rates 100,500,1000 --mix chatter=80,command=15,quick=5
+"""
+
+from typing import Dict, List, Optional
+from benchmarks.mock_deepl import MockDeepLServer
+from message_sender import MessageSender
+from translator_bot import TranslatorBot
+from discord.ext import commands
+import argparse
+import asyncio
+import discord
+import itertools
+import logging
+import random
+import time
+
+
+BOT_ID = 100000000000000001
+PHRASES = [
+    "Hyvää huomenta kaikille", "Kuka tulee illalla pelaamaan?", "Tämä on aivan mahtava uutinen!",
+    "Onko kenelläkään ideoita viikonlopuksi?", "Muistakaa huomisen kokous", "Kiitos avusta, se toimi",
+    "Guten Morgen zusammen", "Wo ist der neue Kanal?", "Bonjour à tous", "Qui veut jouer ce soir ?"
+]
+CHATTER = [
+    "lol", "anyone up for a game?", "brb", "that patch was wild", "gg", "did you see the announcement",
+    "https://example.com/some/link", "<:pepe:123456789012345678>", "?", "ok"
+]
+
+
+class FakeUser:
+
+    def __init__(self, user_id: int, bot: bool = False) -> None:
+        self.id = user_id
+        self.bot = bot
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeGuild:
+
+    def __init__(self, guild_id: int) -> None:
+        self.id = guild_id
+
+
+class FakeChannel:
+
+    def __init__(self, channel_id: int, guild: FakeGuild) -> None:
+        self.id = channel_id
+        self.guild = guild
+
+    async def send(self, content: str = None, **kwargs) -> None:
+        pass
+
+
+class FakeReference:
+
+    def __init__(self, resolved: "FakeMessage") -> None:
+        self.message_id = resolved.id
+        self.channel_id = resolved.channel.id
+        self.resolved = resolved
+
+
+class FakeMessage:
+    """
+    A stand-in for discord.Message with the attributes used by the bot and discord.ext.commands.
+    """
+
+    def __init__(self,
+                 message_id: int,
+                 content: str,
+                 author: FakeUser,
+                 channel: FakeChannel,
+                 reference: Optional[FakeReference] = None) -> None:
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.reference = reference
+        self.created_at = discord.utils.utcnow()
+        self.mentions = []
+        self.attachments = []
+        self._state = None
+
+    async def reply(self, content: str = None, **kwargs) -> None:
+        pass
+
+
+class RecordingMessageSender(MessageSender):
+    """
+    A message sender that splits content like the real one, but records sends instead of sending them to Discord.
+    """
+
+    def __init__(self, stats: "Stats", send_latency: float) -> None:
+        super().__init__()
+        self._stats = stats
+        self._send_latency = send_latency
+
+    async def send(self, destination, content: str, reply: bool = False, mention_author: bool = False) -> List:
+        start = time.perf_counter()
+        parts = self.split_content(content)
+        for _ in parts:
+            await asyncio.sleep(self._send_latency)
+
+        now = time.perf_counter()
+        message = destination.message if isinstance(destination, commands.Context) else destination
+        self._stats.record("send", now - start)
+        dispatched_at = self._stats.dispatched.pop(message.id, None)
+        if dispatched_at is not None:
+            self._stats.record("end_to_end", now - dispatched_at)
+        self._stats.replies += 1
+        return []
+
+
+class Stats:
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {}
+        self.dispatched: Dict[int, float] = {}
+        self.replies = 0
+
+    def record(self, stage: str, latency: float) -> None:
+        self.latencies.setdefault(stage, []).append(latency)
+
+
+class TrafficGenerator:
+
+    def __init__(self, mix: Dict[str, float], guilds: int, users: int, distinct_texts: int) -> None:
+        self._kinds = list(mix)
+        self._weights = [mix[kind] for kind in self._kinds]
+        self._ids = itertools.count(1)
+        self._users = [FakeUser(1000 + i) for i in range(users)]
+        self._channels = [FakeChannel(2000 + i, FakeGuild(3000 + i)) for i in range(guilds)]
+        self._texts = [f"{random.choice(PHRASES)} #{i}" for i in range(distinct_texts)]
+
+    def next_message(self) -> FakeMessage:
+        kind = random.choices(self._kinds, self._weights)[0]
+        author = random.choice(self._users)
+        channel = random.choice(self._channels)
+        text = random.choice(self._texts)
+
+        if kind == "command":
+            content = random.choice([f"?t {text}", f"?tt de {text}", f"?st fi en {text}"])
+            return FakeMessage(next(self._ids), content, author, channel)
+
+        if kind == "quick":
+            replied = FakeMessage(next(self._ids), text, random.choice(self._users), channel)
+            content = random.choice([f"<@{BOT_ID}>", f"<@!{BOT_ID}> de", f"<@{BOT_ID}> fi en"])
+            return FakeMessage(next(self._ids), content, author, channel, FakeReference(replied))
+
+        return FakeMessage(next(self._ids), random.choice(CHATTER), author, channel)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+async def monitor_loop_lag(stats: Stats, interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stats.record("loop_lag", loop.time() - start - interval)
+
+
+async def create_bot(server: MockDeepLServer, stats: Stats, send_latency: float) -> TranslatorBot:
+    config = {"deepl": {"base_url": server.base_url}, "settings": {"path": None}, "languages": {"snapshot_path": None}}
+    bot = TranslatorBot("load-test", "?", config=config)
+    bot._connection.user = FakeUser(BOT_ID, bot=True)
+    bot.message_sender = RecordingMessageSender(stats, send_latency)
+    await bot._async_setup_hook()
+    await bot.setup_hook()
+    await bot.deepl_client.update_supported_languages()
+
+    translate = bot.translate
+
+    async def timed_translate(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await translate(*args, **kwargs)
+        finally:
+            stats.record("translate", time.perf_counter() - start)
+
+    bot.translate = timed_translate
+    return bot
+
+
+async def offer_load(bot: TranslatorBot, generator: TrafficGenerator, stats: Stats, rate: float,
+                     duration: float, drain_timeout: float) -> dict:
+    loop = asyncio.get_running_loop()
+    lag_monitor = loop.create_task(monitor_loop_lag(stats))
+    sent = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        due = int(elapsed * rate) - sent
+        for _ in range(due):
+            message = generator.next_message()
+            stats.dispatched[message.id] = time.perf_counter()
+            bot.dispatch("message", message)
+        sent += due
+        await asyncio.sleep(0.001)
+
+    drain_start = time.perf_counter()
+    while stats.dispatched and time.perf_counter() - drain_start < drain_timeout:
+        # Messages that are not answered (chatter) stay in the table, so drain only until replies stop arriving
+        replies = stats.replies
+        await asyncio.sleep(0.2)
+        if stats.replies == replies:
+            break
+
+    elapsed = time.perf_counter() - start
+    lag_monitor.cancel()
+    return dict(offered=sent / duration, replies=stats.replies, replies_per_second=stats.replies / elapsed)
+
+
+def print_report(rate: float, result: dict, stats: Stats) -> None:
+    print(f"\nOffered {rate:.0f} msg/s: dispatched {result['offered']:.0f} msg/s, "
+          f"{result['replies']} replies ({result['replies_per_second']:.1f}/s)")
+    for stage in ("loop_lag", "translate", "send", "end_to_end"):
+        values = stats.latencies.get(stage, [])
+        print(f"  {stage:<11} n={len(values):<7} p50={percentile(values, 0.5) * 1e3:8.2f} ms  "
+              f"p95={percentile(values, 0.95) * 1e3:8.2f} ms  p99={percentile(values, 0.99) * 1e3:8.2f} ms  "
+              f"max={max(values, default=0) * 1e3:8.2f} ms")
+
+
+async def run(args: argparse.Namespace) -> None:
+    mix = {}
+    for item in args.mix.split(","):
+        kind, weight = item.split("=")
+        if kind not in ("chatter", "command", "quick"):
+            raise ValueError(f"Unknown traffic kind `{kind}`.")
+        mix[kind] = float(weight)
+
+    async with MockDeepLServer(latency=args.deepl_latency, character_limit=10 ** 12) as server:
+        for rate in (float(rate) for rate in args.rates.split(",")):
+            stats = Stats()
+            bot = await create_bot(server, stats, args.send_latency)
+            generator = TrafficGenerator(mix, args.guilds, args.users, args.distinct_texts)
+            try:
+                result = await offer_load(bot, generator, stats, rate, args.duration, args.drain_timeout)
+            finally:
+                await bot.close()
+            print_report(rate, result, stats)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic load on the Discord event path of the bot.")
+    parser.add_argument("--rates", default="100,500,1000", help="Comma separated message rates per second.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Duration of each rate in seconds.")
+    parser.add_argument("--mix", default="chatter=80,command=15,quick=5",
+                        help="Relative weights of chatter, command and quick translation messages.")
+    parser.add_argument("--guilds", type=int, default=20, help="Number of simulated guilds.")
+    parser.add_argument("--users", type=int, default=500, help="Number of simulated users.")
+    parser.add_argument("--distinct-texts", type=int, default=1000, help="Number of distinct translated texts.")
+    parser.add_argument("--deepl-latency", type=float, default=0.05, help="Mock DeepL API latency in seconds.")
+    parser.add_argument("--send-latency", type=float, default=0.05,
+                        help="Simulated Discord latency per sent message in seconds.")
+    parser.add_argument("--drain-timeout", type=float, default=10.0,
+                        help="Maximum time to wait for replies after the load stops, in seconds.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Benchmark of the local language detector on the bundled corpus. The held-out lines of the corpus, which are not used for
+the bundled profiles, are detected as whole sentences and as short prefixes typical of chat messages. Accuracy, and the
+coverage and precision of detections above confidence thresholds, are reported together with the CPU cost.
+
+Run from the repository root with: python -m benchmarks.language_detection
+"""
+
+from collections import Counter
+from typing import List, Tuple
+from deepl.language_detection import LanguageDetector, read_corpus, split_corpus
+import argparse
+import os
+import time
+import timeit
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "language_corpus.tsv")
+THRESHOLDS = (0.5, 0.9, 0.95, 0.99)
+
+
+def prefix(text: str, words: int) -> str:
+    """
+    Shorten a text to its first words. Texts without spaces, such as Chinese and Japanese, are shortened to the same
+    share of characters that the words would take from an average sentence.
+    """
+    split = text.split()
+    if len(split) > 1:
+        return " ".join(split[:words])
+    return text[:max(3, len(text) * words // 10)]
+
+
+def report(detector: LanguageDetector, label: str, samples: List[Tuple[str, str]]) -> None:
+    detections = [(language, detector.detect(text)) for language, text in samples]
+    correct = sum(detection is not None and detection.language == language for language, detection in detections)
+    print(f"{label}: accuracy {correct / len(samples):.1%} of {len(samples)} texts")
+    for threshold in THRESHOLDS:
+        confident = [(language, detection) for language, detection in detections
+                     if detection is not None and detection.confidence >= threshold]
+        confident_correct = sum(detection.language == language for language, detection in confident)
+        precision = confident_correct / len(confident) if confident else 1.0
+        print(f"  confidence >= {threshold:<4}  coverage {len(confident) / len(samples):6.1%}  "
+              f"precision {precision:6.1%}")
+
+    confusions = Counter((language, detection.language) for language, detection in detections
+                         if detection is not None and detection.language != language)
+    if confusions:
+        print("  confusions: " + ", ".join(f"{expected}->{detected} ({count})"
+                                          for (expected, detected), count in confusions.most_common()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the local language detector on the bundled corpus.")
+    parser.add_argument("--number", type=int, default=20, help="Rounds of detecting all held-out texts for timing.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    detector = LanguageDetector.load()
+    load_time = time.perf_counter() - started
+    print(f"Loaded profiles of {len(detector.languages)} languages in {load_time * 1000:.1f} ms\n")
+
+    _, held_out = split_corpus(read_corpus(CORPUS_PATH))
+    report(detector, "Sentences", held_out)
+    report(detector, "First 5 words", [(language, prefix(text, 5)) for language, text in held_out])
+    report(detector, "First 3 words", [(language, prefix(text, 3)) for language, text in held_out])
+
+    texts = [text for _, text in held_out]
+    characters = sum(map(len, texts))
+    elapsed = timeit.timeit(lambda: [detector.detect(text) for text in texts], number=args.number)
+    calls = args.number * len(texts)
+    print(f"\nCPU cost: {elapsed / calls * 1e6:.1f} us per text, {elapsed / (args.number * characters) * 1e9:.0f} ns "
+          f"per character, average text {characters / len(texts):.0f} characters")
+
+
+if __name__ == "__main__":
+    main()
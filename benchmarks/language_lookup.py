@@ -0,0 +1,118 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+Micro-benchmark of resolving language representations with deepl.Client.get_language. The indexed lookup is compared
+against the previous implementation, which scanned supported languages linearly and rebuilt the alias table on every
+call.
+
+Run from the repository root with: python -m benchmarks.language_lookup
+"""
+
+from typing import Dict, List, Optional
+from deepl.language import Language
+import deepl
+import timeit
+
+
+SUPPORTED_LANGUAGES = [
+    ("BG", "Bulgarian"), ("CS", "Czech"), ("DA", "Danish"), ("DE", "German"), ("EL", "Greek"),
+    ("EN-GB", "English (British)"), ("EN-US", "English (American)"), ("ES", "Spanish"), ("ET", "Estonian"),
+    ("FI", "Finnish"), ("FR", "French"), ("HU", "Hungarian"), ("ID", "Indonesian"), ("IT", "Italian"),
+    ("JA", "Japanese"), ("LT", "Lithuanian"), ("LV", "Latvian"), ("NL", "Dutch"), ("PL", "Polish"),
+    ("PT-BR", "Portuguese (Brazilian)"), ("PT-PT", "Portuguese (European)"), ("RO", "Romanian"), ("RU", "Russian"),
+    ("SK", "Slovak"), ("SL", "Slovenian"), ("SV", "Swedish"), ("TR", "Turkish"), ("UK", "Ukrainian"),
+    ("ZH", "Chinese (simplified)")
+]
+
+# Typical representations from commands: codes, names and aliases in mixed case, and an unsupported language
+LOOKUPS = ["en", "EN-US", "fi", "German", "portuguese", "zh", "sv", "Ukrainian", "klingon"]
+
+
+def linear_replace_aliases(representation: str, ignore_case: bool = False) -> str:
+    aliases: Dict[str, List[str]] = {
+        "EN-US": ["EN", "English"],
+        "PT-PT": ["PT", "Portuguese"],
+        "ZH": ["Chinese"]
+    }
+
+    lookup = representation
+    if ignore_case:
+        lookup = representation.casefold()
+
+    for language_code, language_aliases in aliases.items():
+        if ignore_case:
+            language_aliases = [alias.casefold() for alias in language_aliases]
+        if lookup in language_aliases:
+            return language_code
+
+    return representation
+
+
+def linear_get_language(languages: List[Language], representation: str, ignore_case: bool) -> Optional[Language]:
+    representation = linear_replace_aliases(representation, ignore_case=ignore_case)
+
+    if ignore_case:
+        representation = representation.casefold()
+    for language in languages:
+        lang_name = language.name
+        lang_abbr = language.language_code
+        if ignore_case:
+            lang_name = lang_name.casefold()
+            lang_abbr = lang_abbr.casefold()
+        if representation == lang_name or representation == lang_abbr:
+            return language
+
+    return None
+
+
+def main(number: int = 20000) -> None:
+    languages = [Language(dict(language=code, name=name, supports_formality=False))
+                 for code, name in SUPPORTED_LANGUAGES]
+    client = deepl.Client("benchmark", "benchmark", None)
+    client.set_supported_languages(languages)
+
+    for ignore_case in (True, False):
+        for representation in LOOKUPS:
+            expected = linear_get_language(languages, representation, ignore_case)
+            assert client.get_language(representation, ignore_case=ignore_case) is expected, representation
+
+    def run_linear():
+        for representation in LOOKUPS:
+            linear_get_language(languages, representation, True)
+
+    def run_indexed():
+        for representation in LOOKUPS:
+            client.get_language(representation, ignore_case=True)
+
+    calls = number * len(LOOKUPS)
+    linear = timeit.timeit(run_linear, number=number) / calls
+    indexed = timeit.timeit(run_indexed, number=number) / calls
+    print(f"Linear scan:    {linear * 1e6:.3f} us per call")
+    print(f"Indexed lookup: {indexed * 1e6:.3f} us per call")
+    print(f"Speedup:        {linear / indexed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+Benchmark of filtering unrelated chatter in the on_message event of EventListenerCog. The message router is compared
+against the previous filter, which tokenized every message, matched a mention pattern built for each message and handed
+everything else to process_commands.
+
+Run from the repository root with: python -m benchmarks.message_routing
+"""
+
+from benchmarks.event_path_load import BOT_ID, CHATTER, FakeChannel, FakeGuild, FakeMessage, FakeUser
+from cogs.event_listener_cog import EventListenerCog
+from message_router import MessageRouter
+from translator_bot import TranslatorBot
+import argparse
+import asyncio
+import discord
+import re
+import time
+
+
+async def legacy_on_message(bot: TranslatorBot, message: discord.Message) -> None:
+    if message.author == bot.user:
+        return
+
+    try:
+        startswith_mention = re.fullmatch(rf"<@!?{bot.user.id}>", message.content.split()[0])
+    except IndexError:
+        startswith_mention = False
+
+    if startswith_mention:
+        raise AssertionError("Chatter must not mention the bot.")
+    await bot.process_commands(message)
+
+
+async def measure(handler, messages) -> float:
+    """
+    :return: Messages handled per second.
+    """
+    start = time.perf_counter()
+    for message in messages:
+        await handler(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+async def run(count: int) -> None:
+    bot = TranslatorBot("benchmark", "?", config={"settings": {"path": None}})
+    bot._connection.user = FakeUser(BOT_ID, bot=True)
+    bot.message_router = MessageRouter(BOT_ID)
+    cog = EventListenerCog(bot)
+
+    channel = FakeChannel(1, FakeGuild(1))
+    author = FakeUser(2)
+    # The prefix alone is a command invocation attempt, so it is not counted as chatter
+    chatter = [text for text in CHATTER if not text.startswith("?")]
+    messages = [FakeMessage(i, chatter[i % len(chatter)], author, channel) for i in range(count)]
+
+    legacy = await measure(lambda message: legacy_on_message(bot, message), messages)
+    routed = await measure(cog.on_message, messages)
+    print(f"Previous filter: {legacy:12,.0f} messages/s")
+    print(f"Message router:  {routed:12,.0f} messages/s")
+    print(f"Speedup:         {routed / legacy:12.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark filtering unrelated chatter in on_message.")
+    parser.add_argument("--count", type=int, default=200000, help="Number of chatter messages to handle.")
+    args = parser.parse_args()
+    asyncio.run(run(args.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+A local stand-in for DeepL API v2, implementing /translate, /usage, /languages and /glossaries. Translations echo the
+text with the target language code prepended, and glossary terms replaced when a glossary is used. Latency,
+throttling (429) and quota exceeded (456) responses can be configured, so deepl.Client can be measured without
+spending real quota.
+
+Run a standalone server from the repository root with: python -m benchmarks.mock_deepl --port 8080
+"""
+
+from aiohttp import web
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import datetime
+import random
+import uuid
+
+
+LANGUAGES = [
+    ("BG", "Bulgarian", False), ("CS", "Czech", False), ("DA", "Danish", False), ("DE", "German", True),
+    ("EL", "Greek", False), ("EN-GB", "English (British)", False), ("EN-US", "English (American)", False),
+    ("ES", "Spanish", True), ("ET", "Estonian", False), ("FI", "Finnish", False), ("FR", "French", True),
+    ("HU", "Hungarian", False), ("ID", "Indonesian", False), ("IT", "Italian", True), ("JA", "Japanese", True),
+    ("LT", "Lithuanian", False), ("LV", "Latvian", False), ("NL", "Dutch", True), ("PL", "Polish", True),
+    ("PT-BR", "Portuguese (Brazilian)", True), ("PT-PT", "Portuguese (European)", True), ("RO", "Romanian", False),
+    ("RU", "Russian", True), ("SK", "Slovak", False), ("SL", "Slovenian", False), ("SV", "Swedish", False),
+    ("TR", "Turkish", False), ("UK", "Ukrainian", False), ("ZH", "Chinese (simplified)", False)
+]
+
+
+class MockDeepLServer:
+    """
+    A local aiohttp server mimicking DeepL API v2.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.0,
+                 character_latency: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 quota_exceeded_rate: float = 0.0,
+                 retry_after: Optional[float] = None,
+                 character_limit: int = 500000,
+                 detected_source_language: str = "FI") -> None:
+        """
+        :param host: Host to listen on.
+        :param port: Port to listen on. If 0, a free port is chosen when the server is started.
+        :param latency: Base latency of every response in seconds.
+        :param character_latency: Additional latency of translations per translated character in seconds.
+        :param throttle_rate: Fraction of translation requests responded with 429.
+        :param quota_exceeded_rate: Fraction of translation requests responded with 456.
+        :param retry_after: Value of the Retry-After header in throttled responses. If None, the header is omitted.
+        :param character_limit: Character limit reported by the usage endpoint.
+        :param detected_source_language: Source language reported for translations without a source language.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.character_latency = character_latency
+        self.throttle_rate = throttle_rate
+        self.quota_exceeded_rate = quota_exceeded_rate
+        self.retry_after = retry_after
+        self.character_limit = character_limit
+        self.detected_source_language = detected_source_language
+        self.character_count = 0
+        self.request_count = 0
+        self.translate_request_count = 0
+        self.translated_text_count = 0
+        self.glossaries: Dict[str, dict] = {}
+        self.glossary_entries: Dict[str, Dict[str, str]] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v2"
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/v2/translate", self.translate)
+        app.router.add_get("/v2/usage", self.usage)
+        app.router.add_get("/v2/languages", self.languages)
+        app.router.add_get("/v2/glossaries", self.list_glossaries)
+        app.router.add_post("/v2/glossaries", self.create_glossary)
+        app.router.add_get("/v2/glossaries/{glossary_id}", self.get_glossary)
+        app.router.add_delete("/v2/glossaries/{glossary_id}", self.delete_glossary)
+        app.router.add_get("/v2/glossaries/{glossary_id}/entries", self.get_glossary_entries)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockDeepLServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def translate(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        self.translate_request_count += 1
+        params = await request.post() if request.method == "POST" else request.query
+        texts: List[str] = params.getall("text", [])
+        target_lang = params.get("target_lang")
+        source_lang = params.get("source_lang")
+
+        if not texts or not target_lang:
+            return web.json_response({"message": "Parameter 'text' and 'target_lang' are required."}, status=400)
+
+        characters = sum(len(text) for text in texts)
+        await asyncio.sleep(self.latency + characters * self.character_latency)
+
+        roll = random.random()
+        if roll < self.throttle_rate:
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+            return web.json_response({"message": "Too many requests"}, status=429, headers=headers)
+        if roll < self.throttle_rate + self.quota_exceeded_rate or \
+                self.character_count + characters > self.character_limit:
+            return web.json_response({"message": "Quota exceeded"}, status=456)
+
+        self.character_count += characters
+        self.translated_text_count += len(texts)
+        detected = source_lang or self.detected_source_language
+        entries = self.glossary_entries.get(params.get("glossary_id"), {})
+        for source_term, target_term in entries.items():
+            texts = [text.replace(source_term, target_term) for text in texts]
+        translations = [{"detected_source_language": detected, "text": f"[{target_lang}] {text}"} for text in texts]
+        return web.json_response({"translations": translations})
+
+    async def usage(self, _: web.Request) -> web.Response:
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({"character_count": self.character_count, "character_limit": self.character_limit})
+
+    async def languages(self, _: web.Request) -> web.Response:
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response([dict(language=code, name=name, supports_formality=formality)
+                                  for code, name, formality in LANGUAGES])
+
+    async def list_glossaries(self, _: web.Request) -> web.Response:
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({"glossaries": list(self.glossaries.values())})
+
+    async def create_glossary(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        params = await request.post()
+        entries = {}
+        for line in params.get("entries", "").splitlines():
+            source_term, target_term = line.split("\t", 1)
+            entries[source_term] = target_term
+
+        glossary_id = str(uuid.uuid4())
+        self.glossaries[glossary_id] = {
+            "glossary_id": glossary_id, "name": params["name"], "ready": True,
+            "source_lang": params["source_lang"].lower(), "target_lang": params["target_lang"].lower(),
+            "creation_time": datetime.datetime.now(datetime.timezone.utc).isoformat(), "entry_count": len(entries)
+        }
+        self.glossary_entries[glossary_id] = entries
+        return web.json_response(self.glossaries[glossary_id], status=201)
+
+    async def get_glossary(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        glossary = self.glossaries.get(request.match_info["glossary_id"])
+        if glossary is None:
+            return web.json_response({"message": "Glossary not found"}, status=404)
+        return web.json_response(glossary)
+
+    async def delete_glossary(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        glossary_id = request.match_info["glossary_id"]
+        if self.glossaries.pop(glossary_id, None) is None:
+            return web.json_response({"message": "Glossary not found"}, status=404)
+        del self.glossary_entries[glossary_id]
+        return web.Response(status=204)
+
+    async def get_glossary_entries(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        entries = self.glossary_entries.get(request.match_info["glossary_id"])
+        if entries is None:
+            return web.json_response({"message": "Glossary not found"}, status=404)
+        return web.Response(text="\n".join(f"{source}\t{target}" for source, target in entries.items()),
+                            content_type="text/tab-separated-values")
+
+
+async def serve(server: MockDeepLServer) -> None:
+    async with server:
+        print(f"Mock DeepL API listening on {server.base_url}")
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local mock of DeepL API v2.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base latency in seconds.")
+    parser.add_argument("--character-latency", type=float, default=0.0, help="Latency per character in seconds.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of 429 responses.")
+    parser.add_argument("--quota-exceeded-rate", type=float, default=0.0, help="Fraction of 456 responses.")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After of 429 responses in seconds.")
+    args = parser.parse_args()
+
+    server = MockDeepLServer(args.host, args.port, args.latency, args.character_latency, args.throttle_rate,
+                             args.quota_exceeded_rate, args.retry_after)
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
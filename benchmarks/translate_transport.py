@@ -0,0 +1,103 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+Benchmark of sending 50-text translation batches to DeepL API. The previous transport, which sent texts in the query
+string of a GET request and decoded the response twice, is compared against deepl.Client sending a form-encoded POST
+body and decoding the response once. Requests are served by the local mock DeepL API, so no DeepL quota is used.
+
+Run from the repository root with: python -m benchmarks.translate_transport
+"""
+
+from typing import List, Tuple
+from benchmarks.mock_deepl import MockDeepLServer
+import asyncio
+import aiohttp
+import deepl
+import logging
+import time
+import urllib.parse
+
+BATCH_SIZE = 50
+ROUNDS = 200
+
+
+async def legacy_translate(session: aiohttp.ClientSession, url: str, params: List[Tuple[str, str]]) -> dict:
+    async with session.get(url, params=params) as response:
+        await response.json(encoding="utf-8")
+        response.raise_for_status()
+        return await response.json(encoding="utf-8")
+
+
+async def current_translate(session: aiohttp.ClientSession, url: str, params: List[Tuple[str, str]]) -> dict:
+    body = urllib.parse.urlencode(params).encode("ascii")
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    async with session.post(url, data=body, headers=headers) as response:
+        return deepl.utils.json_loads(await response.read())
+
+
+async def measure(coroutine_function, *args) -> str:
+    try:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            await coroutine_function(*args)
+        elapsed = (time.perf_counter() - start) / ROUNDS
+    except aiohttp.ClientResponseError as e:
+        return f"failed with status {e.status}"
+
+    return f"{elapsed * 1e3:.3f} ms"
+
+
+async def run(text_length: int, session: aiohttp.ClientSession, client: deepl.Client) -> None:
+    texts = [f"{i:03} " + "lorem ipsum " * (text_length // 12) for i in range(BATCH_SIZE)]
+    params = [("text", text) for text in texts] + [("target_lang", "EN-US")]
+
+    url = client.base_url + "translate"
+    legacy = await measure(legacy_translate, session, url, params)
+    current = await measure(current_translate, session, url, params)
+    full = await measure(client.translate, texts, "EN-US", None, True, False)
+    batch = f"{BATCH_SIZE} x {text_length}"
+    print(f"{batch:<13} | {legacy:<24} | {current:<10} | {full}")
+
+
+async def main() -> None:
+    # Too long GET request lines are expected to fail, and the server would log them as errors
+    logging.getLogger("aiohttp.server").setLevel(logging.CRITICAL)
+    async with MockDeepLServer(character_limit=10 ** 12) as server, \
+            aiohttp.ClientSession(raise_for_status=True) as session:
+        # Rate limiting is effectively disabled to measure the transport only
+        rate_limiter = deepl.ratelimit.RateLimiter(deepl.ratelimit.TokenBucket(1e9, 10 ** 9),
+                                                   deepl.ratelimit.AdaptiveConcurrencyLimiter())
+        client = deepl.Client("benchmark", "benchmark", session, base_url=server.base_url, batch_delay=0,
+                              rate_limiter=rate_limiter)
+        await client.update_supported_languages()
+        json_backend = "orjson" if deepl.utils.orjson else "json"
+        print(f"JSON decoder: {json_backend}, time per batch")
+        print(f"{'Batch':<13} | {'GET, decoded twice':<24} | {'POST':<10} | deepl.Client, POST")
+        for text_length in (24, 120, 1000):
+            await run(text_length, session, client)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
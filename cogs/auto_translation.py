@@ -0,0 +1,124 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import discord
+from discord.ext import commands
+from translator_bot import TranslatorBot
+from typing import Optional
+
+
+class AutoTranslationCog(commands.Cog, name="Auto-translation",
+                         description="Commands for translating all messages in a channel automatically."):
+    """
+    A cog encapsulating commands for managing auto-translated channels. Usable by the bot owner and members who can
+    manage channels of the guild.
+    """
+
+    def __init__(self, bot: TranslatorBot):
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        if await self.bot.is_owner(ctx.author):
+            return True
+        return ctx.author.guild_permissions.manage_channels
+
+    @commands.group(name="autotranslate", aliases=["at"])
+    async def auto_translate(self, ctx: commands.Context) -> None:
+        """
+        Enable, disable or list auto-translated channels.
+
+        :param ctx:
+        """
+        if ctx.invoked_subcommand is None:
+            await ctx.send(f"Invalid auto-translate command: `{ctx.message.content.split()[1]}`")
+
+    @auto_translate.command(name="enable")
+    async def enable_auto_translation(self,
+                                      ctx: commands.Context,
+                                      target_language: str,
+                                      channel: Optional[discord.TextChannel] = None) -> None:
+        """
+        Translate all messages in a channel automatically.
+
+        :param ctx:
+        :param target_language: Target language for the translations. Case-insensitive.
+        :param channel: Channel to translate. If omitted, the current channel is used.
+        """
+        channel = channel or ctx.channel
+        if channel.guild != ctx.guild:
+            await ctx.send("Only channels of this guild can be auto-translated.")
+            return
+
+        language = self.bot.deepl_client.get_language(target_language, ignore_case=True)
+        if language is None:
+            await ctx.send(f"Language `{target_language}` is not supported.")
+            return
+
+        self.bot.auto_translator.enable(channel.id, language.language_code)
+        channels = dict(self.bot.settings.get(ctx.guild.id).auto_translate_channels)
+        channels[channel.id] = language.language_code
+        self.bot.settings.update(ctx.guild.id, auto_translate_channels=channels)
+        await ctx.send(f"Messages in {channel.mention} are now translated to {language.name}.")
+
+    @auto_translate.command(name="disable")
+    async def disable_auto_translation(self, ctx: commands.Context,
+                                       channel: Optional[discord.TextChannel] = None) -> None:
+        """
+        Stop translating messages in a channel automatically.
+
+        :param ctx:
+        :param channel: Channel to stop translating. If omitted, the current channel is used.
+        """
+        channel = channel or ctx.channel
+        if channel.guild != ctx.guild:
+            await ctx.send("Only channels of this guild can be auto-translated.")
+            return
+
+        self.bot.auto_translator.disable(channel.id)
+        channels = dict(self.bot.settings.get(ctx.guild.id).auto_translate_channels)
+        channels.pop(channel.id, None)
+        self.bot.settings.update(ctx.guild.id, auto_translate_channels=channels)
+        await ctx.send(f"Messages in {channel.mention} are no longer translated automatically.")
+
+    @auto_translate.command(name="list")
+    async def list_auto_translated_channels(self, ctx: commands.Context) -> None:
+        """
+        List auto-translated channels of the guild.
+
+        :param ctx:
+        """
+        channels = []
+        for channel in ctx.guild.text_channels:
+            target_language = self.bot.auto_translator.channels.get(channel.id)
+            if target_language:
+                channels.append(f"{channel.mention}: `{target_language}`")
+
+        await ctx.send("\n".join(channels) or "There are no auto-translated channels in this guild.")
+
+
+async def setup(bot: TranslatorBot) -> None:
+    await bot.add_cog(AutoTranslationCog(bot))
@@ -27,6 +27,7 @@ import logging
 from discord.ext import commands
 from typing import List, Any, Union
 from deepl.errors import *
+from translation_scheduler import SchedulerError
 
 
 _logger = logging.getLogger(__name__)
@@ -57,6 +58,12 @@ class ErrorHandlerCog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx: commands.Context, error: commands.CommandInvokeError) -> None:
+        # Cooldowns are raised before the command is invoked, so they are not wrapped in CommandInvokeError
+        if isinstance(error, commands.CommandOnCooldown):
+            await ctx.send(f"This command is on cooldown. Please try again in {max(1, round(error.retry_after))} "
+                           f"seconds.")
+            return
+
         try:
             original = error.original
         except AttributeError:
@@ -108,6 +115,10 @@ class ErrorHandlerCog(commands.Cog):
         elif isinstance(original, DeepLError):
             await ctx.send(str(original))
 
+        # The bot is too busy to translate, the message tells when to try again
+        elif isinstance(original, SchedulerError):
+            await ctx.send(str(original))
+
         # Unexpected exceptions fall here
         else:
             _logger.error("Ignoring unexpected exception:", exc_info=original)
@@ -23,12 +23,14 @@ SOFTWARE.
 """
 
 import discord
-import re
 import traceback
 import sys
 import datetime
 from discord.ext import commands
+from typing import List
 from translator_bot import TranslatorBot
+from message_router import Route
+from translation_scheduler import Priority, SchedulerError
 from deepl.errors import *
 
 
@@ -40,16 +42,16 @@ class EventListenerCog(commands.Cog):
     def __init__(self, bot: TranslatorBot):
         self.bot = bot
 
-    async def __translate_from_reply(self, message: discord.Message) -> None:
+    async def __translate_from_reply(self, message: discord.Message, split: List[str]) -> None:
         """
         Translate a message from a replied message. Is triggered only when the bot is mentioned.
 
         :param message: Message which triggered this event.
+        :param split: Content of the message split by whitespace.
         """
-        split = message.content.split()
         if len(split) > 3:
             await message.channel.send("Please send only the source language and target language, or only the "
-                                       "non-english target language, after mentioning me.")
+                                       "target language, after mentioning me.")
             return
 
         source_language = None
@@ -59,19 +61,32 @@ class EventListenerCog(commands.Cog):
         elif len(split) == 2:
             target_language = split[1]
         else:
-            target_language = "EN-US"
+            target_language = self.bot.default_target_language(message.guild)
+
+        reference = message.reference
+        channel = message.channel
+        if reference.channel_id != channel.id:
+            channel = self.bot.get_channel(reference.channel_id) or channel
+
+        try:
+            untranslated_text = await self.bot.message_resolver.resolve(reference, channel)
+        except discord.HTTPException:
+            await message.channel.send("Could not fetch the replied message. Please try again later.")
+            return
 
-        untranslated_text = message.reference.resolved.content
         if not untranslated_text:
             await message.reply("The replied message must contain text for translation.", mention_author=False)
             return
 
         try:
-            translations = await self.bot.deepl_client.translate(untranslated_text, target_language,
-                                                                 source_language=source_language)
+            translations = await self.bot.translate(untranslated_text, target_language,
+                                                    source_language=source_language,
+                                                    guild=message.guild, user=message.author, command="quick",
+                                                    priority=Priority.LOW,
+                                                    deadline=self.bot.deadline_for(message.created_at, "quick"))
             texts = [translation.text for translation in translations]
-            await message.reply("\n".join(texts), mention_author=False)
-        except DeepLError as e:
+            await self.bot.message_sender.send(message, "\n".join(texts), reply=True)
+        except (DeepLError, SchedulerError) as e:
             await message.channel.send(str(e))
         except Exception as e:
             ts = datetime.datetime.now().replace(microsecond=0)
@@ -84,23 +99,38 @@ class EventListenerCog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message, /) -> None:
+        self.bot.message_resolver.remember(message.id, message.content)
+        guild_id = message.guild.id if message.guild else None
+        route = self.bot.message_router.route(message.content, self.bot.command_prefix.prefixes_for(guild_id))
+        if route is Route.IGNORE:
+            if not message.author.bot:
+                self.bot.auto_translator.submit(message)
+            return
         if message.author == self.bot.user:
             return
 
-        try:
-            startswith_mention = re.fullmatch(rf"<@!?{self.bot.user.id}>", message.content.split()[0])
-        except IndexError:
-            startswith_mention = False
-
+        if route is Route.COMMAND:
+            await self.bot.process_commands(message)
         # Attempt to translate only if the message contains mention of this bot and a replied message reference
-        is_quick_translation = startswith_mention and message.reference
-        if is_quick_translation:
-            await self.__translate_from_reply(message)
-        elif startswith_mention:
+        elif message.reference:
+            await self.__translate_from_reply(message, message.content.split())
+        else:
             await message.channel.send("Translate a message with a mention by also replying to "
                                        "the translated message.")
-        else:
-            await self.bot.process_commands(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        if "content" in payload.data:
+            self.bot.message_resolver.update(payload.message_id, payload.data["content"])
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
+        self.bot.message_resolver.forget(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent) -> None:
+        for message_id in payload.message_ids:
+            self.bot.message_resolver.forget(message_id)
 
 
 async def setup(bot: TranslatorBot):
@@ -0,0 +1,187 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from deepl.glossary import Glossary
+from deepl.errors import GlossaryError
+from discord.ext import commands
+from translator_bot import TranslatorBot
+from typing import Dict
+
+
+async def can_manage_guild(ctx: commands.Context) -> bool:
+    if ctx.guild is None:
+        raise commands.NoPrivateMessage()
+    return await ctx.bot.is_owner(ctx.author) or ctx.author.guild_permissions.manage_guild
+
+
+class GlossaryCog(commands.Cog, name="Glossaries",
+                  description="Commands for managing DeepL glossaries and their use in the server."):
+    """
+    A cog encapsulating commands for managing DeepL glossaries. Glossaries belong to the DeepL account of the bot, so
+    only the bot owner can create and delete them. Members who can manage the guild can list the glossaries and choose
+    the ones used in the guild.
+    """
+
+    def __init__(self, bot: TranslatorBot):
+        self.bot = bot
+
+    def __find_glossary(self, reference: str) -> Glossary:
+        """
+        Find a cached glossary by its ID or name.
+
+        :param reference: ID or name of the glossary. Names are case-insensitive.
+        :return: The glossary.
+        :exception GlossaryError: No glossary has the ID or name.
+        """
+        for glossary in self.bot.deepl_client.glossaries:
+            if glossary.glossary_id == reference or glossary.name.casefold() == reference.casefold():
+                return glossary
+        raise GlossaryError(f"Glossary `{reference}` does not exist.")
+
+    @staticmethod
+    def __parse_entries(text: str) -> Dict[str, str]:
+        entries = {}
+        for pair in text.replace(";", "\n").splitlines():
+            if not pair.strip():
+                continue
+            if "=" not in pair:
+                raise GlossaryError(f"Invalid glossary entry `{pair.strip()}`. Entries must be given as "
+                                    f"`source term = target term`.")
+            source_term, target_term = pair.split("=", 1)
+            entries[source_term.strip()] = target_term.strip()
+        return entries
+
+    @staticmethod
+    def __format_glossary(glossary: Glossary) -> str:
+        return (f"`{glossary.name}` ({glossary.source_lang} -> {glossary.target_lang}, "
+                f"{glossary.entry_count} entries): `{glossary.glossary_id}`")
+
+    @commands.group(name="glossary")
+    async def glossary(self, ctx: commands.Context) -> None:
+        """
+        Manage DeepL glossaries.
+
+        :param ctx:
+        """
+        if ctx.invoked_subcommand is None:
+            await ctx.send(f"Invalid glossary command: `{ctx.message.content.split()[1]}`")
+
+    @commands.cooldown(1, 30, commands.BucketType.guild)
+    @commands.check(can_manage_guild)
+    @glossary.command(name="list")
+    async def list_glossaries(self, ctx: commands.Context) -> None:
+        """
+        List glossaries of the DeepL account and mark the ones used in the guild.
+
+        :param ctx:
+        """
+        glossaries = await self.bot.deepl_client.list_glossaries()
+        used = set(self.bot.settings.get(ctx.guild.id).glossary_ids) if ctx.guild else set()
+        lines = [("**Used** " if glossary.glossary_id in used else "") + self.__format_glossary(glossary)
+                 for glossary in glossaries]
+        await self.bot.message_sender.send(ctx, "\n".join(lines) or "There are no glossaries.")
+
+    @commands.cooldown(1, 30, commands.BucketType.guild)
+    @commands.check(can_manage_guild)
+    @glossary.command(name="entries")
+    async def get_glossary_entries(self, ctx: commands.Context, glossary: str) -> None:
+        """
+        Get entries of a glossary.
+
+        :param ctx:
+        :param glossary: ID or name of the glossary.
+        """
+        glossary = self.__find_glossary(glossary)
+        entries = await self.bot.deepl_client.get_glossary_entries(glossary.glossary_id)
+        lines = [f"{source_term} = {target_term}" for source_term, target_term in entries.items()]
+        await self.bot.message_sender.send(ctx, "\n".join(lines) or "The glossary has no entries.")
+
+    @commands.is_owner()
+    @glossary.command(name="create")
+    async def create_glossary(self, ctx: commands.Context, name: str, source_language: str, target_language: str, *,
+                              entries: str) -> None:
+        """
+        Create a glossary. Bot owner command.
+
+        :param ctx:
+        :param name: Name of the glossary.
+        :param source_language: Source language of the glossary.
+        :param target_language: Target language of the glossary.
+        :param entries: Entries as `source term = target term`, separated by line breaks or semicolons.
+        """
+        try:
+            glossary = await self.bot.deepl_client.create_glossary(name, source_language, target_language,
+                                                                   self.__parse_entries(entries))
+        except ValueError as e:
+            raise GlossaryError(str(e)) from e
+        await ctx.send(f"Created glossary {self.__format_glossary(glossary)}")
+
+    @commands.is_owner()
+    @glossary.command(name="delete")
+    async def delete_glossary(self, ctx: commands.Context, glossary: str) -> None:
+        """
+        Delete a glossary. Bot owner command.
+
+        :param ctx:
+        :param glossary: ID or name of the glossary.
+        """
+        glossary = self.__find_glossary(glossary)
+        await self.bot.deepl_client.delete_glossary(glossary.glossary_id)
+        await ctx.send(f"Deleted glossary `{glossary.name}`.")
+
+    @commands.check(can_manage_guild)
+    @glossary.command(name="use")
+    async def use_glossary(self, ctx: commands.Context, glossary: str) -> None:
+        """
+        Use a glossary in translations of the guild whenever the source language is given and matches the glossary.
+
+        :param ctx:
+        :param glossary: ID or name of the glossary.
+        """
+        glossary = self.__find_glossary(glossary)
+        glossary_ids = self.bot.settings.get(ctx.guild.id).glossary_ids
+        if glossary.glossary_id not in glossary_ids:
+            self.bot.settings.update(ctx.guild.id, glossary_ids=glossary_ids + (glossary.glossary_id,))
+        await ctx.send(f"Glossary `{glossary.name}` is now used in translations from {glossary.source_lang} to "
+                       f"{glossary.target_lang}.")
+
+    @commands.check(can_manage_guild)
+    @glossary.command(name="unuse")
+    async def unuse_glossary(self, ctx: commands.Context, glossary: str) -> None:
+        """
+        Stop using a glossary in translations of the guild.
+
+        :param ctx:
+        :param glossary: ID or name of the glossary.
+        """
+        glossary = self.__find_glossary(glossary)
+        glossary_ids = self.bot.settings.get(ctx.guild.id).glossary_ids
+        self.bot.settings.update(ctx.guild.id, glossary_ids=tuple(glossary_id for glossary_id in glossary_ids
+                                                                  if glossary_id != glossary.glossary_id))
+        await ctx.send(f"Glossary `{glossary.name}` is no longer used in this server.")
+
+
+async def setup(bot: TranslatorBot) -> None:
+    await bot.add_cog(GlossaryCog(bot))
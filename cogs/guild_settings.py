@@ -0,0 +1,112 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from discord.ext import commands
+from translator_bot import TranslatorBot
+
+
+class GuildSettingsCog(commands.Cog, name="Settings",
+                       description="Commands for changing the bot settings of the server."):
+    """
+    A cog encapsulating commands for changing guild settings. Usable by the bot owner and members who can manage the
+    guild.
+    """
+
+    MAX_PREFIX_LENGTH = 10
+
+    def __init__(self, bot: TranslatorBot):
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        if await self.bot.is_owner(ctx.author):
+            return True
+        return ctx.author.guild_permissions.manage_guild
+
+    @commands.group(name="settings")
+    async def guild_settings(self, ctx: commands.Context) -> None:
+        """
+        Show or change the bot settings of the guild.
+
+        :param ctx:
+        """
+        if ctx.invoked_subcommand is None:
+            await ctx.send(f"Invalid settings command: `{ctx.message.content.split()[1]}`")
+
+    @guild_settings.command(name="show")
+    async def show_settings(self, ctx: commands.Context) -> None:
+        """
+        Show the bot settings of the guild.
+
+        :param ctx:
+        """
+        prefixes = ", ".join(f"`{prefix}`" for prefix in self.bot.command_prefix.prefixes_for(ctx.guild.id))
+        await ctx.send(f"Command prefixes: {prefixes}\n"
+                       f"Default target language: `{self.bot.default_target_language(ctx.guild)}`")
+
+    @guild_settings.command(name="prefix")
+    async def set_prefix(self, ctx: commands.Context, *prefixes: str) -> None:
+        """
+        Set command prefixes of the guild. Without prefixes, the default prefixes are restored.
+
+        :param ctx:
+        :param prefixes: New command prefixes.
+        """
+        if any(len(prefix) > self.MAX_PREFIX_LENGTH for prefix in prefixes):
+            await ctx.send(f"Command prefixes can be at most {self.MAX_PREFIX_LENGTH} characters long.")
+            return
+        # An empty prefix would route every message of the guild to commands, and whitespace could never match
+        if any(not prefix or any(character.isspace() for character in prefix) for prefix in prefixes):
+            await ctx.send("Command prefixes cannot be empty or contain whitespace.")
+            return
+
+        # Longer prefixes are tried first so that a prefix is not shadowed by its own beginning
+        self.bot.settings.update(ctx.guild.id, prefixes=tuple(sorted(set(prefixes), key=len, reverse=True)) or None)
+        prefixes = ", ".join(f"`{prefix}`" for prefix in self.bot.command_prefix.prefixes_for(ctx.guild.id))
+        await ctx.send(f"Command prefixes are now {prefixes}.")
+
+    @guild_settings.command(name="language")
+    async def set_target_language(self, ctx: commands.Context, target_language: str = None) -> None:
+        """
+        Set the default target language of the guild. Without a language, the bot default is restored.
+
+        :param ctx:
+        :param target_language: New default target language. Case-insensitive.
+        """
+        language_code = None
+        if target_language:
+            language = self.bot.deepl_client.get_language(target_language, ignore_case=True)
+            if language is None:
+                await ctx.send(f"Language `{target_language}` is not supported.")
+                return
+            language_code = language.language_code
+
+        self.bot.settings.update(ctx.guild.id, target_language=language_code)
+        await ctx.send(f"Default target language is now `{self.bot.default_target_language(ctx.guild)}`.")
+
+
+async def setup(bot: TranslatorBot) -> None:
+    await bot.add_cog(GuildSettingsCog(bot))
@@ -22,6 +22,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import discord
 from discord.ext import commands
 from translator_bot import TranslatorBot
 
@@ -81,6 +82,65 @@ class ManagementCog(commands.Cog, name="Management",
         await self.bot.reload_extension(extension_name)
         await ctx.send(f"Successfully reloaded extension `{extension_name}`")
 
+    @commands.group(name="store")
+    async def manage_translation_store(self, ctx: commands.Context) -> None:
+        """
+        Inspect, flush or clear the persistent translation store.
+
+        :param ctx:
+        """
+        if ctx.invoked_subcommand is None:
+            await ctx.send(f"Invalid translation store command: `{ctx.message.content.split()[1]}`")
+
+    @manage_translation_store.command(name="info")
+    async def translation_store_info(self, ctx: commands.Context) -> None:
+        """
+        Get status of the persistent translation store.
+
+        :param ctx:
+        """
+        store = self.bot.deepl_client.store
+        if store is None:
+            await ctx.send("Persistent translation store is not configured.")
+            return
+
+        info = await store.info()
+        await ctx.send(f"Path: `{info['path']}`\n"
+                       f"Translations: {info['entries']}/{info['max_entries']}\n"
+                       f"Pending writes: {info['pending_writes']}\n"
+                       f"Size: {round(info['size_bytes'] / 1024, 1)} KiB")
+
+    @manage_translation_store.command(name="flush")
+    async def flush_translation_store(self, ctx: commands.Context) -> None:
+        """
+        Write pending translations to the persistent translation store.
+
+        :param ctx:
+        """
+        store = self.bot.deepl_client.store
+        if store is None:
+            await ctx.send("Persistent translation store is not configured.")
+            return
+
+        written = await store.flush()
+        await ctx.send(f"Wrote {written} pending translations to the translation store.")
+
+    @manage_translation_store.command(name="clear")
+    async def clear_translation_store(self, ctx: commands.Context) -> None:
+        """
+        Remove all translations from the persistent translation store and the in-memory cache.
+
+        :param ctx:
+        """
+        self.bot.deepl_client.cache.clear()
+        store = self.bot.deepl_client.store
+        if store is None:
+            await ctx.send("Cleared the translation cache. Persistent translation store is not configured.")
+            return
+
+        removed = await store.clear()
+        await ctx.send(f"Cleared the translation cache and removed {removed} translations from the translation store.")
+
     @commands.command(name="usage")
     async def get_deepl_translation_limits(self, ctx: commands.Context) -> None:
         """
@@ -88,13 +148,98 @@ class ManagementCog(commands.Cog, name="Management",
 
         :param ctx:
         """
+        ledger = self.bot.deepl_client.ledger
         response = await self.bot.deepl_client.get_usage()
+        ledger.reconcile(response)
         character_count = response["character_count"]
         character_limit = response["character_limit"]
 
-        await ctx.send(f"Character count: {character_count}\n"
-                       f"Character limit: {character_limit}\n\n"
-                       f"Usage: {round(character_count / character_limit, 3)}%")
+        message = (f"Character count: {character_count}\n"
+                   f"Character limit: {character_limit}\n\n"
+                   f"Usage: {round(character_count / character_limit * 100, 3)}%\n"
+                   f"Characters sent since startup: {ledger.total_characters}")
+
+        exhaustion = ledger.project_exhaustion()
+        if exhaustion:
+            message += f"\nCharacter limit is projected to be hit {discord.utils.format_dt(exhaustion, 'R')}."
+
+        await ctx.send(message)
+
+    @commands.command(name="stats")
+    async def get_statistics(self, ctx: commands.Context) -> None:
+        """
+        Get a summary of the bot metrics.
+
+        :param ctx:
+        """
+        metrics = self.bot.metrics
+        client = self.bot.deepl_client
+
+        def format_seconds(value: float) -> str:
+            return "n/a" if value is None else f"{round(value * 1000)} ms"
+
+        request_latency = metrics.get("deepl_request_seconds")
+        lines = ["**DeepL API requests**"]
+        for endpoint in sorted(label_values[0] for label_values in request_latency.label_sets()):
+            lines.append(f"`{endpoint}`: {request_latency.count(endpoint=endpoint)} requests, "
+                         f"p50 {format_seconds(request_latency.quantile(0.5, endpoint=endpoint))}, "
+                         f"p95 {format_seconds(request_latency.quantile(0.95, endpoint=endpoint))}")
+
+        errors = metrics.get("deepl_request_errors_total")
+        error_counts = ", ".join(f"{status} ({endpoint}): {int(count)}"
+                                 for (endpoint, status), count in sorted(errors.values().items()))
+        lines.append(f"Errors: {error_counts or 'none'}")
+        lines.append(f"Characters sent: {int(metrics.get('deepl_characters_sent_total').get())}, "
+                     f"saved by protecting spans: {int(metrics.get('deepl_characters_protected_total').get())}")
+        lines.append(f"Cache hit ratio: {round(client.cache.hit_ratio * 100, 1)}%")
+        lines.append(f"Queued texts: {client.batcher.queued_texts}, "
+                     f"requests waiting for rate limiter: {client.rate_limiter.concurrency.waiting}")
+
+        pool_stats = client.pool_stats
+        if pool_stats is not None:
+            queued = pool_stats.connection_queued_seconds
+            lines.append(f"Connections: {pool_stats.requests_in_flight}/{client.pool_limit or 'unlimited'} in use, "
+                         f"{int(pool_stats.connections_created.get())} opened, "
+                         f"reuse ratio {round(pool_stats.reuse_ratio * 100, 1)}%, "
+                         f"{queued.count()} waits for a free connection "
+                         f"(p95 {format_seconds(queued.quantile(0.95))})")
+
+        scheduler = self.bot.scheduler
+        scheduler_wait = metrics.get("bot_scheduler_wait_seconds")
+        lines.append(f"\n**Scheduler**\n{scheduler.queued} queued, {scheduler.running} running, "
+                     f"wait p95 {format_seconds(scheduler_wait.quantile(0.95))}, "
+                     f"{scheduler.shed_requests} shed, {scheduler.rejected_requests} rejected, "
+                     f"{scheduler.expired_requests} expired")
+        deferred = metrics.get("bot_deferred_interactions_total")
+        if deferred is not None:
+            deferred_counts = ", ".join(f"{reason}: {int(count)}"
+                                        for (reason,), count in sorted(deferred.values().items()))
+            lines.append(f"Deferred interactions: {deferred_counts or 'none'}")
+
+        translations = metrics.get("bot_translations_total")
+        translation_counts = ", ".join(f"{command}: {int(count)}"
+                                       for (command,), count in sorted(translations.values().items()))
+        lines.append(f"\n**Translations**\n{translation_counts or 'none'}")
+        skipped = sum(metrics.get("bot_skipped_translations_total").values().values())
+        inferred = sum(metrics.get("bot_inferred_source_languages_total").values().values())
+        lines.append(f"Detected locally: {int(skipped)} already in target language, {int(inferred)} source languages")
+
+        send_latency = metrics.get("discord_send_seconds")
+        loop_lag = metrics.get("bot_event_loop_lag_seconds")
+        lines.append(f"\n**Discord**\nSend latency p50 {format_seconds(send_latency.quantile(0.5))}, "
+                     f"p95 {format_seconds(send_latency.quantile(0.95))}\n"
+                     f"Event loop lag p95 {format_seconds(loop_lag.quantile(0.95))}")
+
+        await self.bot.message_sender.send(ctx, "\n".join(lines))
+
+    @commands.command(name="startup")
+    async def get_startup_timings(self, ctx: commands.Context) -> None:
+        """
+        Get durations of the bot startup phases.
+
+        :param ctx:
+        """
+        await ctx.send(self.bot.startup_profiler.format() or "Startup has not been profiled.")
 
     @commands.command(name="sync")
     async def sync_commands(self, ctx: commands.Context, guild_id: int = None) -> None:
@@ -114,17 +259,18 @@ class ManagementCog(commands.Cog, name="Management",
 
         :param ctx:
         """
-        current_languages = self.bot.deepl_client.supported_languages
-        updated_languages = await self.bot.deepl_client.update_supported_languages()
+        added, removed = await self.bot.deepl_client.refresh_supported_languages(self.bot.language_snapshot_path)
 
-        diff = len(updated_languages) - len(current_languages)
-        message = "Supported languages updated. "
-        if diff == 0:
-            message += "There were no new languages."
-        else:
-            message += f" There were {diff} new languages."
+        message = "Supported languages updated."
+        if not added and not removed:
+            message += " There were no changes."
+        if added:
+            message += "\nAdded: " + ", ".join(f"`{language.language_code}` ({language.name})" for language in added)
+        if removed:
+            message += "\nRemoved: " + ", ".join(f"`{language.language_code}` ({language.name})"
+                                                for language in removed)
 
-        await ctx.send(message)
+        await self.bot.message_sender.send(ctx, message)
 
 
 async def setup(bot: TranslatorBot):
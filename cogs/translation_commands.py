@@ -26,7 +26,15 @@ SOFTWARE.
 from deepl.translation import Translation
 from discord.ext import commands
 from translator_bot import TranslatorBot
-from typing import List
+from translation_scheduler import Priority
+from typing import AsyncIterator, List, Optional
+import asyncio
+import contextlib
+import discord
+import logging
+
+
+_logger = logging.getLogger(__name__)
 
 
 class TranslationCog(commands.Cog, name="Translations",
@@ -35,29 +43,89 @@ class TranslationCog(commands.Cog, name="Translations",
     A cog encapsulating various translation commands utilizing DeepL API.
     """
 
+    # Discord requires interactions to be acknowledged within 3 seconds. The margin leaves time for the acknowledgement
+    # itself to reach Discord
+    ACKNOWLEDGE_WINDOW = 3.0
+    ACKNOWLEDGE_MARGIN = 0.5
+
     def __init__(self, bot: TranslatorBot):
         self.bot = bot
+        self._deferred_interactions = bot.metrics.counter("bot_deferred_interactions_total",
+                                                          "Interactions deferred because of slow translations.",
+                                                          ["reason"])
 
-    @staticmethod
-    async def __send_translations(ctx: commands.Context, translations: List[Translation]) -> None:
+    @contextlib.asynccontextmanager
+    async def __translation_scope(self, ctx: commands.Context) -> AsyncIterator[dict]:
+        """
+        Give a translation command its priority and deadline. Interactions are served first, and they are deferred when
+        the expected scheduler wait plus DeepL latency would miss the acknowledgement window. If the translation is
+        still running when the window is about to close, the interaction is deferred then, so that slow translations
+        are answered late instead of failing the interaction.
+
+        :param ctx:
+        :return: Kwargs for TranslatorBot.translate().
+        """
+        interaction = ctx.interaction
+        if interaction is None:
+            yield {"priority": Priority.NORMAL, "deadline": self.bot.deadline_for(ctx.message.created_at, "command")}
+            return
+
+        loop = asyncio.get_running_loop()
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        remaining = self.ACKNOWLEDGE_WINDOW - self.ACKNOWLEDGE_MARGIN - max(0.0, elapsed)
+        if self.bot.expected_translation_seconds(Priority.INTERACTION) >= remaining:
+            await self.__defer(ctx, "expected")
+
+        late_deferral: Optional[asyncio.Task] = None
+
+        def defer_late() -> None:
+            nonlocal late_deferral
+            late_deferral = loop.create_task(self.__defer(ctx, "late"))
+
+        timer = None if interaction.response.is_done() else loop.call_later(max(0.0, remaining), defer_late)
+        try:
+            yield {"priority": Priority.INTERACTION,
+                   "deadline": self.bot.deadline_for(interaction.created_at, "interaction")}
+        finally:
+            if timer is not None:
+                timer.cancel()
+            # Responding before the deferral is finished would acknowledge the interaction twice
+            if late_deferral is not None:
+                await late_deferral
+
+    async def __defer(self, ctx: commands.Context, reason: str) -> None:
+        if ctx.interaction.response.is_done():
+            return
+        try:
+            await ctx.defer()
+        except (discord.HTTPException, discord.InteractionResponded):
+            _logger.exception("Failed to defer a translation interaction.")
+            return
+        self._deferred_interactions.inc(reason=reason)
+
+    async def __send_translations(self, ctx: commands.Context, translations: List[Translation]) -> None:
         formatted_translations = []
         for translation in translations:
             source_lang = translation.source_language.language_code
             target_lang = translation.target_language.language_code
             formatted_translations.append(f"{source_lang} -> {target_lang}: {translation.text}")
 
-        await ctx.reply("\n".join(formatted_translations), mention_author=False)
+        await self.bot.message_sender.send(ctx, "\n".join(formatted_translations), reply=True)
 
     @commands.guild_only()
-    @commands.hybrid_command(name="translate", description="Translate text to english.", aliases=["t"])
+    @commands.hybrid_command(name="translate", description="Translate text to the default language of the server.",
+                             aliases=["t"])
     async def translate(self, ctx: commands.Context, *, text: str) -> None:
         """
-        Translate text to English.
+        Translate text to the default target language of the guild, which is English unless configured otherwise.
 
         :param ctx:
         :param text: Text to translate. Source language is detected automatically.
         """
-        translations = await self.bot.deepl_client.translate(text, "EN-US")
+        async with self.__translation_scope(ctx) as options:
+            translations = await self.bot.translate(text, self.bot.default_target_language(ctx.guild),
+                                                    guild=ctx.guild, user=ctx.author, command=ctx.command.name,
+                                                    **options)
         await self.__send_translations(ctx, translations)
 
     @commands.guild_only()
@@ -71,7 +139,9 @@ class TranslationCog(commands.Cog, name="Translations",
         :param target_language: Target language for the translation. Must be and abbreviation. Case-insensitive.
         :param text: Text to translate. Source language is detected automatically.
         """
-        translations = await self.bot.deepl_client.translate(text, target_language=target_language)
+        async with self.__translation_scope(ctx) as options:
+            translations = await self.bot.translate(text, target_language, guild=ctx.guild, user=ctx.author,
+                                                    command=ctx.command.name, **options)
         await self.__send_translations(ctx, translations)
 
     @commands.guild_only()
@@ -92,7 +162,10 @@ class TranslationCog(commands.Cog, name="Translations",
         :param target_language: Target language for the translated text.
         :param text: Text to translate.
         """
-        translations = await self.bot.deepl_client.translate(text, target_language, source_language=source_language)
+        async with self.__translation_scope(ctx) as options:
+            translations = await self.bot.translate(text, target_language, source_language=source_language,
+                                                    guild=ctx.guild, user=ctx.author, command=ctx.command.name,
+                                                    **options)
         await self.__send_translations(ctx, translations)
 
     @commands.hybrid_command(name="languages", description="Get list of all supported language abbreviations.")
@@ -104,7 +177,7 @@ class TranslationCog(commands.Cog, name="Translations",
         supported_languages = []
         for language in self.bot.deepl_client.supported_languages:
             supported_languages.append(f"`{language.language_code}`: {language.name}")
-        await ctx.send("\n".join(supported_languages))
+        await self.bot.message_sender.send(ctx, "\n".join(supported_languages))
 
 
 # noinspection PyTypeChecker
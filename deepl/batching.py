@@ -0,0 +1,192 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from .language import Language
+from .translation import Translation
+import asyncio
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+BatchKey = Tuple[Optional[str], str, Optional[str]]
+SendBatch = Callable[[List[str], Language, Optional[Language], Optional[str]], Awaitable[List[Translation]]]
+
+
+class _Batch:
+    """
+    Texts waiting to be translated in a single DeepL API request, and the futures of their callers.
+    """
+
+    def __init__(self,
+                 target_language: Language,
+                 source_language: Optional[Language],
+                 glossary_id: Optional[str]) -> None:
+        self.target_language = target_language
+        self.source_language = source_language
+        self.glossary_id = glossary_id
+        self.texts: List[str] = []
+        self.futures: List[asyncio.Future] = []
+        self.length = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class TranslationBatcher:
+    """
+    Coalesce concurrent translations sharing the same source and target language and glossary into batched DeepL API
+    requests.
+    A batch is sent after a short delay from its first text, or immediately when it is full.
+    """
+
+    def __init__(self,
+                 send: SendBatch,
+                 delay: float = 0.005,
+                 max_batch_size: int = 50,
+                 max_batch_length: int = 4000,
+                 measure: Callable[[str], int] = len) -> None:
+        """
+        :param send: Coroutine function translating a list of texts in a single request. Called with the texts,
+        target language, source language and glossary ID, and must return translations in the same order as the
+        texts.
+        :param delay: Maximum time in seconds to wait for more texts before sending a batch.
+        :param max_batch_size: Maximum number of texts in a batch.
+        :param max_batch_length: Maximum total length of texts in a batch, as measured with the measure function.
+        A single text longer than this is still sent, but in a batch of its own.
+        :param measure: Function measuring the length of a text. Defaults to the number of characters.
+        :exception ValueError: Delay is negative, or maximum batch size or length is not positive.
+        """
+        if delay < 0:
+            raise ValueError("Batch delay cannot be negative.")
+        if max_batch_size <= 0 or max_batch_length <= 0:
+            raise ValueError("Maximum batch size and length must be positive.")
+
+        self._send = send
+        self._delay = delay
+        self._max_batch_size = max_batch_size
+        self._max_batch_length = max_batch_length
+        self._measure = measure
+        self._batches: Dict[BatchKey, _Batch] = {}
+        # The event loop keeps only weak references to tasks, so batches being sent are kept here until they finish
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.texts_sent = 0
+
+    @property
+    def queued_texts(self) -> int:
+        return sum(len(batch.texts) for batch in self._batches.values())
+
+    async def close(self) -> None:
+        """
+        Cancel the batches waiting to be sent and the batches being sent. Their callers get CancelledError.
+        """
+        for batch in self._batches.values():
+            batch.timer.cancel()
+            for future in batch.futures:
+                future.cancel()
+        self._batches.clear()
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def translate(self,
+                        texts: List[str],
+                        target_language: Language,
+                        source_language: Optional[Language],
+                        glossary_id: Optional[str] = None) -> List[Translation]:
+        """
+        Translate texts as part of the next batch or batches sharing the same source and target language and glossary.
+
+        :param texts: Texts to translate.
+        :param target_language: Resolved target language.
+        :param source_language: Resolved source language, or None to detect it automatically.
+        :param glossary_id: ID of the glossary to use, if any.
+        :return: List of translations in the same order as the texts.
+        """
+        futures = [self.__submit(text, target_language, source_language, glossary_id) for text in texts]
+        await asyncio.wait(futures)
+        return [future.result() for future in futures]
+
+    def __submit(self,
+                 text: str,
+                 target_language: Language,
+                 source_language: Optional[Language],
+                 glossary_id: Optional[str]) -> asyncio.Future:
+        key = (source_language.language_code if source_language else None, target_language.language_code, glossary_id)
+        length = self._measure(text)
+        batch = self._batches.get(key)
+        if batch and batch.length + length > self._max_batch_length:
+            self.__flush(key)
+            batch = None
+
+        loop = asyncio.get_running_loop()
+        if batch is None:
+            batch = _Batch(target_language, source_language, glossary_id)
+            batch.timer = loop.call_later(self._delay, self.__flush, key)
+            self._batches[key] = batch
+
+        future = loop.create_future()
+        batch.texts.append(text)
+        batch.futures.append(future)
+        batch.length += length
+
+        if len(batch.texts) >= self._max_batch_size:
+            self.__flush(key)
+
+        return future
+
+    def __flush(self, key: BatchKey) -> None:
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+
+        batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self.__send_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def __send_batch(self, batch: _Batch) -> None:
+        self.batches_sent += 1
+        self.texts_sent += len(batch.texts)
+        try:
+            translations = await self._send(batch.texts, batch.target_language, batch.source_language,
+                                            batch.glossary_id)
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Callers would otherwise wait forever for a batch that was cancelled, e.g. when the client was closed
+            for future in batch.futures:
+                future.cancel()
+            raise
+
+        for future, translation in zip(batch.futures, translations):
+            # Callers may have been cancelled while the batch was being translated
+            if not future.done():
+                future.set_result(translation)
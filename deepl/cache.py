@@ -0,0 +1,149 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Optional, Tuple
+from .language import Language
+from .translation import Translation
+import unicodedata
+import time
+
+
+CacheKey = Tuple[str, Optional[str], str]
+
+
+class TranslationCache:
+    """
+    A bounded in-memory cache of finalized translations. Entries are evicted in least recently used order when the
+    cache is full, and they expire after a time to live.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600) -> None:
+        """
+        :param max_size: Maximum number of cached translations.
+        :param ttl: Time to live for a cached translation in seconds.
+        :exception ValueError: Maximum size or time to live is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive.")
+        if ttl <= 0:
+            raise ValueError("Cache time to live must be positive.")
+
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[CacheKey, Tuple[float, Translation]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0.0
+        return self.hits / lookups
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normalize text for cache lookups. Unicode is normalized to NFC form and surrounding whitespace is stripped.
+
+        :param text: Text to normalize.
+        :return: Normalized text.
+        """
+        return unicodedata.normalize("NFC", text).strip()
+
+    @classmethod
+    def make_key(cls,
+                 text: str,
+                 source_language: Optional[Language],
+                 target_language: Language,
+                 glossary_id: Optional[str] = None) -> CacheKey:
+        """
+        Make a cache key for a translation.
+
+        :param text: Untranslated text.
+        :param source_language: Resolved source language, or None if the source language is detected automatically.
+        :param target_language: Resolved target language.
+        :param glossary_id: ID of the glossary used in the translation, if any.
+        :return: Key for the cache.
+        """
+        source_code = source_language.language_code if source_language else None
+        target_code = target_language.language_code
+        if glossary_id:
+            # Glossary translations are kept apart from plain ones without changing the shape of the key, so that
+            # stored translations remain compatible
+            target_code = f"{target_code}/{glossary_id}"
+        return cls.normalize_text(text), source_code, target_code
+
+    def get(self, key: CacheKey) -> Optional[Translation]:
+        """
+        Get a cached translation and mark it as recently used.
+
+        :param key: Key of the translation.
+        :return: Cached translation, or None if there is no translation or it has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, translation = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return translation
+
+    def put(self, key: CacheKey, translation: Translation) -> None:
+        """
+        Add a finalized translation to the cache. The least recently used translation is evicted if the cache is full.
+
+        :param key: Key of the translation.
+        :param translation: Finalized translation.
+        """
+        self._entries[key] = (time.monotonic() + self._ttl, translation)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all translations from the cache. Hit and miss counters are not reset.
+        """
+        self._entries.clear()
@@ -0,0 +1,153 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from typing import List, Tuple
+import re
+
+
+Chunk = Tuple[str, str]
+
+# Boundaries from the most preferred to the least preferred: paragraphs, lines, sentences and words
+_BOUNDARIES = [
+    re.compile(r"(\n[^\S\n]*\n\s*)"),
+    re.compile(r"(\n\s*)"),
+    re.compile(r"(?<=[.!?…。！？])(\s+)"),
+    re.compile(r"(\s+)")
+]
+
+
+def split_text(text: str, max_length: int, markup: bool = False) -> List[Chunk]:
+    """
+    Split text into chunks on paragraph, line, sentence and word boundaries, preferring the first ones. Words longer
+    than the maximum length are split as they are. Leading and trailing whitespace of the text is stripped.
+
+    :param text: Text to split.
+    :param max_length: Maximum length of a chunk in characters.
+    :param markup: Whether the text is escaped for XML tag handling, in which case tags and entities are not split
+    within long words.
+    :return: List of chunks as tuples of the chunk text and the whitespace separating it from the next chunk. The
+    stripped text can be reassembled by joining the chunk texts with their separators.
+    :exception ValueError: Maximum length is not positive.
+    """
+    if max_length <= 0:
+        raise ValueError("Maximum chunk length must be positive.")
+
+    text = text.strip()
+    if not text:
+        return []
+
+    return [(content, separator) for content, separator in _split(text, max_length, 0, markup)]
+
+
+def join_chunks(texts: List[str], chunks: List[Chunk]) -> str:
+    """
+    Join texts with the separators of chunks they were made from, e.g. translations of the chunks.
+
+    :param texts: Texts in the same order as the chunks.
+    :param chunks: Chunks returned by split_text.
+    :return: Joined text.
+    """
+    return "".join(text + separator for text, (_, separator) in zip(texts, chunks)).rstrip()
+
+
+def _split(text: str, max_length: int, level: int, markup: bool) -> List[List[str]]:
+    if len(text) <= max_length:
+        return [[text, ""]]
+    if level == len(_BOUNDARIES):
+        if markup:
+            return [[part, ""] for part in _split_markup_safely(text, max_length)]
+        return [[text[start:start + max_length], ""] for start in range(0, len(text), max_length)]
+
+    parts = _BOUNDARIES[level].split(text)
+    contents = parts[0::2]
+    separators = parts[1::2] + [""]
+
+    chunks: List[List[str]] = []
+    current = None
+    for content, separator in zip(contents, separators):
+        if not content:
+            if current:
+                current[1] += separator
+            elif chunks:
+                chunks[-1][1] += separator
+            continue
+
+        if len(content) > max_length:
+            if current:
+                chunks.append(current)
+                current = None
+            sub_chunks = _split(content, max_length, level + 1, markup)
+            sub_chunks[-1][1] += separator
+            chunks.extend(sub_chunks)
+        elif current is None:
+            current = [content, separator]
+        elif len(current[0]) + len(current[1]) + len(content) <= max_length:
+            current[0] += current[1] + content
+            current[1] = separator
+        else:
+            chunks.append(current)
+            current = [content, separator]
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def _split_markup_safely(text: str, max_length: int) -> List[str]:
+    # Words are split as they are, but XML tags and entities of protected texts, such as <m0/> and &amp;, are kept whole
+    parts = []
+    start = 0
+    while len(text) - start > max_length:
+        cut = start + max_length
+        opening = max(text.rfind("<", start, cut), text.rfind("&", start, cut))
+        closing = ">" if opening >= 0 and text[opening] == "<" else ";"
+        if opening > start and text.find(closing, opening, cut) == -1:
+            cut = opening
+        parts.append(text[start:cut])
+        start = cut
+    parts.append(text[start:])
+    return parts
+
+
+def pack_chunks(chunks: List[Chunk], max_texts: int, max_length: int) -> List[List[int]]:
+    """
+    Pack chunks in order into batches limited by the number of texts and their total length.
+
+    :param chunks: Chunks to pack.
+    :param max_texts: Maximum number of chunks in a batch.
+    :param max_length: Maximum total length of chunk texts in a batch. A chunk longer than this gets a batch of its
+    own.
+    :return: List of batches as lists of chunk indices.
+    """
+    batches: List[List[int]] = []
+    length = 0
+    for i, (content, _) in enumerate(chunks):
+        if not batches or len(batches[-1]) >= max_texts or length + len(content) > max_length:
+            batches.append([])
+            length = 0
+        batches[-1].append(i)
+        length += len(content)
+
+    return batches
@@ -23,13 +23,25 @@ SOFTWARE.
 """
 
 from __future__ import annotations
-from typing import List, Optional, Union, Tuple
+from typing import Dict, Iterable, List, Optional, Union, Tuple
 from .language import Language
 from .translation import Translation
+from .models import Translation as TranslationPayload
+from .cache import TranslationCache, CacheKey
+from .store import TranslationStore
+from .batching import TranslationBatcher
+from .quota import QuotaLedger, Account
+from .glossary import Glossary, parse_entries, format_entries
+from .metrics import MetricsRegistry
+from .session import ConnectionPoolStats, create_session
 from .errors import *
-from . import utils
+from . import utils, ratelimit, chunking, snapshot, protection
+import asyncio
 import aiohttp
+import collections
 import logging
+import os
+import urllib.parse
 
 _logger = logging.getLogger(__name__)
 
@@ -40,16 +52,45 @@ class Client:
         translate = "/translate"
         usage = "/usage"
         languages = "/languages?type=target"
+        glossaries = "/glossaries"
+        glossary = "/glossaries/{glossary_id}"
+        glossary_entries = "/glossaries/{glossary_id}/entries"
+
+    # DeepL API limits request bodies to 128 KiB. Form encoding at most triples the UTF-8 encoded size of a text
+    MAX_BATCH_BYTES = 40000
+
+    # 429 and 529 are used by DeepL API for throttling, other statuses are transient server errors
+    THROTTLED_STATUSES = frozenset((429, 529))
+    RETRIED_STATUSES = THROTTLED_STATUSES | frozenset((500, 502, 503, 504))
 
     def __init__(
             self,
             api_token: str, user_agent: str,
-            aiohttp_session: aiohttp.ClientSession
+            aiohttp_session: Optional[aiohttp.ClientSession] = None,
+            cache: Optional[TranslationCache] = None,
+            store: Optional[TranslationStore] = None,
+            batch_delay: float = 0.005,
+            rate_limiter: Optional[ratelimit.RateLimiter] = None,
+            request_timeout: float = 30,
+            ledger: Optional[QuotaLedger] = None,
+            base_url: Optional[str] = None,
+            metrics: Optional[MetricsRegistry] = None,
+            connection_options: Optional[dict] = None,
+            protect_spans: bool = True
     ) -> None:
         # utils.configure_logging()
         self._user_agent = user_agent
-        self._session = aiohttp_session
         self._supported_languages: List[Language] = []
+        self._language_index: Dict[str, Language] = {}
+        self._casefold_language_index: Dict[str, Language] = {}
+        self._cache = cache if cache is not None else TranslationCache()
+        self._store = store
+        self._batcher = TranslationBatcher(self.__translate_uncached, delay=batch_delay,
+                                           max_batch_length=self.MAX_BATCH_BYTES, measure=utils.utf8_length)
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self._glossaries: Dict[str, Glossary] = {}
+        self._glossary_entries: Dict[str, Tuple[Glossary, Dict[str, str]]] = {}
+        self._protect_spans = protect_spans
 
         self._api_token = api_token
         if api_token.endswith(":fx"):
@@ -57,6 +98,30 @@ class Client:
         else:
             self._version = "pro"
 
+        if base_url is None:
+            if self._version == "free":
+                base_url = "https://api-free.deepl.com/v2/"
+            else:
+                base_url = "https://api.deepl.com/v2/"
+        self._base_url = base_url.rstrip("/") + "/"
+
+        self._rate_limiter = rate_limiter or ratelimit.RateLimiter.for_version(self._version)
+        self._request_timeout = request_timeout
+        self._ledger = ledger if ledger is not None else QuotaLedger()
+
+        self._metrics = metrics if metrics is not None else MetricsRegistry()
+        self.__register_metrics()
+
+        # DeepL traffic gets its own connection pool unless a session is given, so that other HTTP requests of the
+        # application cannot starve or evict the kept-alive connections to DeepL API. The session is created on first
+        # use, because aiohttp sessions must be created in a running event loop
+        self._pool_stats: Optional[ConnectionPoolStats] = None
+        self._owns_session = aiohttp_session is None
+        self._connection_options = connection_options or {}
+        if aiohttp_session is None:
+            self._pool_stats = ConnectionPoolStats(self._metrics)
+        self._session: Optional[aiohttp.ClientSession] = aiohttp_session
+
         _logger.info(f"Logging in using {self._version} version of DeepL token.")
 
     @property
@@ -67,6 +132,123 @@ class Client:
     def version(self) -> str:
         return self._version
 
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @property
+    def cache(self) -> TranslationCache:
+        return self._cache
+
+    @property
+    def store(self) -> Optional[TranslationStore]:
+        return self._store
+
+    @property
+    def batcher(self) -> TranslationBatcher:
+        return self._batcher
+
+    @property
+    def rate_limiter(self) -> ratelimit.RateLimiter:
+        return self._rate_limiter
+
+    @property
+    def ledger(self) -> QuotaLedger:
+        return self._ledger
+
+    @property
+    def metrics(self) -> MetricsRegistry:
+        return self._metrics
+
+    @property
+    def pool_stats(self) -> Optional[ConnectionPoolStats]:
+        """
+        Utilisation statistics of the connection pool, or None if the session was given by the caller.
+        """
+        return self._pool_stats
+
+    @property
+    def pool_limit(self) -> int:
+        """
+        Maximum number of connections in the pool, 0 meaning unlimited.
+        """
+        if self._session is None:
+            return self._connection_options.get("limit", 32)
+        return self._session.connector.limit if self._session.connector is not None else 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Session used for DeepL API requests. An own session is created on first access if none was given.
+        """
+        if self._session is None:
+            self._session = create_session(self._pool_stats, **self._connection_options)
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Cancel pending batched translations, and close the session of the client if it was created by the client.
+        """
+        await self._batcher.close()
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def prewarm(self, connections: int = 2) -> int:
+        """
+        Open connections to DeepL API ahead of the first translations, so that they do not pay for DNS lookups and
+        TCP and TLS handshakes. The connections are opened with concurrent usage requests, which do not count against
+        the character quota, and are then kept alive by the pool.
+
+        :param connections: Number of connections to open.
+        :return: Number of connections that were opened successfully.
+        """
+        results = await asyncio.gather(*(self.__request_deepl_api(self.ApiPath.usage) for _ in range(connections)),
+                                       return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            _logger.warning(f"Failed to pre-warm {len(failures)} of {connections} DeepL API connections: "
+                            f"{failures[0]!r}")
+        return connections - len(failures)
+
+    def __register_metrics(self) -> None:
+        metrics = self._metrics
+        self._metric_request_latency = metrics.histogram("deepl_request_seconds",
+                                                         "Latency of DeepL API requests.", ["endpoint"])
+        self._metric_request_errors = metrics.counter("deepl_request_errors_total",
+                                                      "Failed DeepL API requests by status.", ["endpoint", "status"])
+        self._metric_rate_limit_wait = metrics.histogram("deepl_rate_limit_wait_seconds",
+                                                         "Time DeepL API requests waited for the rate limiter.")
+        self._metric_characters_sent = metrics.counter("deepl_characters_sent_total",
+                                                       "Characters sent to DeepL API for translation.")
+        self._metric_texts_translated = metrics.counter("deepl_texts_translated_total",
+                                                        "Texts translated with DeepL API.")
+        self._metric_characters_protected = metrics.counter(
+            "deepl_characters_protected_total",
+            "Characters of mentions, emoji, URLs and code kept out of DeepL API requests.")
+
+        metrics.counter("deepl_cache_hits_total", "Translation cache hits.").set_function(lambda: self._cache.hits)
+        metrics.counter("deepl_cache_misses_total",
+                        "Translation cache misses.").set_function(lambda: self._cache.misses)
+        metrics.gauge("deepl_cache_entries", "Translations in the cache.").set_function(lambda: len(self._cache))
+        metrics.gauge("deepl_batch_queue_texts",
+                      "Texts waiting to be sent in a batch.").set_function(lambda: self._batcher.queued_texts)
+        metrics.gauge("deepl_in_flight_translations",
+                      "Distinct texts being translated.").set_function(lambda: len(self._in_flight))
+        metrics.gauge("deepl_rate_limiter_waiting", "Requests waiting for a concurrency slot.").set_function(
+            lambda: self._rate_limiter.concurrency.waiting)
+        metrics.gauge("deepl_rate_limiter_in_use", "Requests holding a concurrency slot.").set_function(
+            lambda: self._rate_limiter.concurrency.in_use)
+        metrics.gauge("deepl_concurrency_limit", "Adaptive concurrency limit.").set_function(
+            lambda: self._rate_limiter.concurrency.limit)
+        metrics.gauge("deepl_connection_pool_limit", "Maximum number of connections to DeepL API.").set_function(
+            lambda: self.pool_limit)
+        metrics.counter("deepl_ledger_characters_total",
+                        "Characters charged to the quota ledger.").set_function(lambda: self._ledger.total_characters)
+        if self._store is not None:
+            metrics.gauge("deepl_store_pending_writes",
+                          "Translations waiting to be written to the store.").set_function(
+                lambda: self._store.pending_writes)
+
     def get_language(self, representation: Union[str, Language], ignore_case: bool = False) -> Optional[Language]:
         """
         Convert a string representing language to an actual Language object.
@@ -81,20 +263,9 @@ class Client:
         if isinstance(representation, Language):
             return representation
 
-        representation = utils.replace_aliases(representation, ignore_case=ignore_case)
-
         if ignore_case:
-            representation = representation.casefold()
-        for language in self.supported_languages:
-            lang_name = language.name
-            lang_abbr = language.language_code
-            if ignore_case:
-                lang_name = lang_name.casefold()
-                lang_abbr = lang_abbr.casefold()
-            if representation == lang_name or representation == lang_abbr:
-                return language
-
-        return None
+            return self._casefold_language_index.get(representation.casefold())
+        return self._language_index.get(representation)
 
     def is_supported_language(self, search: str, ignore_case: bool = False) -> bool:
         """
@@ -119,50 +290,213 @@ class Client:
         for raw in await self.__request_deepl_api(self.ApiPath.languages):
             languages.append(Language(raw))
 
-        self._supported_languages = languages
+        self.set_supported_languages(languages)
+        return languages
+
+    async def refresh_supported_languages(
+            self,
+            snapshot_path: Optional[str] = None
+    ) -> Tuple[List[Language], List[Language]]:
+        """
+        Update supported languages in the DeepL API and compare them to the current ones. The languages are replaced
+        and written to the snapshot only if they have changed.
+
+        :param snapshot_path: Path to the language snapshot file, if any.
+        :return: Tuple of added languages and removed languages. A language whose name or formality support changed
+        is both removed and added. The snapshot is also written if it does not exist.
+        """
+        response = await self.__request_deepl_api(self.ApiPath.languages)
+        languages = [Language(raw) for raw in response]
+
+        def identity(language: Language) -> tuple:
+            return language.language_code, language.name, language.supports_formality
+
+        current = {identity(language) for language in self._supported_languages}
+        updated = {identity(language) for language in languages}
+        added = [language for language in languages if identity(language) not in current]
+        removed = [language for language in self._supported_languages if identity(language) not in updated]
+
+        if added or removed:
+            self.set_supported_languages(languages)
+        if snapshot_path and (added or removed or not os.path.exists(snapshot_path)):
+            await asyncio.get_running_loop().run_in_executor(None, snapshot.write_languages, snapshot_path, languages)
+            _logger.info(f"Wrote {len(languages)} supported languages to {snapshot_path}.")
+
+        return added, removed
+
+    async def load_language_snapshot(self, snapshot_path: str) -> Optional[List[Language]]:
+        """
+        Load supported languages from a snapshot file, so that they are available without a DeepL API request.
+
+        :param snapshot_path: Path to the language snapshot file.
+        :return: List of loaded languages, or None if the snapshot does not exist or is malformed.
+        """
+        try:
+            languages = await asyncio.get_running_loop().run_in_executor(None, snapshot.read_languages, snapshot_path)
+        except (OSError, ValueError):
+            _logger.exception(f"Failed to read language snapshot {snapshot_path}.")
+            return None
+
+        if languages:
+            self.set_supported_languages(languages)
         return languages
 
+    def set_supported_languages(self, languages: List[Language]) -> None:
+        """
+        Replace supported languages and rebuild the index used for resolving language representations. The index
+        maps language codes, names and aliases to languages, both as they are and casefolded.
+
+        :param languages: List of supported languages.
+        """
+        index: Dict[str, Language] = {}
+        for language in languages:
+            # The first matching language wins, as in a linear search through the list
+            index.setdefault(language.language_code, language)
+            index.setdefault(language.name, language)
+
+        for alias, language_code in utils.LANGUAGE_ALIASES.items():
+            if language_code in index:
+                index[alias] = index[language_code]
+
+        casefold_index: Dict[str, Language] = {}
+        for representation, language in index.items():
+            casefold_index.setdefault(representation.casefold(), language)
+        for alias, language_code in utils.LANGUAGE_ALIASES.items():
+            if language_code in index:
+                casefold_index[alias.casefold()] = index[language_code]
+
+        # Swap everything at once so that lookups never see a partially built index
+        self._supported_languages, self._language_index, self._casefold_language_index = \
+            languages, index, casefold_index
+
     async def __request_deepl_api(self,
                                   path: str,
                                   params: Union[dict, List[Tuple[str, str]]] = None,
-                                  timeout: int = 5, **kwargs) -> dict:
+                                  timeout: float = None,
+                                  method: str = "GET",
+                                  data: Union[dict, List[Tuple[str, str]]] = None,
+                                  path_params: Optional[Dict[str, str]] = None,
+                                  accept: Optional[str] = None,
+                                  retry_transient: bool = True,
+                                  **kwargs) -> Union[dict, str, None]:
         """
-        Fetch data from DeepL API.
+        Fetch data from DeepL API. Requests are rate limited on the client side, and throttled, failed or timed out
+        requests are retried with jittered exponential backoff honouring the Retry-After header until the deadline.
 
         :param path: DeepL API url to fetch data from.
-        :param params: Params needed for the API request.
-        :param timeout: Timeout for the request in seconds.
-        :param kwargs: Kwargs for aiohttp.ClientSession.get() method.
-        :return: DeepL API response in JSON.
-        :raises DeepLApiError: If there are too many frequent API requests or the API quota is exceeded.
-        """
-        if self.version == "free":
-            base_url = "https://api-free.deepl.com/v2/"
-        else:
-            base_url = "https://api.deepl.com/v2/"
-
-        url = base_url + path.lstrip("/")
+        :param params: Params needed for the API request, sent in the query string.
+        :param timeout: Total deadline for the request and its retries in seconds. If omitted, the client default is
+        used.
+        :param method: HTTP method of the request.
+        :param data: Params sent as a form-encoded request body.
+        :param path_params: Values for the placeholders in the path, e.g. a glossary ID.
+        :param accept: Media type of the requested response, if other than JSON.
+        :param retry_transient: Whether to retry server errors, dropped connections and timed out attempts. These may
+        happen after DeepL API has processed the request, so requests that are not idempotent should only be retried
+        when they were throttled or could not be sent at all.
+        :param kwargs: Kwargs for aiohttp.ClientSession.request() method.
+        :return: DeepL API response decoded from JSON, or as text if another media type was requested. None if the
+        response has no content.
+        :raises TooManyRequestsError: DeepL API kept throttling requests until the deadline.
+        :raises DeepLQuotaExceededError: DeepL API quota is exceeded.
+        :raises DeadlineExceededError: DeepL API did not respond successfully before the deadline.
+        :raises DeepLApiError: DeepL API responded with an unexpected error status.
+        """
+        # Metrics are labelled with the path template, so that e.g. glossary IDs do not create new label values
+        endpoint = path.split("?")[0]
+        if path_params:
+            path = path.format(**{name: urllib.parse.quote(value, safe="") for name, value in path_params.items()})
+        url = self._base_url + path.lstrip("/")
         headers = {"Authorization": f"DeepL-Auth-Key {self._api_token}", "User-Agent": self._user_agent}
+        if accept:
+            headers["Accept"] = accept
+        if data is not None:
+            # Encode the body only once for all attempts
+            data = urllib.parse.urlencode(data).encode("ascii")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
 
-        async with self._session.get(url, headers=headers, params=params, timeout=timeout, **kwargs) as response:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self._request_timeout)
+        retried_statuses = self.RETRIED_STATUSES if retry_transient else self.THROTTLED_STATUSES
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise DeadlineExceededError("DeepL API did not respond in time. Please try again later.")
 
-            if response.status == 429:
-                raise TooManyRequestsError("Too many DeepL API requests. Consider adding some delay between frequent "
-                                           "requests.")
-            elif response.status == 456:
-                raise DeepLQuotaExceededError("DeepL API quota exceeded. This can be resolved by upgrading DeepL "
-                                              "subscription.")
+            wait_started = loop.time()
+            try:
+                await asyncio.wait_for(self._rate_limiter.acquire(), remaining)
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError("Too many pending DeepL API requests. Please try again later.")
 
-            response_content = await response.json(encoding="utf-8")
+            request_started = loop.time()
+            self._metric_rate_limit_wait.observe(request_started - wait_started)
+            throttled = False
+            retry_after = None
+            status = "ok"
             try:
-                response.raise_for_status()
+                async with self.session.request(method, url, headers=headers, params=params, data=data,
+                                                 raise_for_status=False,
+                                                 timeout=self.__attempt_timeout(deadline - loop.time()),
+                                                 **kwargs) as response:
 
-            except aiohttp.ClientResponseError:
-                msg = response_content.get("message")
-                _logger.exception(f"Error {response.status}: {msg}")
+                    if response.status >= 400:
+                        status = str(response.status)
 
-            else:
-                return await response.json(encoding="utf-8")
+                    if response.status in retried_statuses:
+                        throttled = response.status in self.THROTTLED_STATUSES
+                        retry_after = ratelimit.parse_retry_after(response.headers.get("Retry-After"))
+                        _logger.warning(f"DeepL API responded with status {response.status}, "
+                                        f"attempt {attempt + 1}.")
+                    elif response.status == 456:
+                        raise DeepLQuotaExceededError("DeepL API quota exceeded. This can be resolved by upgrading "
+                                                      "DeepL subscription.")
+                    elif response.status >= 400:
+                        try:
+                            msg = utils.json_loads(await response.read()).get("message")
+                        except (ValueError, AttributeError):
+                            msg = None
+                        _logger.error(f"Error {response.status}: {msg}")
+                        raise DeepLApiError(f"DeepL API responded with error {response.status}.", response.status)
+                    else:
+                        body = await response.read()
+                        if not body:
+                            return None
+                        if accept:
+                            return body.decode("utf-8")
+                        # Decoding is not retried, so a malformed body is raised as is
+                        return utils.json_loads(body)
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                status = type(e).__name__
+                _logger.warning(f"DeepL API request failed with {type(e).__name__}, attempt {attempt + 1}.")
+                if not retry_transient and not isinstance(e, aiohttp.ClientConnectorError):
+                    raise DeadlineExceededError("DeepL API did not respond. The request may have been processed, so "
+                                                "it was not retried.") from e
+
+            finally:
+                self._rate_limiter.release(throttled=throttled, retry_after=retry_after)
+                self._metric_request_latency.observe(loop.time() - request_started, endpoint=endpoint)
+                if status != "ok":
+                    self._metric_request_errors.inc(endpoint=endpoint, status=status)
+
+            delay = ratelimit.backoff_delay(attempt, retry_after=retry_after)
+            if loop.time() + delay >= deadline:
+                if throttled:
+                    raise TooManyRequestsError("DeepL API is receiving too many requests. Please try again later.")
+                raise DeadlineExceededError("DeepL API did not respond in time. Please try again later.")
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def __attempt_timeout(self, remaining: float) -> aiohttp.ClientTimeout:
+        """
+        Limit a request attempt to the time remaining until the deadline, keeping the per-phase timeouts of the session.
+        """
+        timeout = self.session.timeout
+        return aiohttp.ClientTimeout(total=remaining, connect=timeout.connect, sock_connect=timeout.sock_connect,
+                                     sock_read=timeout.sock_read)
 
     async def get_usage(self) -> dict:
         """
@@ -172,25 +506,210 @@ class Client:
         """
         return await self.__request_deepl_api(self.ApiPath.usage)
 
+    @property
+    def glossaries(self) -> List[Glossary]:
+        """
+        Glossaries known to the client, as of the last time they were listed or fetched.
+        """
+        return list(self._glossaries.values())
+
+    def __cache_glossary(self, glossary: Glossary) -> Glossary:
+        self._glossaries[glossary.glossary_id] = glossary
+        cached_entries = self._glossary_entries.get(glossary.glossary_id)
+        if cached_entries and not cached_entries[0].is_same_version(glossary):
+            del self._glossary_entries[glossary.glossary_id]
+        return glossary
+
+    async def list_glossaries(self) -> List[Glossary]:
+        """
+        List all glossaries of the DeepL account and refresh the cached glossaries. Cached entries are kept for
+        glossaries whose readiness and number of entries have not changed.
+
+        :return: List of glossaries.
+        """
+        response = await self.__request_deepl_api(self.ApiPath.glossaries)
+        glossaries = [Glossary(payload) for payload in response["glossaries"]]
+
+        listed = {glossary.glossary_id for glossary in glossaries}
+        for glossary_id in list(self._glossaries):
+            if glossary_id not in listed:
+                self.__forget_glossary(glossary_id)
+
+        return [self.__cache_glossary(glossary) for glossary in glossaries]
+
+    async def get_glossary(self, glossary_id: str, use_cache: bool = True) -> Glossary:
+        """
+        Get a glossary.
+
+        :param glossary_id: ID of the glossary.
+        :param use_cache: Return the cached glossary if available. Glossaries that are not ready yet are always fetched.
+        :return: The glossary.
+        :exception GlossaryError: Glossary does not exist.
+        """
+        glossary = self._glossaries.get(glossary_id)
+        if use_cache and glossary is not None and glossary.ready:
+            return glossary
+
+        try:
+            response = await self.__request_deepl_api(self.ApiPath.glossary, path_params={"glossary_id": glossary_id})
+        except DeepLApiError as e:
+            if e.status in (400, 404):
+                self.__forget_glossary(glossary_id)
+                raise GlossaryError(f"Glossary `{glossary_id}` does not exist.") from e
+            raise
+
+        return self.__cache_glossary(Glossary(response))
+
+    async def get_glossary_entries(self, glossary_id: str) -> Dict[str, str]:
+        """
+        Get entries of a glossary. Entries are cached and fetched again only if the readiness or the number of entries
+        of the glossary has changed.
+
+        :param glossary_id: ID of the glossary.
+        :return: Dictionary of source terms and their target terms.
+        :exception GlossaryError: Glossary does not exist.
+        """
+        glossary = await self.get_glossary(glossary_id)
+        cached_entries = self._glossary_entries.get(glossary_id)
+        if cached_entries and cached_entries[0].is_same_version(glossary):
+            return dict(cached_entries[1])
+
+        response = await self.__request_deepl_api(self.ApiPath.glossary_entries,
+                                                  path_params={"glossary_id": glossary_id},
+                                                  accept="text/tab-separated-values")
+        entries = parse_entries(response or "")
+        if glossary.ready:
+            self._glossary_entries[glossary_id] = (glossary, entries)
+        return dict(entries)
+
+    async def create_glossary(self,
+                              name: str,
+                              source_language: Union[str, Language],
+                              target_language: Union[str, Language],
+                              entries: Dict[str, str]) -> Glossary:
+        """
+        Create a glossary.
+
+        :param name: Name of the glossary.
+        :param source_language: A string representing the source language, or a Language object.
+        :param target_language: A string representing the target language, or a Language object.
+        :param entries: Dictionary of source terms and their target terms.
+        :return: The created glossary.
+        :exception ValueError: Name is empty, or entries are empty or invalid.
+        :exception LanguageNotSupportedError: Source language or target language is not supported.
+        """
+        if not name:
+            raise ValueError("Glossary name must be provided.")
+
+        tsv = format_entries(entries)
+        languages = []
+        for representation in (source_language, target_language):
+            language = self.get_language(representation, ignore_case=True)
+            if language is None:
+                raise LanguageNotSupportedError(f"Language `{representation}` is not supported.")
+            # Glossaries are defined for base languages without regional variants
+            languages.append(language.language_code.split("-")[0])
+
+        data = [("name", name), ("source_lang", languages[0]), ("target_lang", languages[1]), ("entries", tsv),
+                ("entries_format", "tsv")]
+        response = await self.__request_deepl_api(self.ApiPath.glossaries, method="POST", data=data,
+                                                  retry_transient=False)
+        glossary = self.__cache_glossary(Glossary(response))
+        if glossary.ready:
+            self._glossary_entries[glossary.glossary_id] = (glossary, parse_entries(tsv))
+        return glossary
+
+    async def delete_glossary(self, glossary_id: str) -> None:
+        """
+        Delete a glossary.
+
+        :param glossary_id: ID of the glossary.
+        :exception GlossaryError: Glossary does not exist.
+        """
+        try:
+            await self.__request_deepl_api(self.ApiPath.glossary, method="DELETE",
+                                           path_params={"glossary_id": glossary_id}, retry_transient=False)
+        except DeepLApiError as e:
+            if e.status in (400, 404):
+                self.__forget_glossary(glossary_id)
+                raise GlossaryError(f"Glossary `{glossary_id}` does not exist.") from e
+            raise
+
+        self.__forget_glossary(glossary_id)
+
+    def find_glossary(self,
+                      glossary_ids: Iterable[str],
+                      source_language: Union[str, Language],
+                      target_language: Union[str, Language]) -> Optional[Glossary]:
+        """
+        Find a cached glossary for a language pair without DeepL API requests.
+
+        :param glossary_ids: IDs of the glossaries to consider, in order of preference.
+        :param source_language: A string representing the source language, or a Language object.
+        :param target_language: A string representing the target language, or a Language object.
+        :return: The first ready glossary for the languages, or None if the languages are not supported or none of the
+        cached glossaries is for them.
+        """
+        source_lang_obj = self.get_language(source_language, ignore_case=True)
+        target_lang_obj = self.get_language(target_language, ignore_case=True)
+        if source_lang_obj is None or target_lang_obj is None:
+            return None
+
+        for glossary_id in glossary_ids:
+            glossary = self._glossaries.get(glossary_id)
+            if glossary and glossary.ready and glossary.matches(source_lang_obj.language_code,
+                                                                target_lang_obj.language_code):
+                return glossary
+
+        return None
+
+    def __forget_glossary(self, glossary_id: str) -> None:
+        self._glossaries.pop(glossary_id, None)
+        self._glossary_entries.pop(glossary_id, None)
+
     async def translate(
             self,
             text: Union[str, List[str]],
             target_language: Union[str, Language],
             source_language: Optional[Union[str, Language]] = None,
-            ignore_case: bool = True
+            ignore_case: bool = True,
+            use_cache: bool = True,
+            timeout: Optional[float] = None,
+            accounts: Iterable[Account] = (),
+            batched: bool = True,
+            glossary_id: Optional[str] = None,
+            protected: bool = False
     ) -> List[Translation]:
         """
-        Translate text from source language to target language.
+        Translate text from source language to target language. Unless disabled for the client, mentions, custom
+        emoji, timestamps, URLs and code are kept out of the texts sent to DeepL API, and put back into the
+        translations as they were.
 
         :param text: Text to translate or list of texts to translate. Up to 50 translations is supported at once.
         :param target_language: A string representing the target language, or a Language object.
         :param source_language: A string representing the source language, or a Language object. If omitted,
         the source language is detected automatically.
         :param ignore_case: Ignore case for detecting target and source languages and their aliases.
+        :param use_cache: Use cached and stored translations if available. If False, all texts are translated with
+        DeepL API and the cache and store are refreshed with the new translations.
+        :param timeout: Total deadline in seconds for waiting the translations. If omitted, the deadline of the DeepL
+        API requests is used. Translations still finishing after the deadline are cached for later requests.
+        :param accounts: Quota ledger accounts charged for characters sent to DeepL API, e.g. [("guild", 1234)].
+        :param batched: Coalesce the texts with concurrent translations into shared DeepL API requests. If False, the
+        texts are sent in a request of their own.
+        :param glossary_id: ID of a glossary to use. The glossary must be for the source and target languages. If the
+        source language is omitted, the source language of the glossary is used. Glossary metadata is cached, so using
+        a glossary does not need extra DeepL API requests.
+        :param protected: The texts are protected already, e.g. chunks of a text protected as a whole, and are sent as
+        they are. The spans must then be restored by the caller.
         :return: List of translations.
         :exception ValueError: Text to translate or target language has falsy value, or more than 50 texts to translate
         was provided.
         :exception LanguageNotSupportedError: Target language or source language is not supported.
+        :exception GlossaryError: Glossary does not exist or is not for the source and target languages.
+        :exception DeadlineExceededError: Translations were not finished before the deadline.
+        :exception BudgetExceededError: Translation would exceed the character budget of an account.
+        :exception DeepLQuotaExceededError: Translation would exceed the monthly character limit.
         """
         if not target_language:
             raise ValueError("Target language is mandatory for translation.")
@@ -210,20 +729,324 @@ class Client:
         if source_language and not source_lang_obj:
             raise LanguageNotSupportedError(f"Source language `{source_language}` is not supported.")
 
+        if glossary_id:
+            glossary = await self.get_glossary(glossary_id)
+            if source_lang_obj is None:
+                # DeepL API requires the source language when a glossary is used
+                source_lang_obj = self.get_language(glossary.source_lang, ignore_case=True)
+            if source_lang_obj is None or not glossary.matches(source_lang_obj.language_code,
+                                                               target_lang_obj.language_code):
+                raise GlossaryError(f"Glossary `{glossary.name}` cannot be used for translations to "
+                                    f"`{target_lang_obj.language_code}`.")
+
         if isinstance(text, str):
-            params = [("text", text)]
+            texts = [text]
         else:
-            params = [("text", untranslated) for untranslated in text]
+            texts = text
+
+        if not self._protect_spans or protected:
+            return await self.__translate_texts(texts, target_lang_obj, source_lang_obj, use_cache, timeout, accounts,
+                                                batched, glossary_id)
+
+        protected_texts = [protection.protect(untranslated) for untranslated in texts]
+        saved = [protected.saved_characters for protected in protected_texts]
+        sent = [i for i, protected in enumerate(protected_texts) if protected.text]
+        translations = {}
+        if sent:
+            translated = await self.__translate_texts([protected_texts[i].text for i in sent], target_lang_obj,
+                                                      source_lang_obj, use_cache, timeout, accounts, batched,
+                                                      glossary_id, [saved[i] for i in sent])
+            translations = dict(zip(sent, translated))
+
+        results = []
+        for i, (untranslated, protected) in enumerate(zip(texts, protected_texts)):
+            translation = translations.get(i)
+            if translation is None:
+                # Texts of only mentions, emoji, URLs or code are not sent at all
+                self._metric_characters_protected.inc(saved[i])
+                results.append(self.untranslated(untranslated, target_lang_obj, source_lang_obj or target_lang_obj))
+                continue
+
+            restored = Translation(dict(detected_source_language=translation.detected_source_language,
+                                        text=protected.restore(translation.text)))
+            restored.finalize(translation.source_language, translation.target_language)
+            results.append(restored)
+        return results
+
+    async def __translate_texts(self,
+                                texts: List[str],
+                                target_lang_obj: Language,
+                                source_lang_obj: Optional[Language],
+                                use_cache: bool,
+                                timeout: Optional[float],
+                                accounts: Iterable[Account],
+                                batched: bool,
+                                glossary_id: Optional[str],
+                                saved_characters: Optional[List[int]] = None) -> List[Translation]:
+        """
+        Translate texts using the cache, the store and single-flight DeepL API requests.
+
+        :param saved_characters: Characters saved by protecting each text, counted for the texts sent to DeepL API.
+        :return: List of translations in the same order as the texts.
+        """
+        keys = [self._cache.make_key(untranslated, source_lang_obj, target_lang_obj, glossary_id)
+                for untranslated in texts]
+        translations: List[Optional[Translation]] = [None] * len(texts)
+        if use_cache:
+            translations = [self._cache.get(key) for key in keys]
+
+        # Translate each distinct normalized text only once, even if it appears multiple times in the request
+        missing = list(dict.fromkeys(key for key, translation in zip(keys, translations) if translation is None))
+        if not missing:
+            return translations
+
+        found: Dict[CacheKey, Translation] = {}
+        if use_cache and self._store is not None:
+            for key, payload in (await self._store.get_many(missing)).items():
+                found[key] = self.__finalize_translation(payload, target_lang_obj)
+            missing = [key for key in missing if key not in found]
+
+        for key, translation in found.items():
+            self._cache.put(key, translation)
+
+        if missing:
+            if saved_characters:
+                # Texts already being translated by another caller are not sent again
+                saved_by_key = dict(zip(reversed(keys), reversed(saved_characters)))
+                self._metric_characters_protected.inc(sum(saved_by_key[key] for key in missing
+                                                          if key not in self._in_flight))
+            found.update(await self.__translate_single_flight(missing, target_lang_obj, source_lang_obj, timeout,
+                                                              accounts, batched, glossary_id))
+
+        return [translation or found[key] for key, translation in zip(keys, translations)]
+
+    async def translate_long(
+            self,
+            text: str,
+            target_language: Union[str, Language],
+            source_language: Optional[Union[str, Language]] = None,
+            chunk_length: int = 1500,
+            batch_length: int = 6000,
+            max_concurrency: int = 4,
+            **kwargs
+    ) -> Translation:
+        """
+        Translate a text of any length. Long texts are split into chunks on paragraph and sentence boundaries, and
+        the chunks are packed into batches that are translated concurrently. Translated chunks are reassembled in
+        the original order. Texts fitting in a single chunk are translated as is. Spans are protected in the whole text
+        before it is split, so that protected spans are never split between chunks.
+
+        :param text: Text to translate.
+        :param target_language: A string representing the target language, or a Language object.
+        :param source_language: A string representing the source language, or a Language object. If omitted,
+        the source language is detected automatically.
+        :param chunk_length: Maximum length of a chunk in characters.
+        :param batch_length: Maximum total length of chunks translated in a single DeepL API request.
+        :param max_concurrency: Maximum number of batches translated at the same time.
+        :param kwargs: Kwargs for translate() method.
+        :return: Finalized translation of the whole text. The source language is the one detected for most of the
+        chunks.
+        :exception ValueError: Text to translate or target language has falsy value.
+        :exception BudgetExceededError: Translating the whole text would exceed the budget of an account.
+        :exception DeepLQuotaExceededError: Translating the whole text would exceed the monthly DeepL character limit.
+        """
+        if not text:
+            raise ValueError("Translated text must be provided.")
+
+        # Spans are protected before chunking, so that a code block is never split between chunks and translated
+        protected = protection.protect(text) if self._protect_spans else None
+        chunks = chunking.split_text(protected.text if protected else text, chunk_length, markup=protected is not None)
+        if len(chunks) <= 1:
+            return (await self.translate(text, target_language, source_language=source_language, **kwargs))[0]
+
+        # Chunks are charged as they are sent, so the whole text is checked against the budgets first. Otherwise a
+        # budget running out partway through would leave the earlier chunks charged for an incomplete translation
+        accounts = kwargs["accounts"] = list(kwargs.get("accounts", ()))
+        self._ledger.check(accounts, sum(self.__charged_length(chunk) for chunk, _ in chunks))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def translate_batch(indices: List[int]) -> List[Translation]:
+            async with semaphore:
+                # Batches are sent in their own requests, so that they are not coalesced back together
+                return await self.translate([chunks[i][0] for i in indices], target_language,
+                                            source_language=source_language, batched=False,
+                                            protected=protected is not None, **kwargs)
+
+        batches = chunking.pack_chunks(chunks, 50, batch_length)
+        results = await asyncio.gather(*[translate_batch(indices) for indices in batches])
+        translations = [translation for batch_translations in results for translation in batch_translations]
 
-        params.append(("target_lang", target_lang_obj.language_code))
+        counts = collections.Counter(translation.detected_source_language for translation in translations)
+        detected_source_language = counts.most_common(1)[0][0]
+        joined = chunking.join_chunks([translation.text for translation in translations], chunks)
+        if protected:
+            self._metric_characters_protected.inc(protected.saved_characters)
+            joined = protected.restore(joined)
+        return self.__finalize_translation(dict(detected_source_language=detected_source_language, text=joined),
+                                           translations[0].target_language)
 
-        if source_lang_obj:
-            params.append(("source_lang", source_lang_obj.language_code))
+    def untranslated(self,
+                     text: str,
+                     target_language: Union[str, Language],
+                     source_language: Union[str, Language],
+                     ignore_case: bool = True) -> Translation:
+        """
+        Make a finalized translation of a text that is already in the target language, without DeepL API. Used when
+        the language of a text is known to match the target language, so that translating it would change nothing.
+
+        :param text: Text already in the target language.
+        :param target_language: A string representing the target language, or a Language object.
+        :param source_language: A string representing the language of the text, or a Language object.
+        :param ignore_case: Ignore case for detecting target and source languages and their aliases.
+        :return: Finalized translation with the text as is.
+        :exception LanguageNotSupportedError: Target language or source language is not supported.
+        """
+        target_lang_obj = self.get_language(target_language, ignore_case=ignore_case)
+        source_lang_obj = self.get_language(utils.strip_source_language_exceptions(source_language, ignore_case)
+                                            if isinstance(source_language, str) else source_language,
+                                            ignore_case=ignore_case)
+        if not target_lang_obj:
+            raise LanguageNotSupportedError(f"Target language `{target_language}` is not supported.")
+        if not source_lang_obj:
+            raise LanguageNotSupportedError(f"Source language `{source_language}` is not supported.")
+
+        translation = Translation(dict(detected_source_language=source_lang_obj.language_code.split("-")[0],
+                                       text=text))
+        translation.finalize(source_lang_obj, target_lang_obj)
+        return translation
 
-        response = await self.__request_deepl_api(self.ApiPath.translate, params=params)
-        translations = [Translation(payload) for payload in response["translations"]]
+    async def __translate_single_flight(self,
+                                        keys: List[CacheKey],
+                                        target_language: Language,
+                                        source_language: Optional[Language],
+                                        timeout: Optional[float] = None,
+                                        accounts: Iterable[Account] = (),
+                                        batched: bool = True,
+                                        glossary_id: Optional[str] = None) -> Dict[CacheKey, Translation]:
+        """
+        Translate texts so that identical translations are requested from DeepL API only once at a time. Keys that
+        are already being translated are awaited from the first caller, and the rest are translated in a shared task.
+        Cancelling a caller does not cancel the shared translation for other callers. Only the characters of texts
+        that are sent to DeepL API are charged from the accounts.
 
-        for translation in translations:
-            translation.finalize(self.get_language(translation.detected_source_language), target_lang_obj)
+        :param keys: Cache keys of the texts to translate.
+        :param target_language: Resolved target language.
+        :param source_language: Resolved source language, or None to detect it automatically.
+        :param timeout: Deadline for waiting the translations in seconds, or None to wait until they are finished.
+        :param accounts: Quota ledger accounts charged for the translated characters.
+        :param batched: Coalesce the texts with concurrent translations into shared DeepL API requests.
+        :param glossary_id: ID of the glossary to use, if any.
+        :return: Dictionary of keys and their finalized translations.
+        :exception DeadlineExceededError: Translations were not finished before the deadline.
+        :exception BudgetExceededError: Translation would exceed the character budget of an account.
+        :exception DeepLQuotaExceededError: Translation would exceed the monthly character limit.
+        """
+        owned = [key for key in keys if key not in self._in_flight]
+        if owned:
+            accounts = list(accounts)
+            characters = sum(self.__charged_length(key[0]) for key in owned)
+            self._ledger.charge(accounts, characters)
+
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in owned}
+            self._in_flight.update(futures)
+            task = loop.create_task(self.__fetch_translations(owned, target_language, source_language, accounts,
+                                                              characters, batched, glossary_id))
+            task.add_done_callback(lambda done: self.__resolve_in_flight(done, futures))
+
+        # Waiting does not cancel the shared futures if this caller is cancelled or the deadline is exceeded
+        waited = {key: self._in_flight[key] for key in keys}
+        _, pending = await asyncio.wait(set(waited.values()), timeout=timeout)
+        if pending:
+            raise DeadlineExceededError("Translation took too long. Please try again later.")
+        return {key: future.result() for key, future in waited.items()}
+
+    async def __fetch_translations(self,
+                                   keys: List[CacheKey],
+                                   target_language: Language,
+                                   source_language: Optional[Language],
+                                   accounts: List[Account],
+                                   characters: int,
+                                   batched: bool,
+                                   glossary_id: Optional[str]) -> Dict[CacheKey, Translation]:
+        texts = [key[0] for key in keys]
+        try:
+            if batched:
+                fetched = await self._batcher.translate(texts, target_language, source_language, glossary_id)
+            else:
+                fetched = await self.__translate_uncached(texts, target_language, source_language, glossary_id)
+        except BaseException:
+            self._ledger.refund(accounts, characters)
+            raise
+
+        fetched_by_key = dict(zip(keys, fetched))
+        for key, translation in fetched_by_key.items():
+            self._cache.put(key, translation)
+        if self._store is not None:
+            self._store.put_many({key: translation.as_payload() for key, translation in fetched_by_key.items()})
+
+        return fetched_by_key
+
+    def __resolve_in_flight(self, task: asyncio.Task, futures: Dict[CacheKey, asyncio.Future]) -> None:
+        for key, future in futures.items():
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result()[key])
+
+    def __charged_length(self, text: str) -> int:
+        """
+        :param text: Text sent to DeepL API.
+        :return: Number of characters charged for the text. Protected texts are escaped for XML tag handling, and
+        measured unescaped.
+        """
+        return len(protection.unescape(text)) if self._protect_spans else len(text)
+
+    def __finalize_translation(self, payload: TranslationPayload, target_language: Language) -> Translation:
+        """
+        Make a finalized translation from a translation payload.
+
+        :param payload: Translation payload from DeepL API or the translation store.
+        :param target_language: Resolved target language of the translation.
+        :return: Finalized translation.
+        """
+        translation = Translation(payload)
+        translation.finalize(self.get_language(translation.detected_source_language), target_language)
+        return translation
+
+    async def __translate_uncached(self,
+                                   texts: List[str],
+                                   target_language: Language,
+                                   source_language: Optional[Language],
+                                   glossary_id: Optional[str] = None) -> List[Translation]:
+        """
+        Translate texts with DeepL API in a single request without using the cache or batching.
+
+        :param texts: Texts to translate.
+        :param target_language: Resolved target language.
+        :param source_language: Resolved source language, or None to detect it automatically.
+        :param glossary_id: ID of the glossary to use, if any.
+        :return: List of finalized translations in the same order as the texts.
+        """
+        params = [("text", untranslated) for untranslated in texts]
+        params.append(("target_lang", target_language.language_code))
+
+        if source_language:
+            # Source languages have no regional variants
+            params.append(("source_lang", source_language.language_code.split("-")[0]))
+        if glossary_id:
+            params.append(("glossary_id", glossary_id))
+        if self._protect_spans:
+            # Placeholders of protected spans are XML tags. Sentences are still split on newlines, as without tags
+            params.extend((("tag_handling", "xml"), ("split_sentences", "1")))
 
-        return translations
+        # Texts are sent in the request body, so batch size is not limited by the maximum length of an url
+        response = await self.__request_deepl_api(self.ApiPath.translate, method="POST", data=params)
+        self._metric_characters_sent.inc(sum(self.__charged_length(untranslated) for untranslated in texts))
+        self._metric_texts_translated.inc(len(texts))
+        return [self.__finalize_translation(payload, target_language) for payload in response["translations"]]
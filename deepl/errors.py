@@ -41,3 +41,29 @@ class TooManyRequestsError(DeepLError):
 class LanguageNotSupportedError(DeepLError):
     """Exception raised when a language is not supported in DeepL API."""
     pass
+
+
+class DeadlineExceededError(DeepLError):
+    """Exception raised when DeepL API does not respond successfully before a deadline."""
+    pass
+
+
+class DeepLApiError(DeepLError):
+    """Exception raised when DeepL API responds with an unexpected error status."""
+
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class BudgetExceededError(DeepLError):
+    """Exception raised when a translation would exceed a local character budget."""
+
+    def __init__(self, message: str, account: tuple) -> None:
+        super().__init__(message)
+        self.account = account
+
+
+class GlossaryError(DeepLError):
+    """Exception raised when a glossary does not exist or cannot be used for a translation."""
+    pass
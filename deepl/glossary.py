@@ -22,6 +22,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from __future__ import annotations
+from typing import Dict
 from .models import Glossary as GlossaryPayload
 
 
@@ -35,3 +37,62 @@ class Glossary:
         self.target_lang = payload["target_lang"]
         self.creation_time = payload["creation_time"]
         self.entry_count = payload["entry_count"]
+
+    def matches(self, source_language_code: str, target_language_code: str) -> bool:
+        """
+        Check if the glossary can be used to translate between two languages. Glossaries are defined for base language
+        codes, so e.g. a glossary with target language `en` can be used for both `EN-US` and `EN-GB`.
+
+        :param source_language_code: Source language code of the translation.
+        :param target_language_code: Target language code of the translation.
+        :return: True if the glossary has the same source and target languages, False otherwise.
+        """
+        return (source_language_code.split("-")[0].casefold() == self.source_lang.casefold()
+                and target_language_code.split("-")[0].casefold() == self.target_lang.casefold())
+
+    def is_same_version(self, other: Glossary) -> bool:
+        """
+        Check if the glossary has the same readiness and number of entries as another version of it. Glossary entries
+        cannot be edited in DeepL API, so a glossary with the same ID and entry count has the same entries.
+
+        :param other: Other version of the glossary.
+        :return: True if the versions are the same, False otherwise.
+        """
+        return (self.glossary_id == other.glossary_id and self.ready == other.ready
+                and self.entry_count == other.entry_count)
+
+
+def parse_entries(tsv: str) -> Dict[str, str]:
+    """
+    Parse glossary entries from tab-separated values.
+
+    :param tsv: Entries as lines of a source term and a target term separated by a tab.
+    :return: Dictionary of source terms and their target terms.
+    """
+    entries = {}
+    for line in tsv.splitlines():
+        if "\t" in line:
+            source_term, target_term = line.split("\t", 1)
+            entries[source_term] = target_term
+    return entries
+
+
+def format_entries(entries: Dict[str, str]) -> str:
+    """
+    Format glossary entries as tab-separated values.
+
+    :param entries: Dictionary of source terms and their target terms.
+    :return: Entries as lines of a source term and a target term separated by a tab.
+    :exception ValueError: No entries were given, or a term is empty or contains a tab or a line break.
+    """
+    if not entries:
+        raise ValueError("Glossary must have at least one entry.")
+
+    lines = []
+    for source_term, target_term in entries.items():
+        for term in (source_term, target_term):
+            if not term.strip() or any(character in term for character in "\t\r\n"):
+                raise ValueError(f"Invalid glossary term `{term}`. Terms must not be empty or contain tabs or line "
+                                 f"breaks.")
+        lines.append(f"{source_term.strip()}\t{target_term.strip()}")
+    return "\n".join(lines)
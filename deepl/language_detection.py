@@ -0,0 +1,223 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from . import protection
+import argparse
+import math
+import os
+import re
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(__file__), "data", "language_profiles.txt")
+
+_NON_LETTERS = re.compile(r"[\W\d_]+")
+
+
+class Detection(NamedTuple):
+    language: str
+    confidence: float
+
+
+def extract_ngrams(text: str, max_length: int = 3) -> Iterator[str]:
+    """
+    Extract character n-grams from the words of a text. Text is casefolded and words are padded with underscores, so
+    that n-grams at the start and the end of words are told apart from n-grams within words.
+
+    :param text: Text to extract n-grams from.
+    :param max_length: Maximum length of the n-grams.
+    :return: Iterator of n-grams.
+    """
+    # Mentions, custom emoji, URLs and code say nothing about the language of a Discord message, and they are not
+    # translated either
+    for word in _NON_LETTERS.split(protection.remove_spans(text).casefold()):
+        if not word:
+            continue
+        padded = f"_{word}_"
+        for length in range(1, max_length + 1):
+            for start in range(len(padded) - length + 1):
+                ngram = padded[start:start + length]
+                if ngram != "_":
+                    yield ngram
+
+
+class LanguageDetector:
+    """
+    Identify the language of a text with character n-gram profiles. A profile lists the most frequent n-grams of a
+    language in order. The log-probability of an n-gram is approximated from its rank with Zipf's law, and n-grams
+    missing from a profile get a penalty. The profiles are compact enough to be bundled as a small text file, and
+    scoring a chat message takes about a hundred microseconds.
+    """
+
+    # Log-probability penalty of an n-gram missing from a profile, relative to the last n-gram of the profile
+    MISSING_PENALTY = 1.0
+
+    def __init__(self, profiles: Dict[str, List[str]], temperature: float = 5.0) -> None:
+        """
+        :param profiles: N-grams of each language in descending order of frequency, by language code.
+        :param temperature: Divisor of the log-likelihoods when they are converted to confidences. Overlapping n-grams
+        are not independent, so the raw likelihoods would be far too confident.
+        :exception ValueError: Less than two profiles were given.
+        """
+        if len(profiles) < 2:
+            raise ValueError("At least two language profiles are needed for language detection.")
+
+        self.temperature = temperature
+        self._languages = list(profiles)
+        # Index from n-grams to their weights in every language, so that a text is scored by summing vectors.
+        # Weights are log-likelihoods relative to a missing n-gram, so that missing n-grams weigh nothing
+        weights: Dict[str, List[float]] = {}
+        for language_index, ngrams in enumerate(profiles.values()):
+            base = math.log(len(ngrams) + 1) + self.MISSING_PENALTY
+            for rank, ngram in enumerate(ngrams):
+                weights.setdefault(ngram, [0.0] * len(profiles))[language_index] = base - math.log(rank + 1)
+        self._index: Dict[str, Tuple[float, ...]] = {ngram: tuple(vector) for ngram, vector in weights.items()}
+        self._profiles = profiles
+
+    @property
+    def languages(self) -> List[str]:
+        return self._languages
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, str]], profile_size: int = 800, **kwargs) -> LanguageDetector:
+        """
+        Build profiles from sample texts.
+
+        :param samples: Pairs of language codes and texts.
+        :param profile_size: Number of n-grams in each profile.
+        :param kwargs: Kwargs for the constructor.
+        :return: New language detector.
+        """
+        counts: Dict[str, Counter] = {}
+        for language, text in samples:
+            counts.setdefault(language, Counter()).update(extract_ngrams(text))
+        # Ties are broken alphabetically, so that the same samples always produce the same profiles
+        profiles = {language: [ngram for ngram, _ in sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+                               [:profile_size]]
+                    for language, counter in sorted(counts.items())}
+        return cls(profiles, **kwargs)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PROFILES_PATH, **kwargs) -> LanguageDetector:
+        """
+        Load profiles from a file with a language code and its space-separated n-grams on each line.
+
+        :param path: Path to the profiles file. The bundled profiles are used by default.
+        :param kwargs: Kwargs for the constructor.
+        :return: New language detector.
+        :exception ValueError: The file is malformed.
+        """
+        profiles = {}
+        with open(path, "r", encoding="utf-8") as profiles_file:
+            for line in profiles_file:
+                line = line.rstrip("\n")
+                if not line or line.startswith("#"):
+                    continue
+                language, separator, ngrams = line.partition("\t")
+                if not separator:
+                    raise ValueError(f"Malformed language profile in {path}: {line[:20]!r}")
+                profiles[language] = ngrams.split(" ")
+        return cls(profiles, **kwargs)
+
+    def save(self, path: str) -> None:
+        """
+        :param path: Path to write the profiles to.
+        """
+        with open(path, "w", encoding="utf-8") as profiles_file:
+            profiles_file.write("# Language profiles: language code, tab, n-grams in descending order of frequency\n")
+            for language, ngrams in self._profiles.items():
+                profiles_file.write(f"{language}\t{' '.join(ngrams)}\n")
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """
+        :param text: Text to score.
+        :return: Log-likelihood of the text in each language, relative to a text of only unknown n-grams.
+        """
+        vectors = [vector for vector in map(self._index.get, extract_ngrams(text)) if vector]
+        if not vectors:
+            return dict.fromkeys(self._languages, 0.0)
+        return dict(zip(self._languages, map(sum, zip(*vectors))))
+
+    def detect(self, text: str) -> Optional[Detection]:
+        """
+        Detect the language of a text. The confidence is the posterior probability of the language, assuming all
+        languages are equally likely. Short texts get lower confidences, as they give less evidence.
+
+        :param text: Text to detect the language of.
+        :return: The most likely language and the confidence between 0 and 1, or None if the text has no letters or
+        matches no language.
+        """
+        scores = self.scores(text)
+        best = max(scores, key=scores.__getitem__)
+        best_score = scores[best]
+        if best_score <= 0:
+            return None
+
+        normalizer = sum(math.exp((score - best_score) / self.temperature) for score in scores.values())
+        return Detection(best, 1.0 / normalizer)
+
+
+def read_corpus(path: str) -> List[Tuple[str, str]]:
+    """
+    Read a corpus with a language code, a tab and a text on each line. Lines starting with # are comments.
+
+    :param path: Path to the corpus.
+    :return: Pairs of language codes and texts.
+    """
+    with open(path, "r", encoding="utf-8") as corpus_file:
+        return [tuple(line.rstrip("\n").split("\t", 1)) for line in corpus_file
+                if line.strip() and not line.startswith("#")]
+
+
+def split_corpus(samples: List[Tuple[str, str]], holdout_every: int = 5) -> Tuple[list, list]:
+    """
+    Split a corpus into training and held-out samples. Every nth sample of each language is held out.
+
+    :param samples: Pairs of language codes and texts.
+    :param holdout_every: Hold out every nth sample of a language.
+    :return: Training samples and held-out samples.
+    """
+    seen: Counter = Counter()
+    training, held_out = [], []
+    for language, text in samples:
+        seen[language] += 1
+        (held_out if seen[language] % holdout_every == 0 else training).append((language, text))
+    return training, held_out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build language profiles from a corpus.")
+    parser.add_argument("corpus", help="Corpus with a language code, a tab and a text on each line.")
+    parser.add_argument("--output", default=DEFAULT_PROFILES_PATH, help="Path to write the profiles to.")
+    parser.add_argument("--profile-size", type=int, default=800, help="Number of n-grams in each profile.")
+    args = parser.parse_args()
+
+    training, _ = split_corpus(read_corpus(args.corpus))
+    detector = LanguageDetector.train(training, profile_size=args.profile_size)
+    detector.save(args.output)
+    print(f"Wrote profiles of {len(detector.languages)} languages to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
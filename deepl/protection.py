@@ -0,0 +1,160 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from typing import List, NamedTuple
+import re
+
+
+# Spans of Discord messages that are not natural language: code, custom emoji, mentions, timestamps and URLs. The
+# lookahead lets the search skip most positions without trying every alternative
+_PROTECTED_SPAN = re.compile(
+    r"(?=[`<@h])(?:"
+    r"```.*?```"
+    r"|`[^`\n]+`"
+    r"|<a?:\w+:\d+>"
+    r"|<(?:@[!&]?|#)\d+>"
+    r"|</[\w -]+:\d+>"
+    r"|<t:-?\d+(?::[tTdDfFR])?>"
+    r"|(?<![\w.@])@(?:everyone|here)\b"
+    r"|<https?://[^\s<>]+>"
+    # Trailing punctuation, such as the full stop of a sentence, is left out of a URL unless parentheses are balanced
+    r"|https?://(?:[^\s<>()]|\([^\s<>()]*\))*(?:[^\s<>().,;:!?]|\([^\s<>()]*\)))",
+    re.DOTALL)
+# DeepL API keeps the placeholders in place when XML tag handling is enabled
+_PLACEHOLDER = re.compile(r"<m(\d+)\s*/>|<m(\d+)>\s*</m\d+>")
+
+
+class ProtectedText(NamedTuple):
+    """
+    A text with its untranslatable spans kept out of the translation. Spans at the start and the end of the text are
+    not sent at all, and spans in between are replaced with numbered XML placeholders. Saved characters are the
+    characters of the removed spans less the placeholders, as charged by DeepL API for the unescaped text.
+    """
+    text: str
+    spans: List[str]
+    prefix: str
+    suffix: str
+    saved_characters: int
+
+    def restore(self, translated: str) -> str:
+        """
+        Put the protected spans back into a translation of the protected text.
+
+        :param translated: Translation of the protected text, as returned by DeepL API with XML tag handling.
+        :return: Translation with the spans restored and XML entities unescaped. Spans whose placeholder was lost in
+        the translation are appended to the end, so that nothing is dropped from the message.
+        """
+        parts = []
+        restored = set()
+        end = 0
+        for match in _PLACEHOLDER.finditer(translated):
+            parts.append(unescape(translated[end:match.start()]))
+            end = match.end()
+            index = int(match.group(1) or match.group(2))
+            if index < len(self.spans) and index not in restored:
+                restored.add(index)
+                parts.append(self.spans[index])
+        parts.append(unescape(translated[end:]))
+        parts.extend(f" {span}" for index, span in enumerate(self.spans) if index not in restored)
+        return self.prefix + "".join(parts) + self.suffix
+
+
+def protect(text: str) -> ProtectedText:
+    """
+    Keep mentions, custom emoji, timestamps, URLs and code out of a text before it is translated, so that they are
+    neither charged nor mangled. The rest of the text is escaped for XML tag handling.
+
+    :param text: Text to protect.
+    :return: Protected text. Its text is empty if the whole text consists of protected spans and whitespace.
+    """
+    # Substring checks are much faster than the search, and most messages have nothing to protect
+    if "<" in text or "`" in text or "@" in text or "://" in text:
+        matches = list(_PROTECTED_SPAN.finditer(text))
+    else:
+        matches = []
+    start, end = 0, len(text)
+    first, last = 0, len(matches)
+    # Spans at the edges of the text, and the whitespace around them, need no placeholders at all
+    while first < last and not text[start:matches[first].start()].strip():
+        start = matches[first].end()
+        first += 1
+    while last > first and not text[matches[last - 1].end():end].strip():
+        end = matches[last - 1].start()
+        last -= 1
+
+    core = text[start:end]
+    stripped = core.strip()
+    if not stripped:
+        return ProtectedText("", [], text, "", len(text.strip()))
+
+    leading = len(core) - len(core.lstrip())
+    trailing = len(core) - len(core.rstrip())
+    prefix, suffix = text[:start + leading], text[end - trailing:]
+    start, end = start + leading, end - trailing
+
+    parts = []
+    spans = []
+    # Characters that would be sent without protection, less the ones sent with it. Characters are measured on the
+    # unescaped text, like the charges of the quota ledger
+    saved = len(text.strip()) - (end - start)
+    for match in matches[first:last]:
+        placeholder = f"<m{len(spans)}/>"
+        parts.append(escape(text[start:match.start()]))
+        parts.append(placeholder)
+        spans.append(match.group())
+        saved += len(match.group()) - len(placeholder)
+        start = match.end()
+    parts.append(escape(text[start:end]))
+    # A span shorter than its placeholder, such as one character of inline code, is protected at a small cost
+    return ProtectedText("".join(parts), spans, prefix, suffix, max(0, saved))
+
+
+def remove_spans(text: str) -> str:
+    """
+    :param text: Text to remove spans from.
+    :return: Text with the spans that protect() keeps out of translations replaced with spaces.
+    """
+    if "<" in text or "`" in text or "@" in text or "://" in text:
+        return _PROTECTED_SPAN.sub(" ", text)
+    return text
+
+
+def escape(text: str) -> str:
+    """
+    :param text: Plain text.
+    :return: Text escaped for XML tag handling of DeepL API.
+    """
+    # Greater-than signs need no escaping in XML text, and escaping them would only add charged characters
+    return text.replace("&", "&amp;").replace("<", "&lt;")
+
+
+def unescape(text: str) -> str:
+    """
+    :param text: Text translated with XML tag handling of DeepL API.
+    :return: Plain text.
+    """
+    if "&" not in text:
+        return text
+    return text.replace("&lt;", "<").replace("&gt;", ">").replace("&quot;", "\"").replace("&apos;", "'") \
+        .replace("&amp;", "&")
@@ -0,0 +1,238 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Dict, Hashable, Iterable, Optional, Tuple
+from .errors import BudgetExceededError, DeepLQuotaExceededError
+import datetime
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+Account = Tuple[str, Hashable]
+
+
+class SlidingWindowCounter:
+    """
+    A counter approximating the sum of values added within a sliding time window. Only the current and previous
+    fixed windows are stored, and the previous one is weighted by its overlap with the sliding window.
+    """
+
+    def __init__(self, window: float) -> None:
+        """
+        :param window: Length of the window in seconds.
+        :exception ValueError: The window is not positive.
+        """
+        if window <= 0:
+            raise ValueError("Window length must be positive.")
+
+        self._window = window
+        self._window_start = time.monotonic()
+        self._current = 0
+        self._previous = 0
+
+    def __rotate(self, now: float) -> None:
+        elapsed_windows = int((now - self._window_start) // self._window)
+        if elapsed_windows <= 0:
+            return
+
+        self._previous = self._current if elapsed_windows == 1 else 0
+        self._current = 0
+        self._window_start += elapsed_windows * self._window
+
+    def count(self) -> float:
+        """
+        :return: Approximate sum of values added within the sliding window.
+        """
+        now = time.monotonic()
+        self.__rotate(now)
+        previous_weight = 1 - (now - self._window_start) / self._window
+        return self._current + self._previous * previous_weight
+
+    def add(self, value: int) -> None:
+        self.__rotate(time.monotonic())
+        self._current += value
+
+    def is_empty(self) -> bool:
+        return self.count() <= 0
+
+
+class QuotaLedger:
+    """
+    A local ledger of characters sent to DeepL API. The ledger keeps an estimate of the monthly character count
+    between reconciliations against the DeepL usage endpoint, projects when the character limit will be hit, and
+    enforces character budgets for accounts such as guilds and users.
+    """
+
+    def __init__(self, budgets: Dict[str, Tuple[int, float]] = None, max_samples: int = 48) -> None:
+        """
+        :param budgets: Character budgets by account scope, e.g. {"guild": (50000, 86400)}. Each budget is a tuple of
+        maximum number of characters and the length of the sliding window in seconds.
+        :param max_samples: Maximum number of usage samples kept for the projection.
+        """
+        self._budgets = budgets or {}
+        self._counters: Dict[Account, SlidingWindowCounter] = {}
+        self._samples: Deque[Tuple[float, int]] = deque(maxlen=max_samples)
+        self._character_count: Optional[int] = None
+        self._character_limit: Optional[int] = None
+        self._unreconciled = 0
+        self.total_characters = 0
+
+    @property
+    def budgets(self) -> Dict[str, Tuple[int, float]]:
+        return self._budgets
+
+    @property
+    def character_limit(self) -> Optional[int]:
+        return self._character_limit
+
+    @property
+    def estimated_character_count(self) -> Optional[int]:
+        """
+        :return: Character count of the last reconciliation added with characters sent after it, or None if the ledger
+        has not been reconciled yet.
+        """
+        if self._character_count is None:
+            return None
+        return self._character_count + self._unreconciled
+
+    def __counter(self, account: Account) -> Optional[SlidingWindowCounter]:
+        budget = self._budgets.get(account[0])
+        if budget is None:
+            return None
+
+        counter = self._counters.get(account)
+        if counter is None:
+            counter = self._counters[account] = SlidingWindowCounter(budget[1])
+        return counter
+
+    def remaining(self, account: Account) -> Optional[float]:
+        """
+        Get the remaining budget of an account.
+
+        :param account: Account as a tuple of scope and identifier, e.g. ("user", 1234).
+        :return: Remaining characters within the current window, or None if the scope has no budget.
+        """
+        budget = self._budgets.get(account[0])
+        if budget is None:
+            return None
+
+        counter = self._counters.get(account)
+        return budget[0] - (counter.count() if counter else 0)
+
+    def check(self, accounts: Iterable[Account], characters: int) -> None:
+        """
+        Check that characters could be charged from accounts, without charging them.
+
+        :param accounts: Accounts to check, e.g. [("guild", 1234), ("user", 5678)].
+        :param characters: Number of characters to check.
+        :exception BudgetExceededError: Charge would exceed the budget of an account.
+        :exception DeepLQuotaExceededError: Charge would exceed the monthly DeepL character limit.
+        """
+        for account in accounts:
+            remaining = self.remaining(account)
+            if remaining is not None and characters > remaining:
+                raise BudgetExceededError(f"Translation budget of this {account[0]} is used up. "
+                                          f"Please try again later.", account)
+
+        estimated = self.estimated_character_count
+        if estimated is not None and self._character_limit and estimated + characters > self._character_limit:
+            raise DeepLQuotaExceededError("DeepL API quota exceeded. This can be resolved by upgrading DeepL "
+                                          "subscription.")
+
+    def charge(self, accounts: Iterable[Account], characters: int) -> None:
+        """
+        Charge characters from accounts before they are sent to DeepL API. Either all accounts are charged, or the
+        charge is refused and nothing is recorded.
+
+        :param accounts: Accounts to charge, e.g. [("guild", 1234), ("user", 5678)].
+        :param characters: Number of characters to charge.
+        :exception BudgetExceededError: Charge would exceed the budget of an account.
+        :exception DeepLQuotaExceededError: Charge would exceed the monthly DeepL character limit.
+        """
+        accounts = list(accounts)
+        self.check(accounts, characters)
+        self.__record(accounts, characters)
+
+    def refund(self, accounts: Iterable[Account], characters: int) -> None:
+        """
+        Refund characters that were charged but not translated, e.g. because the request failed.
+
+        :param accounts: Accounts that were charged.
+        :param characters: Number of characters to refund.
+        """
+        self.__record(accounts, -characters)
+
+    def __record(self, accounts: Iterable[Account], characters: int) -> None:
+        for account in accounts:
+            counter = self.__counter(account)
+            if counter is not None:
+                counter.add(characters)
+
+        self._unreconciled += characters
+        self.total_characters += characters
+
+    def reconcile(self, usage: dict) -> None:
+        """
+        Reconcile the ledger with usage data from DeepL API. Also removes counters of idle accounts.
+
+        :param usage: Usage data as returned by the DeepL usage endpoint.
+        """
+        character_count = usage["character_count"]
+        if self._samples and character_count < self._samples[-1][1]:
+            # The billing period has changed
+            self._samples.clear()
+
+        estimated = self.estimated_character_count
+        if estimated is not None and estimated != character_count:
+            _logger.debug(f"Quota ledger was off by {character_count - estimated} characters.")
+
+        self._character_count = character_count
+        self._character_limit = usage["character_limit"]
+        self._unreconciled = 0
+        self._samples.append((time.time(), character_count))
+
+        idle = [account for account, counter in self._counters.items() if counter.is_empty()]
+        for account in idle:
+            del self._counters[account]
+
+    def project_exhaustion(self) -> Optional[datetime.datetime]:
+        """
+        Project when the monthly character limit will be hit with the current rate of usage.
+
+        :return: Projected UTC time, or None if there is not enough data or no characters are being used.
+        """
+        if len(self._samples) < 2 or not self._character_limit:
+            return None
+
+        (first_time, first_count), (last_time, last_count) = self._samples[0], self._samples[-1]
+        rate = (last_count - first_count) / (last_time - first_time)
+        if rate <= 0:
+            return None
+
+        seconds_left = (self._character_limit - self.estimated_character_count) / rate
+        return datetime.datetime.fromtimestamp(time.time() + max(0.0, seconds_left), datetime.timezone.utc)
@@ -0,0 +1,287 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Optional
+import asyncio
+import datetime
+import logging
+import random
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    A token bucket limiting the rate of requests. The bucket can also be paused, e.g. when DeepL API asks to retry
+    after a delay.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """
+        :param rate: Number of tokens added to the bucket per second.
+        :param capacity: Maximum number of tokens in the bucket, i.e. the maximum burst size.
+        :exception ValueError: Rate or capacity is not positive.
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive.")
+
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def pause(self, duration: float) -> None:
+        """
+        Stop handing out tokens for a duration. The bucket is also emptied.
+
+        :param duration: Duration of the pause in seconds.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + duration)
+        self._tokens = 0.0
+        self._updated_at = self._paused_until
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+        """
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self.__refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    A concurrency limiter adjusting its limit with additive increase and multiplicative decrease (AIMD). The limit
+    grows slowly while requests succeed and is cut when DeepL API throttles requests.
+    """
+
+    def __init__(self,
+                 initial: int = 4,
+                 minimum: int = 1,
+                 maximum: int = 32,
+                 decrease_factor: float = 0.5,
+                 decrease_cooldown: float = 1.0) -> None:
+        """
+        :param initial: Initial concurrency limit.
+        :param minimum: Minimum concurrency limit.
+        :param maximum: Maximum concurrency limit.
+        :param decrease_factor: Factor the limit is multiplied with when requests are throttled.
+        :param decrease_cooldown: Minimum time in seconds between two decreases, so that a burst of throttled
+        responses to requests sent at the same time cuts the limit only once.
+        :exception ValueError: Limits are not in order or the decrease factor is not between 0 and 1.
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Concurrency limits must satisfy 1 <= minimum <= initial <= maximum.")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("Decrease factor must be between 0 and 1.")
+
+        self._limit = float(initial)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._decrease_factor = decrease_factor
+        self._decrease_cooldown = decrease_cooldown
+        self._decreased_at = 0.0
+        self._in_use = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def __wake_waiters(self) -> None:
+        available = self.limit - self._in_use
+        while available > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                available -= 1
+
+    async def acquire(self) -> None:
+        """
+        Wait until the number of concurrent requests is below the limit and reserve a slot.
+        """
+        while self._in_use >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                # The wakeup may have been meant for this waiter, so pass it on
+                self.__wake_waiters()
+                raise
+
+        self._in_use += 1
+
+    def release(self, throttled: bool = False) -> None:
+        """
+        Release a reserved slot and adjust the limit.
+
+        :param throttled: True if the request was throttled by DeepL API, False if it was not.
+        """
+        self._in_use -= 1
+        now = time.monotonic()
+        if throttled:
+            if now - self._decreased_at >= self._decrease_cooldown:
+                self._limit = max(self._minimum, self._limit * self._decrease_factor)
+                self._decreased_at = now
+                _logger.info(f"DeepL API throttled requests. Concurrency limit decreased to {self.limit}.")
+        else:
+            self._limit = min(self._maximum, self._limit + 1 / self._limit)
+
+        self.__wake_waiters()
+
+
+class RateLimiter:
+    """
+    Client side rate control for DeepL API requests, combining a token bucket and an adaptive concurrency limiter.
+    """
+
+    # Requests per second and burst sizes for each DeepL account version
+    VERSION_LIMITS = {
+        "free": (2.0, 5),
+        "pro": (10.0, 20)
+    }
+
+    def __init__(self, bucket: TokenBucket, concurrency: AdaptiveConcurrencyLimiter) -> None:
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.throttled_count = 0
+
+    @classmethod
+    def for_version(cls, version: str) -> RateLimiter:
+        """
+        Make a rate limiter tuned for a DeepL account version.
+
+        :param version: DeepL account version, either free or pro.
+        :return: New rate limiter.
+        :exception ValueError: The version is not known.
+        """
+        try:
+            rate, capacity = cls.VERSION_LIMITS[version]
+        except KeyError:
+            raise ValueError(f"Unknown DeepL account version `{version}`.")
+
+        return cls(TokenBucket(rate, capacity), AdaptiveConcurrencyLimiter(maximum=capacity))
+
+    async def acquire(self) -> None:
+        """
+        Wait for permission to send a request. Must be followed by release().
+        """
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+        except asyncio.CancelledError:
+            self.concurrency.release()
+            raise
+
+    def release(self, throttled: bool = False, retry_after: Optional[float] = None) -> None:
+        """
+        Release a permission to send a request.
+
+        :param throttled: True if the request was throttled by DeepL API.
+        :param retry_after: Delay in seconds DeepL API asked to wait before the next request, if any.
+        """
+        if throttled:
+            self.throttled_count += 1
+        if retry_after:
+            self.bucket.pause(retry_after)
+        self.concurrency.release(throttled=throttled)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    :param value: Value of the header, either in seconds or as an HTTP date.
+    :return: Delay in seconds, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 10.0, retry_after: Optional[float] = None) -> float:
+    """
+    Calculate a delay before retrying a request using exponential backoff with full jitter.
+
+    :param attempt: Number of the failed attempt, starting from zero.
+    :param base: Base delay in seconds.
+    :param cap: Maximum delay in seconds, not counting the Retry-After delay.
+    :param retry_after: Delay requested by DeepL API. If given, the delay is never shorter than this.
+    :return: Delay in seconds.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay += retry_after
+    return delay
@@ -0,0 +1,133 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from types import SimpleNamespace
+from typing import Optional
+from .metrics import MetricsRegistry
+import aiohttp
+import time
+
+
+# Connection setup of a few hundred milliseconds is already a tail latency problem, so it has its own buckets
+CONNECTION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class ConnectionPoolStats:
+    """
+    Statistics of a connection pool collected with aiohttp request tracing: how often connections are created or
+    reused, how long creating connections and waiting for a free connection take, and how many requests are in flight.
+    """
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None, prefix: str = "deepl") -> None:
+        """
+        :param metrics: Registry to record the statistics in.
+        :param prefix: Prefix of the metric names.
+        """
+        metrics = metrics if metrics is not None else MetricsRegistry()
+        self.connections_created = metrics.counter(f"{prefix}_connections_created_total", "New connections opened.")
+        self.connections_reused = metrics.counter(f"{prefix}_connections_reused_total",
+                                                  "Requests sent over a kept-alive connection.")
+        self.connection_create_seconds = metrics.histogram(f"{prefix}_connection_create_seconds",
+                                                           "Time to open a new connection, including TLS.",
+                                                           buckets=CONNECTION_BUCKETS)
+        self.connection_queued_seconds = metrics.histogram(f"{prefix}_connection_queued_seconds",
+                                                           "Time requests waited for a free connection in the pool.",
+                                                           buckets=CONNECTION_BUCKETS)
+        self.dns_cache_hits = metrics.counter(f"{prefix}_dns_cache_hits_total", "Host names resolved from the cache.")
+        self.dns_cache_misses = metrics.counter(f"{prefix}_dns_cache_misses_total", "Host names resolved with DNS.")
+        self.requests_in_flight = 0
+        metrics.gauge(f"{prefix}_requests_in_flight", "Requests holding a connection.").set_function(
+            lambda: self.requests_in_flight)
+
+        self.trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=lambda **_: SimpleNamespace())
+        self.trace_config.on_request_start.append(self.__on_request_start)
+        self.trace_config.on_request_end.append(self.__on_request_end)
+        self.trace_config.on_request_exception.append(self.__on_request_end)
+        self.trace_config.on_connection_queued_start.append(self.__on_phase_start)
+        self.trace_config.on_connection_queued_end.append(self.__on_queued_end)
+        self.trace_config.on_connection_create_start.append(self.__on_phase_start)
+        self.trace_config.on_connection_create_end.append(self.__on_create_end)
+        self.trace_config.on_connection_reuseconn.append(self.__on_reuse)
+        self.trace_config.on_dns_cache_hit.append(self.__on_dns_cache_hit)
+        self.trace_config.on_dns_cache_miss.append(self.__on_dns_cache_miss)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """
+        Ratio of requests sent over kept-alive connections to all requests that got a connection.
+        """
+        reused = self.connections_reused.get()
+        total = reused + self.connections_created.get()
+        return reused / total if total else 0.0
+
+    async def __on_request_start(self, session, context: SimpleNamespace, params) -> None:
+        self.requests_in_flight += 1
+
+    async def __on_request_end(self, session, context: SimpleNamespace, params) -> None:
+        self.requests_in_flight -= 1
+
+    async def __on_phase_start(self, session, context: SimpleNamespace, params) -> None:
+        context.phase_started = time.perf_counter()
+
+    async def __on_queued_end(self, session, context: SimpleNamespace, params) -> None:
+        self.connection_queued_seconds.observe(time.perf_counter() - context.phase_started)
+
+    async def __on_create_end(self, session, context: SimpleNamespace, params) -> None:
+        self.connections_created.inc()
+        self.connection_create_seconds.observe(time.perf_counter() - context.phase_started)
+
+    async def __on_reuse(self, session, context: SimpleNamespace, params) -> None:
+        self.connections_reused.inc()
+
+    async def __on_dns_cache_hit(self, session, context: SimpleNamespace, params) -> None:
+        self.dns_cache_hits.inc()
+
+    async def __on_dns_cache_miss(self, session, context: SimpleNamespace, params) -> None:
+        self.dns_cache_misses.inc()
+
+
+def create_session(pool_stats: Optional[ConnectionPoolStats] = None,
+                   limit: int = 32,
+                   keepalive_timeout: float = 60.0,
+                   dns_cache_ttl: int = 300,
+                   connect_timeout: float = 5.0,
+                   read_timeout: float = 30.0) -> aiohttp.ClientSession:
+    """
+    Create a session tuned for DeepL API traffic. The connection pool is sized for the maximum number of concurrent
+    requests, idle connections are kept alive between bursts, and resolved addresses are cached, so that requests rarely
+    pay for DNS lookups or TCP and TLS handshakes.
+
+    :param pool_stats: Statistics to record the connection pool utilisation in.
+    :param limit: Maximum number of connections.
+    :param keepalive_timeout: Time in seconds an idle connection is kept open.
+    :param dns_cache_ttl: Time in seconds resolved addresses are cached.
+    :param connect_timeout: Timeout in seconds for opening a connection, including TLS.
+    :param read_timeout: Timeout in seconds between reads of a response.
+    :return: The session. The caller is responsible for closing it.
+    """
+    connector = aiohttp.TCPConnector(limit=limit, keepalive_timeout=keepalive_timeout, use_dns_cache=True,
+                                     ttl_dns_cache=dns_cache_ttl)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+    trace_configs = [pool_stats.trace_config] if pool_stats is not None else None
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=trace_configs)
@@ -0,0 +1,66 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import List, Optional
+from .language import Language
+import json
+import os
+import tempfile
+
+
+def read_languages(path: str) -> Optional[List[Language]]:
+    """
+    Read supported languages from a snapshot file.
+
+    :param path: Path to the snapshot file.
+    :return: List of languages, or None if the snapshot does not exist.
+    :exception ValueError: The snapshot is malformed.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as snapshot_file:
+            payloads = json.load(snapshot_file)
+    except FileNotFoundError:
+        return None
+
+    try:
+        return [Language(payload) for payload in payloads]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed language snapshot {path}.") from e
+
+
+def write_languages(path: str, languages: List[Language]) -> None:
+    """
+    Write supported languages to a snapshot file atomically, so that a crash never leaves a partially written snapshot.
+
+    :param path: Path to the snapshot file.
+    :param languages: List of languages.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".languages-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as snapshot_file:
+            json.dump([language.as_dict() for language in languages], snapshot_file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,256 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from .cache import CacheKey
+from .models import Translation as TranslationPayload
+import asyncio
+import logging
+import sqlite3
+import time
+import os
+
+_logger = logging.getLogger(__name__)
+
+
+class TranslationStore:
+    """
+    A persistent on-disk store of translations backed by SQLite in WAL mode. The database is opened lazily on the
+    first use, and all disk I/O is done in a dedicated worker thread so that the event loop is never blocked.
+    Writes are buffered and persisted in the background.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS translations (
+            text TEXT NOT NULL,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            translated_text TEXT NOT NULL,
+            detected_source_language TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (text, source_lang, target_lang)
+        );
+        CREATE INDEX IF NOT EXISTS translations_created_at ON translations(created_at);
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000) -> None:
+        """
+        :param path: Path to the SQLite database file. The file is created if it does not exist.
+        :param max_entries: Maximum number of stored translations. When the store grows past this, the oldest
+        translations are removed so that a tenth of the space is free again.
+        :exception ValueError: Path is not provided or maximum number of entries is not positive.
+        """
+        if not path:
+            raise ValueError("Path to the translation store must be provided.")
+        if max_entries <= 0:
+            raise ValueError("Maximum number of stored translations must be positive.")
+
+        self._path = path
+        self._max_entries = max_entries
+        # Store is compacted down to this, so that the rows need not be counted on every write once the store is full
+        self._low_water_mark = max_entries - max(1, max_entries // 10)
+        # Upper bound of the stored rows, as replaced translations are counted as new ones
+        self._estimated_entries = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translation-store")
+        self._pending: Dict[CacheKey, TranslationPayload] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    @staticmethod
+    def _to_row_key(key: CacheKey) -> Tuple[str, str, str]:
+        text, source_lang, target_lang = key
+        # NULL values are distinct in SQLite primary keys, so automatic detection is stored as an empty string
+        return text, source_lang or "", target_lang
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self._SCHEMA)
+            connection.commit()
+            self._estimated_entries = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            self._connection = connection
+            _logger.info(f"Opened translation store {self._path}.")
+
+        return self._connection
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _get_many_sync(self, keys: List[CacheKey]) -> Dict[CacheKey, TranslationPayload]:
+        connection = self._connect()
+        found = {}
+        for key in keys:
+            row = connection.execute(
+                "SELECT translated_text, detected_source_language FROM translations "
+                "WHERE text = ? AND source_lang = ? AND target_lang = ?",
+                self._to_row_key(key)
+            ).fetchone()
+            if row:
+                found[key] = {"text": row[0], "detected_source_language": row[1]}
+
+        return found
+
+    def _put_many_sync(self, items: Dict[CacheKey, TranslationPayload]) -> None:
+        connection = self._connect()
+        now = time.time()
+        rows = [(*self._to_row_key(key), payload["text"], payload["detected_source_language"], now)
+                for key, payload in items.items()]
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self._estimated_entries += len(rows)
+        if self._estimated_entries > self._max_entries:
+            self._compact_sync()
+
+    def _compact_sync(self) -> int:
+        connection = self._connect()
+        count = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        self._estimated_entries = count
+        if count <= self._max_entries:
+            return 0
+
+        excess = count - self._low_water_mark
+
+        with connection:
+            connection.execute(
+                "DELETE FROM translations WHERE rowid IN "
+                "(SELECT rowid FROM translations ORDER BY created_at LIMIT ?)",
+                (excess,)
+            )
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._estimated_entries = self._low_water_mark
+        _logger.info(f"Compacted translation store by removing {excess} oldest translations.")
+        return excess
+
+    def _info_sync(self) -> dict:
+        connection = self._connect()
+        count = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        size = sum(os.path.getsize(path) for path in (self._path, f"{self._path}-wal") if os.path.exists(path))
+        return dict(path=self._path, entries=count, max_entries=self._max_entries, size_bytes=size)
+
+    def _clear_sync(self) -> int:
+        connection = self._connect()
+        with connection:
+            removed = connection.execute("DELETE FROM translations").rowcount
+        self._estimated_entries = 0
+        connection.execute("VACUUM")
+        return removed
+
+    async def get_many(self, keys: Iterable[CacheKey]) -> Dict[CacheKey, TranslationPayload]:
+        """
+        Get stored translations for multiple keys. Translations waiting to be written are also returned.
+
+        :param keys: Keys of the translations.
+        :return: Dictionary of found keys and their translation payloads.
+        """
+        found = {}
+        lookup = []
+        for key in keys:
+            if key in self._pending:
+                found[key] = self._pending[key]
+            else:
+                lookup.append(key)
+
+        if lookup:
+            try:
+                found.update(await self._run(self._get_many_sync, lookup))
+            except sqlite3.Error:
+                _logger.exception("Failed to read translations from the translation store.")
+
+        return found
+
+    def put_many(self, items: Dict[CacheKey, TranslationPayload]) -> None:
+        """
+        Schedule translations to be written to the store in the background.
+
+        :param items: Dictionary of keys and their translation payloads.
+        """
+        self._pending.update(items)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """
+        Write all pending translations to the disk.
+
+        :return: Number of translations written.
+        """
+        written = 0
+        while self._pending:
+            items = self._pending
+            self._pending = {}
+            try:
+                await self._run(self._put_many_sync, items)
+            except sqlite3.Error:
+                _logger.exception(f"Failed to write {len(items)} translations to the translation store.")
+            else:
+                written += len(items)
+
+        return written
+
+    async def info(self) -> dict:
+        """
+        Get information about the store.
+
+        :return: Dictionary containing the database path, number of stored translations, maximum number of stored
+        translations and the size of the database files in bytes.
+        """
+        info = await self._run(self._info_sync)
+        info["pending_writes"] = self.pending_writes
+        return info
+
+    async def clear(self) -> int:
+        """
+        Remove all stored translations, including pending writes.
+
+        :return: Number of removed translations.
+        """
+        self._pending.clear()
+        return await self._run(self._clear_sync)
+
+    async def close(self) -> None:
+        """
+        Write pending translations and close the database.
+        """
+        await self.flush()
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=True)
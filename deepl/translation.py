@@ -57,3 +57,6 @@ class Translation:
 
         self.source_language = source_language
         self.target_language = target_language
+
+    def as_payload(self) -> TranslationPayload:
+        return dict(detected_source_language=self.detected_source_language, text=self.text)
@@ -22,8 +22,33 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from typing import Dict, List
+from typing import Any, Dict, Union
 import logging
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# TODO: Which English and Portuguese to prefer here?
+LANGUAGE_ALIASES: Dict[str, str] = {
+    "EN": "EN-US",
+    "English": "EN-US",
+    "PT": "PT-PT",
+    "Portuguese": "PT-PT",
+    "Chinese": "ZH"
+}
+_CASEFOLD_LANGUAGE_ALIASES: Dict[str, str] = {alias.casefold(): code for alias, code in LANGUAGE_ALIASES.items()}
+
+_SOURCE_LANGUAGE_EXCEPTIONS = frozenset((
+    "PT-BR",
+    "PT-PT",
+    "EN-US",
+    "EN-GB"
+))
+_CASEFOLD_SOURCE_LANGUAGE_EXCEPTIONS = frozenset(exc.casefold() for exc in _SOURCE_LANGUAGE_EXCEPTIONS)
 
 
 def replace_aliases(representation: str, ignore_case: bool = False) -> str:
@@ -35,27 +60,12 @@ def replace_aliases(representation: str, ignore_case: bool = False) -> str:
     :return: Language string representation with aliases converted to supported syntax. Returns the original
     representation if no aliases are found.
     """
-    # TODO: Which English and Portuguese to prefer here?
-    aliases: Dict[str, List[str]] = {
-        "EN-US": ["EN", "English"],
-        "PT-PT": ["PT", "Portuguese"],
-        "ZH": ["Chinese"]
-    }
-
     if not representation:
         raise ValueError("Language representation must be provided.")
 
-    lookup = representation
     if ignore_case:
-        lookup = representation.casefold()
-
-    for language_code, language_aliases in aliases.items():
-        if ignore_case:
-            language_aliases = [alias.casefold() for alias in language_aliases]
-        if lookup in language_aliases:
-            return language_code
-
-    return representation
+        return _CASEFOLD_LANGUAGE_ALIASES.get(representation.casefold(), representation)
+    return LANGUAGE_ALIASES.get(representation, representation)
 
 
 def strip_source_language_exceptions(representation: str, ignore_case: bool = False) -> str:
@@ -69,24 +79,38 @@ def strip_source_language_exceptions(representation: str, ignore_case: bool = Fa
     The original representation is returned instead if nothing needs to be replaced.
     :exception ValueError: The representation has a falsy value.
     """
-    exceptions = [
-        "PT-BR",
-        "PT-PT",
-        "EN-US",
-        "EN-GB"
-    ]
-
     lookup = replace_aliases(representation, ignore_case=ignore_case)
     if ignore_case:
-        exceptions = [exc.casefold() for exc in exceptions]
-        lookup = lookup.casefold()
+        is_exception = lookup.casefold() in _CASEFOLD_SOURCE_LANGUAGE_EXCEPTIONS
+    else:
+        is_exception = lookup in _SOURCE_LANGUAGE_EXCEPTIONS
 
-    if lookup in exceptions:
+    if is_exception:
         return representation.split("-")[0].upper()
 
     return representation
 
 
+def utf8_length(text: str) -> int:
+    """
+    :param text: Text to measure.
+    :return: Length of the text in bytes when encoded in UTF-8.
+    """
+    return len(text.encode("utf-8"))
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode JSON data. Uses orjson if it is installed, and the standard library json module otherwise.
+
+    :param data: JSON data to decode.
+    :return: Decoded data.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class _CustomFormatter(logging.Formatter):
     """
     A default log formatter with colours.
@@ -0,0 +1,238 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+
+
+_logger = logging.getLogger(__name__)
+
+
+class GuildSettings:
+    """
+    Settings of a guild. Settings objects are never modified, so they can be shared freely. Unset settings are None,
+    meaning the bot default is used.
+    """
+
+    __slots__ = ("prefixes", "target_language", "auto_translate_channels", "glossary_ids")
+
+    def __init__(self,
+                 prefixes: Optional[Tuple[str, ...]] = None,
+                 target_language: Optional[str] = None,
+                 auto_translate_channels: Optional[Dict[int, str]] = None,
+                 glossary_ids: Tuple[str, ...] = ()) -> None:
+        """
+        :param prefixes: Command prefixes of the guild.
+        :param target_language: Default target language code of the guild.
+        :param auto_translate_channels: IDs of auto-translated channels and their target language codes.
+        :param glossary_ids: IDs of DeepL glossaries used in translations of the guild.
+        """
+        self.prefixes = prefixes
+        self.target_language = target_language
+        self.auto_translate_channels = auto_translate_channels or {}
+        self.glossary_ids = glossary_ids
+
+    def replace(self, **changes) -> GuildSettings:
+        """
+        :param changes: Changed settings.
+        :return: Copy of the settings with the changes applied.
+        """
+        settings = {name: getattr(self, name) for name in self.__slots__}
+        settings.update(changes)
+        return GuildSettings(**settings)
+
+    def to_payload(self) -> dict:
+        return {
+            "prefixes": list(self.prefixes) if self.prefixes else None,
+            "target_language": self.target_language,
+            # JSON object keys are strings
+            "auto_translate_channels": {str(channel_id): language
+                                        for channel_id, language in self.auto_translate_channels.items()},
+            "glossary_ids": list(self.glossary_ids)
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> GuildSettings:
+        prefixes = payload.get("prefixes")
+        return cls(prefixes=tuple(prefixes) if prefixes else None,
+                   target_language=payload.get("target_language"),
+                   auto_translate_channels={int(channel_id): language for channel_id, language
+                                            in payload.get("auto_translate_channels", {}).items()},
+                   glossary_ids=tuple(payload.get("glossary_ids", ())))
+
+
+class GuildSettingsStore:
+    """
+    Per-guild settings kept in memory and persisted to SQLite. All settings are loaded once at startup, so reading the
+    settings of a guild is a dictionary lookup that never touches the disk. Changes take effect in memory immediately
+    and are written to the disk in the background after a short delay.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            settings TEXT NOT NULL
+        )
+    """
+
+    DEFAULT = GuildSettings()
+
+    def __init__(self, path: Optional[str], write_delay: float = 1.0) -> None:
+        """
+        :param path: Path to the SQLite database file. The file is created if it does not exist. If None, settings are
+        kept only in memory.
+        :param write_delay: Time in seconds to wait for more changes before writing changed settings to the disk.
+        """
+        self._path = path
+        self._write_delay = write_delay
+        self._settings: Dict[int, GuildSettings] = {}
+        self._dirty: Set[int] = set()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="guild-settings")
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._dirty)
+
+    def __iter__(self) -> Iterator[Tuple[int, GuildSettings]]:
+        return iter(list(self._settings.items()))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(self._SCHEMA)
+            connection.commit()
+            self._connection = connection
+
+        return self._connection
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _load_sync(self) -> Dict[int, GuildSettings]:
+        rows = self._connect().execute("SELECT guild_id, settings FROM guild_settings").fetchall()
+        return {guild_id: GuildSettings.from_payload(json.loads(settings)) for guild_id, settings in rows}
+
+    def _write_sync(self, items: Dict[int, Optional[GuildSettings]]) -> None:
+        connection = self._connect()
+        with connection:
+            for guild_id, settings in items.items():
+                if settings is None:
+                    connection.execute("DELETE FROM guild_settings WHERE guild_id = ?", (guild_id,))
+                else:
+                    connection.execute("INSERT OR REPLACE INTO guild_settings VALUES (?, ?)",
+                                       (guild_id, json.dumps(settings.to_payload())))
+
+    async def load(self) -> int:
+        """
+        Load settings of all guilds from the disk.
+
+        :return: Number of guilds with settings.
+        """
+        if self._path is None:
+            return 0
+
+        self._settings = await self._run(self._load_sync)
+        _logger.info(f"Loaded settings of {len(self._settings)} guilds from {self._path}.")
+        return len(self._settings)
+
+    def get(self, guild_id: Optional[int]) -> GuildSettings:
+        """
+        Get settings of a guild.
+
+        :param guild_id: ID of the guild, or None for private messages.
+        :return: Settings of the guild, or default settings if the guild has none.
+        """
+        return self._settings.get(guild_id, self.DEFAULT)
+
+    def update(self, guild_id: int, **changes) -> GuildSettings:
+        """
+        Change settings of a guild. The change is visible immediately and persisted in the background.
+
+        :param guild_id: ID of the guild.
+        :param changes: Changed settings. Settings set to None are reset to the default.
+        :return: New settings of the guild.
+        """
+        settings = self.get(guild_id).replace(**changes)
+        if settings.to_payload() == self.DEFAULT.to_payload():
+            self._settings.pop(guild_id, None)
+        else:
+            self._settings[guild_id] = settings
+
+        self._dirty.add(guild_id)
+        if self._path is not None and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.__flush_later())
+        return settings
+
+    async def __flush_later(self) -> None:
+        await asyncio.sleep(self._write_delay)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write changed settings to the disk.
+
+        :return: Number of guilds whose settings were written.
+        """
+        if self._path is None:
+            self._dirty.clear()
+            return 0
+
+        written = 0
+        while self._dirty:
+            items = {guild_id: self._settings.get(guild_id) for guild_id in self._dirty}
+            self._dirty.clear()
+            try:
+                await self._run(self._write_sync, items)
+            except sqlite3.Error:
+                _logger.exception(f"Failed to write settings of {len(items)} guilds.")
+            else:
+                written += len(items)
+
+        return written
+
+    async def close(self) -> None:
+        """
+        Write changed settings and close the database.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=True)
@@ -23,13 +23,34 @@ SOFTWARE.
 """
 
 
+import time
+# Taken before the other imports so that their duration is included in the startup profile
+STARTED = time.perf_counter()
+
 from translator_bot import TranslatorBot
+from startup_profiler import StartupProfiler
 from typing import Union, Iterable
 import json
 import deepl
 
+IMPORT_DURATION = time.perf_counter() - STARTED
+
 BOT_VERSION = "0.93"
 COMMAND_PREFIX: Union[str, Iterable[str]] = "?"
+CONFIG_FILE = "config.json"
+
+
+def load_config() -> dict:
+    """
+    Load optional bot configuration. Configuration file is not mandatory, and defaults are used for missing values.
+
+    :return: Configuration as a dictionary.
+    """
+    try:
+        with open(CONFIG_FILE, "r") as config_file:
+            return json.load(config_file)
+    except FileNotFoundError:
+        return {}
 
 
 def start():
@@ -38,9 +59,11 @@ def start():
 
     discord_api_token = credentials["api_tokens"]["discord"]
     deepl_api_token = credentials["api_tokens"]["deepl"]
-    bot = TranslatorBot(deepl_api_token, COMMAND_PREFIX)
-
     deepl.utils.configure_logging()
+    startup_profiler = StartupProfiler(STARTED)
+    startup_profiler.record("imports", IMPORT_DURATION)
+    bot = TranslatorBot(deepl_api_token, COMMAND_PREFIX, config=load_config(), startup_profiler=startup_profiler)
+
     bot.run(discord_api_token, reconnect=True, log_handler=None)
 
 
@@ -0,0 +1,138 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from collections import OrderedDict
+from typing import Dict, Optional
+from deepl.ratelimit import TokenBucket
+import discord
+import asyncio
+import logging
+
+
+_logger = logging.getLogger(__name__)
+
+
+class MessageResolver:
+    """
+    Resolve the content of referenced messages. Discord resolves a referenced message only if it is in the client
+    message cache, so the content of recently seen messages is kept in a bounded LRU cache. Messages that are not cached
+    are fetched from Discord API at a limited rate, and concurrent lookups of the same message share one fetch.
+    """
+
+    def __init__(self, max_messages: int = 10000, fetch_rate: float = 1.0, fetch_burst: int = 5) -> None:
+        """
+        :param max_messages: Maximum number of message contents kept in memory.
+        :param fetch_rate: Number of messages per second fetched from Discord API in the long run.
+        :param fetch_burst: Number of messages that can be fetched from Discord API at once.
+        """
+        self.max_messages = max_messages
+        self._contents: OrderedDict[int, str] = OrderedDict()
+        self._fetches: Dict[int, asyncio.Task] = {}
+        self._fetch_bucket = TokenBucket(fetch_rate, fetch_burst)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def remember(self, message_id: int, content: str) -> None:
+        """
+        Remember the content of a message.
+
+        :param message_id: ID of the message.
+        :param content: Content of the message. Messages without content are not remembered.
+        """
+        if not content:
+            return
+
+        self._contents[message_id] = content
+        self._contents.move_to_end(message_id)
+        if len(self._contents) > self.max_messages:
+            self._contents.popitem(last=False)
+
+    def update(self, message_id: int, content: str) -> None:
+        """
+        Update the content of a remembered message after it was edited. Messages that are not remembered are ignored.
+
+        :param message_id: ID of the message.
+        :param content: New content of the message.
+        """
+        if message_id in self._contents:
+            if content:
+                self._contents[message_id] = content
+            else:
+                del self._contents[message_id]
+
+    def forget(self, message_id: int) -> None:
+        """
+        Forget the content of a deleted message.
+
+        :param message_id: ID of the message.
+        """
+        self._contents.pop(message_id, None)
+
+    async def __fetch(self, channel: discord.abc.Messageable, message_id: int) -> Optional[str]:
+        await self._fetch_bucket.acquire()
+        try:
+            message = await channel.fetch_message(message_id)
+        except (discord.NotFound, discord.Forbidden):
+            return None
+
+        self.remember(message.id, message.content)
+        return message.content
+
+    async def resolve(self, reference: discord.MessageReference, channel: discord.abc.Messageable) -> Optional[str]:
+        """
+        Resolve the content of a referenced message.
+
+        :param reference: Reference to the message.
+        :param channel: Channel of the referenced message, used to fetch the message if it is not cached.
+        :return: Content of the message, or None if the message was deleted, cannot be accessed or has no content.
+        :raises discord.HTTPException: Fetching the message failed.
+        """
+        resolved = reference.resolved
+        if isinstance(resolved, discord.DeletedReferencedMessage) or reference.message_id is None:
+            return None
+        if resolved is not None:
+            self.remember(resolved.id, resolved.content)
+            return resolved.content
+
+        message_id = reference.message_id
+        content = self._contents.get(message_id)
+        if content is not None:
+            self.hits += 1
+            self._contents.move_to_end(message_id)
+            return content
+
+        self.misses += 1
+        fetch = self._fetches.get(message_id)
+        if fetch is None:
+            _logger.debug(f"Fetching referenced message {message_id} from Discord API.")
+            fetch = asyncio.create_task(self.__fetch(channel, message_id))
+            self._fetches[message_id] = fetch
+            fetch.add_done_callback(lambda _: self._fetches.pop(message_id, None))
+
+        # Shielded so that a cancelled lookup does not cancel the fetch other lookups are waiting for
+        return await asyncio.shield(fetch)
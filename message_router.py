@@ -0,0 +1,66 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from typing import Tuple
+import enum
+import re
+
+
+class Route(enum.Enum):
+    IGNORE = enum.auto()
+    COMMAND = enum.auto()
+    MENTION = enum.auto()
+
+
+class MessageRouter:
+    """
+    Decide cheaply whether a message can be meant for the bot. Most messages the bot sees are unrelated chatter, which
+    is dropped with a prefix check without tokenizing the content or running regular expressions.
+    """
+
+    def __init__(self, bot_id: int) -> None:
+        """
+        :param bot_id: User ID of the bot, used to recognize mentions of it.
+        """
+        self._mention_prefixes = (f"<@{bot_id}>", f"<@!{bot_id}>")
+        self._mention_pattern = re.compile(rf"<@!?{bot_id}>(?:\s|$)")
+
+    def route(self, content: str, command_prefixes: Tuple[str, ...]) -> Route:
+        """
+        Route a message by its content.
+
+        :param content: Content of the message.
+        :param command_prefixes: Command prefixes valid for the message.
+        :return: Route.MENTION if the message starts with a mention of the bot, Route.COMMAND if it starts with a
+        command prefix, and Route.IGNORE otherwise.
+        """
+        if content[:1].isspace():
+            content = content.lstrip()
+
+        if content.startswith(self._mention_prefixes) and self._mention_pattern.match(content):
+            return Route.MENTION
+        if content.startswith(command_prefixes):
+            return Route.COMMAND
+        return Route.IGNORE
@@ -0,0 +1,162 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from collections import OrderedDict
+from discord.ext import commands
+from typing import Awaitable, List, Optional, Tuple, Union
+from deepl.chunking import split_text
+from deepl.metrics import MetricsRegistry
+from deepl.ratelimit import TokenBucket
+import discord
+import asyncio
+import io
+
+
+Destination = Union[commands.Context, discord.Message, discord.abc.Messageable]
+
+
+class MessageSender:
+    """
+    Send content of any length to Discord. Content exceeding the message length limit is split at line and word
+    boundaries and sent in order as multiple messages or embeds, or as a file attachment if it would need too many
+    messages. Sends to a channel are serialized and rate limited to Discord's per-channel message rate.
+    """
+
+    MESSAGE_LIMIT = 2000
+    EMBED_LIMIT = 4096
+
+    def __init__(self,
+                 max_message_parts: int = 3,
+                 use_embeds: bool = False,
+                 channel_rate: float = 1.0,
+                 channel_burst: int = 5,
+                 max_channels: int = 1024,
+                 metrics: Optional[MetricsRegistry] = None) -> None:
+        """
+        :param max_message_parts: Maximum number of messages content is split into. Longer content is sent as a file
+        attachment.
+        :param use_embeds: Send split content in embed descriptions, which allow longer parts than messages.
+        :param channel_rate: Number of messages per second sent to a channel in the long run.
+        :param channel_burst: Number of messages that can be sent to a channel at once.
+        :param max_channels: Maximum number of channels whose send state is kept in memory.
+        :param metrics: Registry to record the latency of Discord sends in.
+        """
+        self.max_message_parts = max_message_parts
+        self.use_embeds = use_embeds
+        self._channel_rate = channel_rate
+        self._channel_burst = channel_burst
+        self._max_channels = max_channels
+        self._channels: OrderedDict[int, Tuple[asyncio.Lock, TokenBucket]] = OrderedDict()
+        metrics = metrics if metrics is not None else MetricsRegistry()
+        self._send_latency = metrics.histogram("discord_send_seconds", "Latency of sending messages to Discord.")
+
+    @property
+    def part_limit(self) -> int:
+        return self.EMBED_LIMIT if self.use_embeds else self.MESSAGE_LIMIT
+
+    def split_content(self, content: str) -> List[str]:
+        """
+        Split content into parts fitting in a single message or embed.
+
+        :param content: Content to split.
+        :return: List of parts.
+        """
+        return [part for part, _ in split_text(content, self.part_limit)]
+
+    def __channel_state(self, channel_id: int) -> Tuple[asyncio.Lock, TokenBucket]:
+        state = self._channels.get(channel_id)
+        if state is None:
+            state = (asyncio.Lock(), TokenBucket(self._channel_rate, self._channel_burst))
+            self._channels[channel_id] = state
+            # Forget the least recently used channel that is not sending anything
+            if len(self._channels) > self._max_channels:
+                for old_id, (lock, _) in self._channels.items():
+                    if not lock.locked():
+                        del self._channels[old_id]
+                        break
+        else:
+            self._channels.move_to_end(channel_id)
+
+        return state
+
+    async def __timed_send(self, send: Awaitable[discord.Message]) -> discord.Message:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            return await send
+        finally:
+            self._send_latency.observe(loop.time() - started)
+
+    async def send(self,
+                   destination: Destination,
+                   content: str,
+                   reply: bool = False,
+                   mention_author: bool = False) -> List[discord.Message]:
+        """
+        Send content to a destination, splitting it when needed.
+
+        :param destination: Command context, message or channel to send the content to.
+        :param content: Content to send.
+        :param reply: Send the first part as a reply to the command or message. Has no effect for channels.
+        :param mention_author: Mention the author of the replied message.
+        :return: List of sent messages.
+        """
+        if isinstance(destination, commands.Context):
+            channel = destination.channel
+            first_send = destination.reply if reply else destination.send
+            follow_up_send = destination.send
+        elif isinstance(destination, discord.Message):
+            channel = destination.channel
+            first_send = destination.reply if reply else channel.send
+            follow_up_send = channel.send
+        else:
+            channel = destination
+            first_send = follow_up_send = destination.send
+            reply = False
+
+        kwargs = {"mention_author": mention_author} if reply else {}
+        parts = self.split_content(content)
+        if not parts:
+            raise ValueError("Content to send must not be empty.")
+
+        lock, bucket = self.__channel_state(channel.id)
+        async with lock:
+            if len(parts) > self.max_message_parts:
+                await bucket.acquire()
+                attachment = discord.File(io.BytesIO(content.encode("utf-8")), filename="translation.txt")
+                return [await self.__timed_send(first_send("The content was too long, so it is attached as a file.",
+                                                           file=attachment, **kwargs))]
+
+            sent = []
+            for i, part in enumerate(parts):
+                await bucket.acquire()
+                send = first_send if i == 0 else follow_up_send
+                send_kwargs = kwargs if i == 0 else {}
+                if self.use_embeds:
+                    sent.append(await self.__timed_send(send(embed=discord.Embed(description=part), **send_kwargs)))
+                else:
+                    sent.append(await self.__timed_send(send(part, **send_kwargs)))
+
+            return sent
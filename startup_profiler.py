@@ -0,0 +1,87 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import logging
+import time
+
+
+_logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """
+    Record durations of bot startup phases, so that cold start time can be tracked across releases.
+    """
+
+    def __init__(self, started: Optional[float] = None) -> None:
+        """
+        :param started: Start time of the process from time.perf_counter(). Defaults to the current time.
+        """
+        self.started = started if started is not None else time.perf_counter()
+        self.timings: OrderedDict[str, float] = OrderedDict()
+        self.ready_after: Optional[float] = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        """
+        Record the duration of a startup phase.
+
+        :param phase: Name of the phase.
+        :param seconds: Duration of the phase in seconds.
+        """
+        self.timings[phase] = seconds
+        _logger.info(f"Startup phase {phase} took {seconds * 1000:.0f} ms.")
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """
+        Measure the duration of a startup phase.
+
+        :param phase: Name of the phase.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def ready(self) -> None:
+        """
+        Mark the startup finished. Only the first call is recorded, so that reconnects do not count as startups.
+        """
+        if self.ready_after is None:
+            self.ready_after = time.perf_counter() - self.started
+            _logger.info(f"Bot was ready {self.ready_after * 1000:.0f} ms after the process started.")
+
+    def format(self) -> str:
+        """
+        :return: Startup phases and their durations as lines of text.
+        """
+        lines = [f"{phase}: {seconds * 1000:.0f} ms" for phase, seconds in self.timings.items()]
+        if self.ready_after is not None:
+            lines.append(f"Ready after: {self.ready_after * 1000:.0f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,334 @@
+"""
+MIT License
+
+Copyright (c) 2022 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+import math
+
+
+_logger = logging.getLogger(__name__)
+
+DEADLINE_EXCEEDED_MESSAGE = "The bot is too busy to translate this in time. Please try again in a moment."
+
+
+class SchedulerError(Exception):
+    """Base class for exceptions raised when the scheduler cannot run a translation."""
+    pass
+
+
+class OverloadedError(SchedulerError):
+    """Exception raised when a translation is rejected because too many translations are already queued."""
+    pass
+
+
+class QueueDeadlineError(SchedulerError):
+    """Exception raised when the deadline of a translation passes before it is its turn in the scheduler."""
+    pass
+
+
+class Priority(enum.IntEnum):
+    # Interactions must be answered within seconds, so they are served before everything else in deadline order
+    INTERACTION = 0
+    NORMAL = 1
+    # Low priority translations are rejected first when the queues grow too long
+    LOW = 2
+
+
+class _Job:
+    __slots__ = ("cost", "priority", "future", "queued")
+
+    def __init__(self, cost: float, priority: Priority, future: asyncio.Future) -> None:
+        self.cost = cost
+        self.priority = priority
+        self.future = future
+        self.queued = True
+
+
+class _UserFlow:
+    __slots__ = ("tag", "weight", "jobs")
+
+    def __init__(self, tag: float, weight: float) -> None:
+        self.tag = tag
+        self.weight = weight
+        self.jobs: Deque[_Job] = deque()
+
+
+class _GuildFlow:
+    __slots__ = ("tag", "weight", "virtual_time", "users", "queued")
+
+    def __init__(self, tag: float, weight: float) -> None:
+        self.tag = tag
+        self.weight = weight
+        self.virtual_time = 0.0
+        self.users: Dict[Hashable, _UserFlow] = {}
+        self.queued = 0
+
+
+class TranslationScheduler:
+    """
+    Share the translation capacity fairly between guilds, and between users within a guild, with start-time fair
+    queueing. Each queued translation costs its number of characters, divided by the weight of the guild or user, so a
+    guild sending a lot of long texts cannot make other guilds wait behind it. The queues are bounded, and low priority
+    translations are rejected early once the queues pass the shedding thresholds, so that latency does not grow without
+    limit when the bot is overloaded.
+
+    Interaction translations are served first, earliest deadline first, and are only limited by the total queue size.
+    Translations with a deadline are rejected if their deadline passes while they are queued.
+    """
+
+    def __init__(self,
+                 max_concurrent: int = 32,
+                 max_queue_size: int = 500,
+                 max_guild_queue_size: int = 50,
+                 max_user_queue_size: int = 10,
+                 shed_threshold: int = 100,
+                 guild_shed_threshold: int = 10,
+                 guild_weights: Optional[Dict[int, float]] = None,
+                 user_weights: Optional[Dict[int, float]] = None) -> None:
+        """
+        :param max_concurrent: Maximum number of translations running at the same time.
+        :param max_queue_size: Maximum number of queued translations.
+        :param max_guild_queue_size: Maximum number of queued translations of a guild.
+        :param max_user_queue_size: Maximum number of queued translations of a user in a guild.
+        :param shed_threshold: Number of queued translations after which low priority translations are rejected.
+        :param guild_shed_threshold: Number of queued translations of a guild after which its low priority translations
+        are rejected.
+        :param guild_weights: Weights of guilds by ID. Guilds have weight 1 by default.
+        :param user_weights: Weights of users by ID. Users have weight 1 by default.
+        :exception ValueError: Maximum number of concurrent translations is not positive.
+        """
+        if max_concurrent <= 0:
+            raise ValueError("Maximum number of concurrent translations must be positive.")
+
+        self.max_concurrent = max_concurrent
+        self.max_queue_size = max_queue_size
+        self.max_guild_queue_size = max_guild_queue_size
+        self.max_user_queue_size = max_user_queue_size
+        self.shed_threshold = shed_threshold
+        self.guild_shed_threshold = guild_shed_threshold
+        self.guild_weights = guild_weights or {}
+        self.user_weights = user_weights or {}
+        self._guilds: Dict[Optional[int], _GuildFlow] = {}
+        self._interactions: List[Tuple[float, int, _Job]] = []
+        self._queued_interactions = 0
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._queued = 0
+        self._running = 0
+        self.shed_requests = 0
+        self.rejected_requests = 0
+        self.expired_requests = 0
+
+    @property
+    def queued(self) -> int:
+        """
+        Number of translations waiting for their turn.
+        """
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        """
+        Number of translations holding a slot.
+        """
+        return self._running
+
+    def guild_queued(self, guild_id: Optional[int]) -> int:
+        """
+        :param guild_id: ID of the guild, or None for private messages.
+        :return: Number of queued translations of the guild.
+        """
+        guild = self._guilds.get(guild_id)
+        return guild.queued if guild else 0
+
+    def expected_wait(self, priority: Priority, service_time: float) -> float:
+        """
+        Estimate how long a new translation would wait for its turn. Each round of queued translations ahead of it,
+        as many as can run at the same time, is expected to take the given service time.
+
+        :param priority: Priority of the translation.
+        :param service_time: Expected time in seconds to finish a translation.
+        :return: Expected wait in seconds.
+        """
+        ahead = self._queued_interactions if priority == Priority.INTERACTION else self._queued
+        if not ahead and self._running < self.max_concurrent:
+            return 0.0
+        return (ahead // self.max_concurrent + 1) * service_time
+
+    async def acquire(self,
+                      guild_id: Optional[int],
+                      user_id: Optional[int],
+                      cost: float,
+                      priority: Priority = Priority.NORMAL,
+                      deadline: Optional[float] = None) -> None:
+        """
+        Wait for the turn of a translation. Every successful call must be followed by a call to release().
+
+        :param guild_id: ID of the guild the translation is made in, or None for private messages.
+        :param user_id: ID of the user requesting the translation, or None if not requested by a user.
+        :param cost: Cost of the translation, e.g. the number of characters to translate.
+        :param priority: Priority of the translation.
+        :param deadline: Event loop time by which the translation must be finished, or None for no deadline.
+        :exception OverloadedError: The translation was rejected because the queues are too long.
+        :exception QueueDeadlineError: The deadline passed before it was the turn of the translation.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                self.expired_requests += 1
+                raise QueueDeadlineError(DEADLINE_EXCEEDED_MESSAGE)
+
+        if not self._queued and self._running < self.max_concurrent:
+            self._running += 1
+            return
+
+        if self._queued >= self.max_queue_size:
+            self.rejected_requests += 1
+            raise OverloadedError("The bot is busy translating other messages right now. Please try again in a moment.")
+
+        job = _Job(max(cost, 1.0), priority, loop.create_future())
+        if priority == Priority.INTERACTION:
+            heapq.heappush(self._interactions, (deadline if deadline is not None else math.inf,
+                                                next(self._sequence), job))
+            self._queued_interactions += 1
+        else:
+            self.__enqueue(guild_id, user_id, job)
+        self._queued += 1
+
+        try:
+            await asyncio.wait_for(job.future, timeout)
+        except asyncio.TimeoutError:
+            if job.future.done() and not job.future.cancelled():
+                # The turn was given just as the deadline passed, so the slot is handed on
+                self.release()
+            else:
+                self.__remove(guild_id, user_id, job)
+            self.expired_requests += 1
+            raise QueueDeadlineError(DEADLINE_EXCEEDED_MESSAGE)
+        except asyncio.CancelledError:
+            if job.future.cancelled():
+                self.__remove(guild_id, user_id, job)
+            else:
+                # The turn was given just before the waiter was cancelled
+                self.release()
+            raise
+
+    def __enqueue(self, guild_id: Optional[int], user_id: Optional[int], job: _Job) -> None:
+        guild = self._guilds.get(guild_id)
+        user = guild.users.get(user_id) if guild else None
+        guild_queued = guild.queued if guild else 0
+        user_queued = len(user.jobs) if user else 0
+
+        if guild_queued >= self.max_guild_queue_size or user_queued >= self.max_user_queue_size:
+            self.rejected_requests += 1
+            raise OverloadedError("Too many translations are already waiting here. Please try again in a moment.")
+        if job.priority >= Priority.LOW and (self._queued >= self.shed_threshold
+                                             or guild_queued >= self.guild_shed_threshold):
+            self.shed_requests += 1
+            raise OverloadedError("The bot is busy right now, so quick translations are paused for a moment. "
+                                  "Please try again shortly or use a translation command.")
+
+        if guild is None:
+            # A flow becoming active starts from the current virtual time, so idle time does not accumulate credit
+            guild = self._guilds[guild_id] = _GuildFlow(self._virtual_time, self.guild_weights.get(guild_id, 1.0))
+        if user is None:
+            user = guild.users[user_id] = _UserFlow(guild.virtual_time, self.user_weights.get(user_id, 1.0))
+
+        user.jobs.append(job)
+        guild.queued += 1
+
+    def release(self) -> None:
+        """
+        Give the slot of a finished translation to the next queued translation.
+        """
+        self._running -= 1
+        self.__dispatch()
+
+    def __remove(self, guild_id: Optional[int], user_id: Optional[int], job: _Job) -> None:
+        # The job is already gone if it was dispatched after the waiter was cancelled
+        if not job.queued:
+            return
+
+        if job.priority == Priority.INTERACTION:
+            # The heap entry is skipped when it is popped
+            self.__interaction_removed(job)
+            if not self._queued_interactions:
+                self._interactions.clear()
+            return
+
+        guild = self._guilds[guild_id]
+        user = guild.users[user_id]
+        user.jobs.remove(job)
+        self.__job_removed(guild_id, guild, user_id, user, job)
+
+    def __interaction_removed(self, job: _Job) -> None:
+        job.queued = False
+        self._queued_interactions -= 1
+        self._queued -= 1
+
+    def __job_removed(self,
+                      guild_id: Optional[int],
+                      guild: _GuildFlow,
+                      user_id: Optional[int],
+                      user: _UserFlow,
+                      job: _Job) -> None:
+        job.queued = False
+        guild.queued -= 1
+        self._queued -= 1
+        if not user.jobs:
+            del guild.users[user_id]
+        if not guild.users:
+            del self._guilds[guild_id]
+
+    def __dispatch(self) -> None:
+        while self._running < self.max_concurrent and self._queued:
+            if self._queued_interactions:
+                _, _, job = heapq.heappop(self._interactions)
+                if not job.queued:
+                    continue
+                self.__interaction_removed(job)
+                if job.future.cancelled():
+                    continue
+            else:
+                guild_id, guild = min(self._guilds.items(), key=lambda item: item[1].tag)
+                user_id, user = min(guild.users.items(), key=lambda item: item[1].tag)
+                job = user.jobs.popleft()
+                self.__job_removed(guild_id, guild, user_id, user, job)
+                if job.future.cancelled():
+                    continue
+
+                # Virtual time is the start tag of the translation in service
+                self._virtual_time = guild.tag
+                guild.virtual_time = user.tag
+                guild.tag += job.cost / guild.weight
+                user.tag += job.cost / user.weight
+
+            self._running += 1
+            job.future.set_result(None)
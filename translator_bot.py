@@ -23,45 +23,505 @@ SOFTWARE.
 """
 
 
-from discord.ext import commands
-from typing import Union, Iterable, Optional
+from discord.ext import commands, tasks
+from typing import TYPE_CHECKING, Union, Iterable, Optional, List, Tuple
+from message_sender import MessageSender
+from message_router import MessageRouter
+from message_resolver import MessageResolver
+from auto_translator import AutoTranslator
+from translation_scheduler import TranslationScheduler, Priority, QueueDeadlineError, DEADLINE_EXCEEDED_MESSAGE
+from guild_settings import GuildSettingsStore
+from startup_profiler import StartupProfiler
+from deepl.language_detection import LanguageDetector
 import deepl
 import logging
 import discord
 import aiohttp
+import asyncio
+import contextlib
+import datetime
 import os
+import time
+
+if TYPE_CHECKING:
+    # aiohttp.web is imported only when the metrics server is started
+    from aiohttp import web
 
 
 _logger = logging.getLogger(__name__)
 
+# Name of the cog routing messages to commands and quick translations
+EVENT_LISTENER_COG = "EventListenerCog"
+
 
 class CommandPrefixParser:
+    """
+    Resolve command prefixes of a message from the guild settings, falling back to the default prefixes.
+    """
 
-    def __init__(self, command_prefix: Union[str, Iterable[str]]):
-        self.command_prefix = command_prefix
+    def __init__(self, command_prefix: Union[str, Iterable[str]], settings: GuildSettingsStore):
+        if isinstance(command_prefix, str):
+            command_prefix = (command_prefix,)
+        self.command_prefix: Tuple[str, ...] = tuple(command_prefix)
+        self.settings = settings
 
-    def __call__(self, *args, **kwargs):
-        return self.command_prefix
+    def prefixes_for(self, guild_id: Optional[int]) -> Tuple[str, ...]:
+        return self.settings.get(guild_id).prefixes or self.command_prefix
+
+    def __call__(self, bot: commands.Bot, message: discord.Message):
+        return self.prefixes_for(message.guild.id if message.guild else None)
 
 
 class TranslatorBot(commands.Bot):
 
-    def __init__(self, deepl_api_token: str, command_prefix: Union[str, Iterable[str]]):
+    DEFAULT_TARGET_LANGUAGE = "EN-US"
+
+    def __init__(self,
+                 deepl_api_token: str,
+                 command_prefix: Union[str, Iterable[str]],
+                 config: dict = None,
+                 startup_profiler: Optional[StartupProfiler] = None):
         intents = discord.Intents.default()
         intents.message_content = True
-        prefix_parser = CommandPrefixParser(command_prefix)
         self._aiohttp_session: Optional[aiohttp.ClientSession] = None
         self._deepl_client: Optional[deepl.Client] = None
         self._deepl_api_token: str = deepl_api_token
+        self.config: dict = config or {}
+        self.startup_profiler = startup_profiler or StartupProfiler()
+        self._gateway_connect_started: Optional[float] = None
+        self.settings = GuildSettingsStore(self.config.get("settings", {}).get("path", "guild_settings.db"))
+        prefix_parser = CommandPrefixParser(command_prefix, self.settings)
+        self.metrics = deepl.MetricsRegistry()
+        self._translation_counter = self.metrics.counter("bot_translations_total",
+                                                         "Translations requested by command.", ["command"])
+        self._event_loop_lag = self.metrics.histogram("bot_event_loop_lag_seconds", "Event loop scheduling lag.")
+        self._metrics_runner: Optional["web.AppRunner"] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self._reported_protected_characters = 0
+        self.message_router: Optional[MessageRouter] = None
+        self.language_snapshot_path: Optional[str] = None
+        message_cache_config = self.config.get("message_cache", {})
+        self.message_resolver = MessageResolver(max_messages=message_cache_config.get("max_messages", 10000),
+                                                fetch_rate=message_cache_config.get("fetch_rate", 1.0))
+        auto_translate_config = self.config.get("auto_translate", {})
+        self.auto_translator = AutoTranslator(self.__translate_automatically, self.__send_automatic_translations,
+                                              debounce=auto_translate_config.get("debounce", 1.5),
+                                              max_queue_size=auto_translate_config.get("max_queue_size", 200))
+        scheduler_config = self.config.get("scheduler", {})
+        self.scheduler = TranslationScheduler(
+            max_concurrent=scheduler_config.get("max_concurrent", 32),
+            max_queue_size=scheduler_config.get("max_queue_size", 500),
+            max_guild_queue_size=scheduler_config.get("max_guild_queue_size", 50),
+            max_user_queue_size=scheduler_config.get("max_user_queue_size", 10),
+            shed_threshold=scheduler_config.get("shed_threshold", 100),
+            guild_shed_threshold=scheduler_config.get("guild_shed_threshold", 10),
+            # JSON object keys are strings
+            guild_weights={int(guild_id): weight
+                           for guild_id, weight in scheduler_config.get("guild_weights", {}).items()},
+            user_weights={int(user_id): weight
+                          for user_id, weight in scheduler_config.get("user_weights", {}).items()})
+        self._scheduler_wait = self.metrics.histogram("bot_scheduler_wait_seconds",
+                                                      "Time translations waited for their turn in the scheduler.")
+        self.metrics.gauge("bot_scheduler_queued", "Translations waiting in the scheduler.") \
+            .set_function(lambda: self.scheduler.queued)
+        self.metrics.gauge("bot_scheduler_running", "Translations holding a scheduler slot.") \
+            .set_function(lambda: self.scheduler.running)
+        self.metrics.counter("bot_scheduler_shed_total", "Low priority translations rejected to shed load.") \
+            .set_function(lambda: self.scheduler.shed_requests)
+        self.metrics.counter("bot_scheduler_rejected_total", "Translations rejected because of full queues.") \
+            .set_function(lambda: self.scheduler.rejected_requests)
+        self.metrics.counter("bot_scheduler_expired_total", "Translations whose deadline passed in the scheduler.") \
+            .set_function(lambda: self.scheduler.expired_requests)
+        self.deadlines: dict = {"interaction": 60, "command": 30, "quick": 30, **self.config.get("deadlines", {})}
+        self.language_detector: Optional[LanguageDetector] = None
+        self._skipped_translations = self.metrics.counter(
+            "bot_skipped_translations_total", "Texts not translated as they were in the target language already.",
+            ["command"])
+        self._inferred_source_languages = self.metrics.counter(
+            "bot_inferred_source_languages_total", "Translations sent with a source language detected by the bot.",
+            ["command"])
+        self.metrics.gauge("bot_auto_translate_queued_messages", "Messages waiting to be auto-translated.") \
+            .set_function(lambda: self.auto_translator.queued_messages)
+        self.metrics.counter("bot_auto_translate_dropped_messages_total",
+                             "Messages dropped from full auto-translate queues.") \
+            .set_function(lambda: self.auto_translator.dropped_messages)
+        self.metrics.counter("bot_message_cache_hits_total", "Referenced messages found in the message cache.") \
+            .set_function(lambda: self.message_resolver.hits)
+        self.metrics.counter("bot_message_cache_misses_total", "Referenced messages fetched from Discord API.") \
+            .set_function(lambda: self.message_resolver.misses)
+        output_config = self.config.get("output", {})
+        self.message_sender = MessageSender(max_message_parts=output_config.get("max_message_parts", 3),
+                                            use_embeds=output_config.get("use_embeds", False),
+                                            metrics=self.metrics)
         self.cogs_path: str = f"{os.path.dirname(__file__)}/cogs"
         super().__init__(command_prefix=prefix_parser, intents=intents, case_insensitive=True)
 
     async def setup_hook(self):
-        await self.__load_cogs()
-        self._aiohttp_session = aiohttp.ClientSession(loop=self.loop, raise_for_status=True)
-        self._deepl_client = deepl.Client(self._deepl_api_token, str(self.user), self.aiohttp_session)
-        supported_languages = await self.deepl_client.update_supported_languages()
-        _logger.info(f"Loaded {len(supported_languages)} supported languages.")
+        profiler = self.startup_profiler
+        self.message_router = MessageRouter(self.user.id)
+        with profiler.phase("session"):
+            # The general session is only used for fetch_url, DeepL client creates its own tuned session
+            self._aiohttp_session = aiohttp.ClientSession(loop=self.loop, raise_for_status=True)
+            deepl_config = self.config.get("deepl", {})
+            self._deepl_client = deepl.Client(self._deepl_api_token, str(self.user),
+                                              store=self.__create_translation_store(),
+                                              ledger=self.__create_quota_ledger(),
+                                              base_url=deepl_config.get("base_url"),
+                                              metrics=self.metrics,
+                                              connection_options=deepl_config.get("connection"),
+                                              protect_spans=self.config.get("protection", {}).get("enabled", True))
+
+        prewarm_connections = self.config.get("deepl", {}).get("prewarm_connections", 2)
+        if prewarm_connections:
+            self._prewarm_task = self.loop.create_task(self.deepl_client.prewarm(prewarm_connections))
+
+        # Cogs, settings and languages do not depend on each other, so they are loaded concurrently
+        await asyncio.gather(self.__load_cogs(), self.__load_settings(), self.__load_language_snapshot(),
+                             self.__load_language_detector())
+
+        # Languages are loaded from the snapshot so that startup does not wait for DeepL API. They are refreshed and
+        # glossaries are loaded in the background
+        self.refresh_deepl_metadata.change_interval(
+            seconds=self.config.get("languages", {}).get("refresh_interval", 21600))
+        self.refresh_deepl_metadata.start()
+
+        reconcile_interval = self.config.get("quota", {}).get("reconcile_interval", 600)
+        self.reconcile_quota.change_interval(seconds=reconcile_interval)
+        self.reconcile_quota.start()
+        self.measure_event_loop_lag.start()
+        protection_config = self.config.get("protection", {})
+        if protection_config.get("enabled", True):
+            self.report_protected_characters.change_interval(seconds=protection_config.get("report_interval", 600))
+            self.report_protected_characters.start()
+
+        metrics_config = self.config.get("metrics")
+        if metrics_config:
+            self._metrics_runner = await deepl.metrics.start_http_server(self.metrics,
+                                                                         host=metrics_config.get("host", "127.0.0.1"),
+                                                                         port=metrics_config.get("port", 9100))
+            _logger.info(f"Serving metrics on port {metrics_config.get('port', 9100)}.")
+
+        self._gateway_connect_started = time.perf_counter()
+
+    async def on_ready(self) -> None:
+        if self.startup_profiler.ready_after is None:
+            self.startup_profiler.record("gateway connect", time.perf_counter() - self._gateway_connect_started)
+        self.startup_profiler.ready()
+
+    async def __load_settings(self) -> None:
+        with self.startup_profiler.phase("settings"):
+            await self.settings.load()
+        for _, settings in self.settings:
+            for channel_id, target_language in settings.auto_translate_channels.items():
+                self.auto_translator.enable(channel_id, target_language)
+
+    async def __load_language_snapshot(self) -> None:
+        self.language_snapshot_path = self.config.get("languages", {}).get("snapshot_path", "languages.json")
+        supported_languages = None
+        with self.startup_profiler.phase("language snapshot"):
+            if self.language_snapshot_path:
+                supported_languages = await self.deepl_client.load_language_snapshot(self.language_snapshot_path)
+
+        if supported_languages:
+            _logger.info(f"Loaded {len(supported_languages)} supported languages from {self.language_snapshot_path}.")
+        else:
+            _logger.warning("No language snapshot found. Supported languages are available once fetched from DeepL.")
+
+    async def __load_language_detector(self) -> None:
+        detection_config = self.config.get("language_detection", {})
+        if not detection_config.get("enabled", True):
+            return
+
+        path = detection_config.get("path") or deepl.language_detection.DEFAULT_PROFILES_PATH
+        with self.startup_profiler.phase("language detector"):
+            try:
+                self.language_detector = await asyncio.get_running_loop().run_in_executor(None, LanguageDetector.load,
+                                                                                          path)
+            except (OSError, ValueError):
+                _logger.exception(f"Failed to load language profiles from {path}. Languages are detected by DeepL.")
+                return
+        _logger.info(f"Loaded language profiles of {len(self.language_detector.languages)} languages.")
+
+    async def on_message(self, message: discord.Message, /) -> None:
+        # Messages are routed to commands by EventListenerCog, which is required at startup. Processing them here too
+        # would run every command twice, so this only keeps the commands working if the cog is unloaded later on
+        if self.get_cog(EVENT_LISTENER_COG) is None:
+            await self.process_commands(message)
+
+    async def close(self):
+        self.reconcile_quota.cancel()
+        self.refresh_deepl_metadata.cancel()
+        self.measure_event_loop_lag.cancel()
+        self.report_protected_characters.cancel()
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+        await self.settings.close()
+        if self._prewarm_task:
+            self._prewarm_task.cancel()
+        if self.deepl_client and self.deepl_client.store:
+            await self.deepl_client.store.close()
+        if self.deepl_client:
+            await self.deepl_client.close()
+        if self.aiohttp_session:
+            await self.aiohttp_session.close()
+        await super().close()
+
+    def __create_translation_store(self) -> Optional[deepl.TranslationStore]:
+        store_config = self.config.get("translation_store")
+        if not store_config:
+            return None
+
+        store = deepl.TranslationStore(store_config["path"], max_entries=store_config.get("max_entries", 100000))
+        _logger.info(f"Using persistent translation store {store.path}.")
+        return store
+
+    def __create_quota_ledger(self) -> deepl.QuotaLedger:
+        budgets = {}
+        for scope, budget in self.config.get("quota", {}).get("budgets", {}).items():
+            budgets[scope] = (budget["characters"], budget["window"])
+
+        return deepl.QuotaLedger(budgets=budgets)
+
+    @tasks.loop(minutes=10)
+    async def reconcile_quota(self):
+        try:
+            usage = await self.deepl_client.get_usage()
+        except (deepl.DeepLError, aiohttp.ClientError):
+            _logger.exception("Failed to reconcile the quota ledger with DeepL API usage.")
+            return
+
+        self.deepl_client.ledger.reconcile(usage)
+
+    @tasks.loop(hours=6)
+    async def refresh_deepl_metadata(self):
+        try:
+            # The first fetch is a part of the startup, even though it does not delay the bot from being ready
+            first_fetch = "language fetch" not in self.startup_profiler.timings
+            with self.startup_profiler.phase("language fetch") if first_fetch else contextlib.nullcontext():
+                added, removed = await self.deepl_client.refresh_supported_languages(self.language_snapshot_path)
+            if added or removed:
+                _logger.info(f"Supported languages changed: {len(added)} added, {len(removed)} removed.")
+        except (deepl.DeepLError, aiohttp.ClientError):
+            _logger.exception("Failed to refresh supported languages.")
+
+        try:
+            await self.deepl_client.list_glossaries()
+        except (deepl.DeepLError, aiohttp.ClientError):
+            _logger.exception("Failed to refresh glossaries.")
+
+    @tasks.loop(seconds=1)
+    async def measure_event_loop_lag(self):
+        # The lag is how much later than requested the event loop gets to run a callback
+        interval = 0.5
+        started = self.loop.time()
+        await asyncio.sleep(interval)
+        self._event_loop_lag.observe(max(0.0, self.loop.time() - started - interval))
+
+    @tasks.loop(minutes=10)
+    async def report_protected_characters(self):
+        protected = int(self.metrics.get("deepl_characters_protected_total").get())
+        saved = protected - self._reported_protected_characters
+        if saved:
+            sent = int(self.metrics.get("deepl_characters_sent_total").get())
+            share = round(protected / max(1, protected + sent) * 100, 1)
+            _logger.info(f"Protected spans saved {saved} characters since the last report, {protected} in total "
+                         f"({share}% of the characters that would have been sent).")
+        self._reported_protected_characters = protected
+
+    async def translate(self,
+                        text: Union[str, List[str]],
+                        target_language: Union[str, deepl.Language],
+                        source_language: Optional[Union[str, deepl.Language]] = None,
+                        *,
+                        guild: Optional[discord.abc.Snowflake] = None,
+                        user: Optional[discord.abc.Snowflake] = None,
+                        command: str = "other",
+                        priority: Priority = Priority.NORMAL,
+                        deadline: Optional[float] = None,
+                        **kwargs) -> List[deepl.Translation]:
+        """
+        Translate text with the DeepL client and charge the characters from the guild and user budgets. A single text
+        of any length is translated in concurrent chunks. If the source language is given and the guild uses a glossary
+        for the language pair, the glossary is used. Translations wait for their fair share in the scheduler, and must
+        be finished before their deadline. If the source language is omitted, it is detected locally first: texts
+        confidently in the target language already are returned as is without DeepL, and a confident detection is
+        used as the source language of a single text.
+
+        :param text: Text to translate or list of texts to translate.
+        :param target_language: A string representing the target language, or a Language object.
+        :param source_language: A string representing the source language, or a Language object. If omitted,
+        the source language is detected locally or by DeepL.
+        :param guild: Guild the translation is made in, if any.
+        :param user: User requesting the translation, if any.
+        :param command: Name of the command requesting the translation, used for metrics.
+        :param priority: Priority of the translation in the scheduler.
+        :param deadline: Event loop time by which the translation must be finished, e.g. from deadline_for(), or None
+        for no deadline.
+        :param kwargs: Kwargs for deepl.Client.translate() or deepl.Client.translate_long() method.
+        :return: List of translations.
+        :exception OverloadedError: The scheduler rejected the translation because too many translations are queued.
+        :exception QueueDeadlineError: The deadline passed before the translation was sent to DeepL.
+        :exception DeadlineExceededError: DeepL did not finish the translation before the deadline.
+        """
+        self._translation_counter.inc(command=command)
+        if source_language is None and self.language_detector is not None:
+            if not isinstance(text, str):
+                return await self.__translate_new_texts(text, target_language, guild, user, command, priority,
+                                                        deadline, kwargs)
+
+            detected_language = self.__detect_language(text)
+            if detected_language and self.__base_language(detected_language) == self.__base_language(target_language):
+                self._skipped_translations.inc(command=command)
+                return [self.deepl_client.untranslated(text, target_language, detected_language)]
+            if detected_language:
+                # A known source language also lets the glossaries of the guild be used
+                self._inferred_source_languages.inc(command=command)
+                source_language = detected_language
+
+        return await self.__schedule_translation(text, target_language, source_language, guild, user, priority,
+                                                 deadline, kwargs)
+
+    async def __translate_new_texts(self,
+                                    texts: List[str],
+                                    target_language: Union[str, deepl.Language],
+                                    guild: Optional[discord.abc.Snowflake],
+                                    user: Optional[discord.abc.Snowflake],
+                                    command: str,
+                                    priority: Priority,
+                                    deadline: Optional[float],
+                                    kwargs: dict) -> List[deepl.Translation]:
+        """
+        Translate texts that may be in different languages. Texts detected to be in the target language already are
+        not sent to DeepL, and DeepL detects the source languages of the rest.
+        """
+        target_base = self.__base_language(target_language)
+        translations: List[Optional[deepl.Translation]] = [None] * len(texts)
+        for i, text in enumerate(texts):
+            detected_language = self.__detect_language(text)
+            if detected_language and self.__base_language(detected_language) == target_base:
+                self._skipped_translations.inc(command=command)
+                translations[i] = self.deepl_client.untranslated(text, target_language, detected_language)
+
+        new_indices = [i for i, translation in enumerate(translations) if translation is None]
+        if new_indices:
+            fetched = await self.__schedule_translation([texts[i] for i in new_indices], target_language, None, guild,
+                                                        user, priority, deadline, kwargs)
+            for i, translation in zip(new_indices, fetched):
+                translations[i] = translation
+        return translations
+
+    async def __schedule_translation(self,
+                                     text: Union[str, List[str]],
+                                     target_language: Union[str, deepl.Language],
+                                     source_language: Optional[Union[str, deepl.Language]],
+                                     guild: Optional[discord.abc.Snowflake],
+                                     user: Optional[discord.abc.Snowflake],
+                                     priority: Priority,
+                                     deadline: Optional[float],
+                                     kwargs: dict) -> List[deepl.Translation]:
+        cost = len(text) if isinstance(text, str) else sum(map(len, text))
+        wait_started = time.perf_counter()
+        await self.scheduler.acquire(guild.id if guild else None, user.id if user else None, cost, priority,
+                                     deadline)
+        self._scheduler_wait.observe(time.perf_counter() - wait_started)
+        try:
+            if deadline is not None and "timeout" not in kwargs:
+                kwargs["timeout"] = deadline - asyncio.get_running_loop().time()
+                if kwargs["timeout"] <= 0:
+                    raise QueueDeadlineError(DEADLINE_EXCEEDED_MESSAGE)
+            return await self.__translate(text, target_language, source_language, guild, user, kwargs)
+        finally:
+            self.scheduler.release()
+
+    def __detect_language(self, text: str) -> Optional[str]:
+        """
+        Detect the language of a text locally, without DeepL API.
+
+        :param text: Text to detect the language of.
+        :return: Code of the detected language if it is supported and the detection is confident enough, None
+        otherwise.
+        """
+        detection = self.language_detector.detect(text)
+        min_confidence = self.config.get("language_detection", {}).get("min_confidence", 0.95)
+        if detection is None or detection.confidence < min_confidence:
+            return None
+        if not self.deepl_client.is_supported_language(detection.language, ignore_case=True):
+            return None
+        return detection.language
+
+    def __base_language(self, language: Union[str, deepl.Language]) -> Optional[str]:
+        """
+        :param language: A string representing a language, such as a code, an alias or a name, or a Language object.
+        :return: Language code without the regional variant, or None if the language is not supported.
+        """
+        language = self.deepl_client.get_language(language, ignore_case=True)
+        return language.language_code.split("-")[0] if language else None
+
+    async def __translate(self,
+                          text: Union[str, List[str]],
+                          target_language: Union[str, deepl.Language],
+                          source_language: Optional[Union[str, deepl.Language]],
+                          guild: Optional[discord.abc.Snowflake],
+                          user: Optional[discord.abc.Snowflake],
+                          kwargs: dict) -> List[deepl.Translation]:
+        accounts = []
+        if guild:
+            accounts.append(("guild", guild.id))
+        if user:
+            accounts.append(("user", user.id))
+
+        if guild and source_language and "glossary_id" not in kwargs:
+            glossary = self.deepl_client.find_glossary(self.settings.get(guild.id).glossary_ids, source_language,
+                                                       target_language)
+            if glossary:
+                kwargs["glossary_id"] = glossary.glossary_id
+
+        if isinstance(text, str):
+            return [await self.deepl_client.translate_long(text, target_language, source_language=source_language,
+                                                           accounts=accounts, **kwargs)]
+
+        return await self.deepl_client.translate(text, target_language, source_language=source_language,
+                                                 accounts=accounts, **kwargs)
+
+    def deadline_for(self, created_at: datetime.datetime, kind: str) -> float:
+        """
+        Get the deadline of a translation requested at a given time. Time already spent since the request, e.g. waiting
+        for Discord to deliver the message, is taken from the time available for the translation.
+
+        :param created_at: Time the message or interaction requesting the translation was created.
+        :param kind: Kind of the request, one of the keys in the deadlines config: interaction, command or quick.
+        :return: Deadline as event loop time.
+        """
+        elapsed = max(0.0, (discord.utils.utcnow() - created_at).total_seconds())
+        return asyncio.get_running_loop().time() + self.deadlines[kind] - elapsed
+
+    def expected_translation_seconds(self, priority: Priority) -> float:
+        """
+        Estimate how long a new translation would take at the moment: the expected wait in the scheduler plus the 95th
+        percentile latency of DeepL translation requests.
+
+        :param priority: Priority of the translation.
+        :return: Expected time in seconds, or 0 if DeepL latency has not been measured yet.
+        """
+        latency = self.metrics.get("deepl_request_seconds").quantile(0.95, endpoint=deepl.Client.ApiPath.translate)
+        latency = latency or 0.0
+        return self.scheduler.expected_wait(priority, latency) + latency
+
+    def default_target_language(self, guild: Optional[discord.abc.Snowflake]) -> str:
+        """
+        :param guild: Guild to get the default target language for, or None for private messages.
+        :return: Default target language code of the guild.
+        """
+        return self.settings.get(guild.id if guild else None).target_language or self.DEFAULT_TARGET_LANGUAGE
+
+    async def __translate_automatically(self,
+                                        texts: List[str],
+                                        target_language: str,
+                                        message: discord.Message) -> List[deepl.Translation]:
+        return await self.translate(texts, target_language, guild=message.guild, command="auto")
+
+    async def __send_automatic_translations(self, message: discord.Message, content: str) -> None:
+        await self.message_sender.send(message, content, reply=True)
 
     @property
     def aiohttp_session(self):
@@ -71,15 +531,20 @@ class TranslatorBot(commands.Bot):
     def deepl_client(self):
         return self._deepl_client
 
-    # noinspection PyBroadException
     async def __load_cogs(self):
-        startup_extensions = [f"cogs.{fname.rstrip('.py')}" for fname in os.listdir(self.cogs_path)
+        # rstrip(".py") would also strip trailing p and y characters from the extension name
+        startup_extensions = [f"cogs.{os.path.splitext(fname)[0]}" for fname in sorted(os.listdir(self.cogs_path))
                               if fname.endswith(".py")]
-        for extension in startup_extensions:
-            try:
-                await self.load_extension(extension)
-            except:
-                _logger.exception(f"Failed to load extension {extension}")
+        with self.startup_profiler.phase("cogs"):
+            results = await asyncio.gather(*[self.load_extension(extension) for extension in startup_extensions],
+                                           return_exceptions=True)
+
+        for extension, result in zip(startup_extensions, results):
+            if isinstance(result, BaseException):
+                _logger.error(f"Failed to load extension {extension}", exc_info=result)
+
+        if self.get_cog(EVENT_LISTENER_COG) is None:
+            raise RuntimeError(f"{EVENT_LISTENER_COG} is not loaded, so messages would not reach commands.")
 
     async def fetch_url(self, url: str, timeout: int = 10, **kwargs) -> str:
         if not url: